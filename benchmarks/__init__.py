@@ -0,0 +1,5 @@
+# AG_Optimizer/benchmarks/__init__.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+""" Benchmarks de rendimiento de los servicios y widgets de AG, Optimizer. """
@@ -0,0 +1,66 @@
+# AG_Optimizer/benchmarks/bench_alerts.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Coste por muestra del AlertEngine con 10, 100 y 500 reglas (umbrales sostenidos, con EWMA
+y de crecimiento de memoria por proceso) sobre muestras sintéticas de 2.000 procesos.
+Se mide aparte lo que cuesta sumar la memoria por nombre de proceso, que se hace una vez
+por muestra sea cual sea el número de reglas.
+
+Uso: python -m benchmarks.bench_alerts
+"""
+
+import time
+import random
+
+from benchmarks.fake_psutil import FakePsutil
+from services.alert_service import AlertEngine, compile_rules, process_totals
+from services.system_service import ProcessTable, SystemSnapshot
+
+SCALES = (10, 100, 500)
+PROCESSES = 2_000
+TICKS = 200
+
+
+def make_rules(count, names):
+    rng = random.Random(count); rules = []
+    for index in range(count):
+        kind = index % 3
+        if kind == 0: rules.append({"metric": rng.choice(("cpu_percent", "ram_percent")), "above": rng.uniform(50, 99), "for_s": 30, "clear_at": 40})
+        elif kind == 1: rules.append({"metric": "cpu_percent", "above": rng.uniform(50, 99), "for_s": 10, "smoothing_s": 20})
+        else: rules.append({"metric": "process_rss_mb", "process": rng.choice(names), "grows_by": 500, "within_s": 300})
+    return compile_rules({"cooldown_s": 300, "rules": rules})
+
+
+def make_snapshots(ticks=TICKS):
+    source = FakePsutil(PROCESSES); table = ProcessTable(source); rng = random.Random(5); snapshots = []
+    for tick in range(ticks):
+        source.tick(); table.refresh()
+        snapshots.append(SystemSnapshot(timestamp=tick * 2.0, wall_time=time.time(), cpu_percent=rng.uniform(0, 100),
+                                        ram_percent=rng.uniform(40, 95), processes=table.rows()))
+    return snapshots
+
+
+def run(scales=SCALES):
+    snapshots = make_snapshots()
+    names = sorted({process.name for process in snapshots[0].processes})
+    start = time.perf_counter()
+    totals = [process_totals(snapshot.processes) for snapshot in snapshots]
+    totals_ms = (time.perf_counter() - start) / len(snapshots) * 1000
+    results = {}
+    for count in scales:
+        engine = AlertEngine(make_rules(count, names))
+        start = time.perf_counter(); alerts = 0
+        for snapshot, snapshot_totals in zip(snapshots, totals): alerts += len(engine.evaluate_rules(snapshot, snapshot_totals))
+        rules_s = (time.perf_counter() - start) / len(snapshots)
+        results[count] = {"rules_ms": rules_s * 1000, "us_per_rule": rules_s / count * 1e6, "alerts": alerts}
+    return {"process_totals_ms": totals_ms, "rules": results}
+
+
+if __name__ == "__main__":
+    result = run()
+    print(f"Memoria por nombre de {PROCESSES} procesos: {result['process_totals_ms']:.3f} ms por muestra")
+    print(f"{'reglas':>8} {'por muestra (ms)':>18} {'por regla (µs)':>16} {'avisos':>8}")
+    for count, row in result["rules"].items():
+        print(f"{count:>8} {row['rules_ms']:>18.3f} {row['us_per_rule']:>16.2f} {row['alerts']:>8}")
@@ -0,0 +1,75 @@
+# AG_Optimizer/benchmarks/bench_config_save.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Coste de guardar config.json al ritmo de tecleo con unas notas grandes: guardado síncrono
+en cada pulsación (comportamiento anterior) frente a la escritura diferida de ConfigWriter.
+Se mide el tiempo que pasa el hilo que llama (el de la GUI) y cuántas escrituras llegan a disco.
+
+Uso: python -m benchmarks.bench_config_save
+"""
+
+import os
+import json
+import time
+import tempfile
+
+from helpers.config_helper import ConfigWriter
+
+KEYSTROKES = 200
+NOTES_SIZE = 512 * 1024
+CALENDAR_DAYS = 2_000
+
+
+def make_config():
+    line = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    return {
+        "theme": "dark", "username": "Benchmark", "layout": {"show_processes": True},
+        "user_notes": (line * (NOTES_SIZE // len(line) + 1))[:NOTES_SIZE],
+        "calendar_events": {f"day-{i:05d}": f"Nota del día {i}. " * 5 for i in range(CALENDAR_DAYS)},
+    }
+
+
+def legacy_save(path, config_data):
+    """ save_config original: reescribe el archivo completo en el hilo que llama. """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config_data, f, indent=4)
+
+
+def type_notes(config, on_change, keystrokes=KEYSTROKES):
+    start = time.perf_counter()
+    for i in range(keystrokes):
+        config["user_notes"] += "x"
+        on_change(config)
+    return time.perf_counter() - start
+
+
+def run(keystrokes=KEYSTROKES):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.json")
+        legacy_s = type_notes(make_config(), lambda c: legacy_save(path, c), keystrokes)
+
+        writer = ConfigWriter(path)
+        deferred_s = type_notes(make_config(), writer.schedule, keystrokes)
+        flush_start = time.perf_counter(); writer.flush(); flush_s = time.perf_counter() - flush_start
+
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f)["user_notes"].endswith("x" * keystrokes)
+
+    return {
+        "keystrokes": keystrokes,
+        "legacy_ms_per_keystroke": legacy_s / keystrokes * 1000,
+        "legacy_writes": keystrokes,
+        "deferred_ms_per_keystroke": deferred_s / keystrokes * 1000,
+        "deferred_flush_ms": flush_s * 1000,
+        "deferred_writes": writer.writes,
+    }
+
+
+if __name__ == "__main__":
+    result = run()
+    print(f"{result['keystrokes']} pulsaciones, notas de {NOTES_SIZE // 1024} KB y {CALENDAR_DAYS} días de calendario")
+    print(f"  antes:   {result['legacy_ms_per_keystroke']:.3f} ms por pulsación en la GUI, {result['legacy_writes']} escrituras")
+    print(f"  después: {result['deferred_ms_per_keystroke']:.3f} ms por pulsación en la GUI, "
+          f"{result['deferred_writes']} escrituras (flush final {result['deferred_flush_ms']:.1f} ms)")
@@ -0,0 +1,94 @@
+# AG_Optimizer/benchmarks/bench_process_model.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Coste por tick de la lista de procesos del dashboard con 200, 2.000 y 10.000 procesos:
+modelo que se reinicia entero en cada muestra (beginResetModel) frente a ProcessTableModel,
+que recibe del colector las diferencias ya calculadas (ProcessListDiffer) y solo emite
+inserciones, borrados, cambios de orden y cambios de memoria visibles.
+
+En el hilo de la GUI se mide apply (Python) y el trabajo de Qt (procesar los eventos de la
+QTableView ordenada por memoria, como en la página); "gui_ms" es la suma, lo que de verdad
+bloquea la interfaz. "collector_ms" es lo que el diff cuesta en el hilo del colector.
+FakePsutil cambia la memoria de todos los procesos en cada tick, así que es el peor caso.
+Al final se comprueba que gui_ms del diff no crece con el número de procesos: entre la
+escala menor y la mayor no puede multiplicarse por más de FLAT_LIMIT.
+
+Uso: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_process_model
+"""
+
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QTableView, QHeaderView
+from PySide6.QtCore import Qt
+
+from benchmarks.fake_psutil import FakePsutil
+from services.process_list import ProcessListDiffer
+from services.system_service import ProcessTable
+from views.process_model import ProcessTableModel
+
+SCALES = (200, 2_000, 10_000)
+TICKS = 20
+FLAT_LIMIT = 3.0
+
+
+class ResetProcessTableModel(ProcessTableModel):
+    """ Alternativa ingenua: reconstruye y reordena todas las filas en el hilo de la GUI en cada muestra. """
+    def apply(self, processes):
+        self.beginResetModel()
+        self._order = sorted(((( row.pid, row.create_time), row.pid, row.name, row.rss, 0, row.name.lower()) for row in processes),
+                             key=lambda row: row[3], reverse=True)
+        self.endResetModel()
+
+
+def measure_ticks(app, count, reset=False, ticks=TICKS):
+    """ Devuelve (ms del colector, ms de apply, ms de Qt) medios por tick, sin contar la simulación ni el muestreo. """
+    source = FakePsutil(count); table = ProcessTable(source)
+    differ = ProcessListDiffer(); model = ResetProcessTableModel() if reset else ProcessTableModel(differ=differ)
+    view = QTableView(); view.setModel(model); view.verticalHeader().hide(); view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.setSortingEnabled(True); view.sortByColumn(ProcessTableModel.MEMORY_COLUMN, Qt.DescendingOrder)
+    view.resize(400, 400); view.show()
+
+    def apply(rows):
+        if reset: model.apply(rows); return 0.0, time.perf_counter()
+        start = time.perf_counter(); changes = differ.update(rows); collected = time.perf_counter()
+        model.apply_changes(changes)
+        return collected - start, collected
+
+    table.refresh(); apply(table.rows()); app.processEvents()
+    # Una fila seleccionada, como cuando el usuario está mirando un proceso.
+    view.selectRow(3)
+    collector_s = apply_s = qt_s = 0.0
+    for _ in range(ticks):
+        source.tick(); table.refresh(); rows = table.rows()
+        start = time.perf_counter(); collected_s, gui_start = apply(rows)
+        if reset: gui_start = start
+        applied = time.perf_counter(); app.processEvents()
+        collector_s += collected_s; apply_s += applied - gui_start; qt_s += time.perf_counter() - applied
+    view.close()
+    return collector_s / ticks * 1000, apply_s / ticks * 1000, qt_s / ticks * 1000
+
+
+def run():
+    app = QApplication.instance() or QApplication([])
+    results = {}
+    for count in SCALES:
+        _, reset_apply, reset_qt = measure_ticks(app, count, reset=True)
+        collector, diff_apply, diff_qt = measure_ticks(app, count)
+        results[count] = {"reset_apply_ms": reset_apply, "reset_qt_ms": reset_qt, "reset_gui_ms": reset_apply + reset_qt,
+                          "diff_collector_ms": collector, "diff_apply_ms": diff_apply, "diff_qt_ms": diff_qt, "diff_gui_ms": diff_apply + diff_qt}
+    growth = results[SCALES[-1]]["diff_gui_ms"] / max(results[SCALES[0]]["diff_gui_ms"], 1e-6)
+    return {"scales": results, "diff_gui_growth": growth, "diff_gui_flat": growth <= FLAT_LIMIT}
+
+
+if __name__ == "__main__":
+    result = run()
+    print(f"{'procesos':>10} {'reinicio GUI (ms)':>18} {'diff apply/Qt = GUI (ms)':>30} {'diff colector (ms)':>19}")
+    for count, row in result["scales"].items():
+        print(f"{count:>10} {row['reset_gui_ms']:>18.3f} {row['diff_apply_ms']:>9.3f} / {row['diff_qt_ms']:<7.3f} = {row['diff_gui_ms']:<8.3f} {row['diff_collector_ms']:>19.3f}")
+    verdict = "plano" if result["diff_gui_flat"] else f"NO es plano (límite x{FLAT_LIMIT})"
+    print(f"Coste del diff en la GUI de {SCALES[0]} a {SCALES[-1]} procesos: x{result['diff_gui_growth']:.2f}, {verdict}")
@@ -0,0 +1,65 @@
+# AG_Optimizer/benchmarks/bench_process_table.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Coste por tick del top de procesos por RAM: implementación anterior (process_iter + sort
+completo en cada tick) frente a la ProcessTable incremental con heapq.nlargest.
+
+Uso: python -m benchmarks.bench_process_table
+"""
+
+import time
+from collections import defaultdict
+import psutil
+
+from benchmarks.fake_psutil import FakePsutil
+from services.system_service import ProcessTable
+
+SCALES = (200, 2_000, 10_000)
+TICKS = 20
+
+
+def legacy_top_processes(source, count=5):
+    """ Algoritmo original de SystemService.get_top_processes_by_ram. """
+    process_map = defaultdict(lambda: {"rss": 0})
+    for p in source.process_iter(['name', 'memory_info']):
+        try:
+            process_map[p.info['name']]['rss'] += p.info['memory_info'].rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return sorted(process_map.items(), key=lambda item: item[1]['rss'], reverse=True)[:count]
+
+
+def measure_ticks(source, tick_fn, ticks=TICKS):
+    """ Devuelve el coste medio por tick en milisegundos (sin contar la simulación). """
+    tick_fn()  # primer tick: carga inicial de la tabla
+    elapsed = 0.0
+    for _ in range(ticks):
+        source.tick()
+        start = time.perf_counter(); tick_fn(); elapsed += time.perf_counter() - start
+    return elapsed / ticks * 1000
+
+
+def run():
+    results = {}
+    for count in SCALES:
+        legacy_source = FakePsutil(count)
+        legacy_ms = measure_ticks(legacy_source, lambda: legacy_top_processes(legacy_source, 5))
+        table_source = FakePsutil(count); table = ProcessTable(table_source)
+        table_ms = measure_ticks(table_source, lambda: (table.refresh(), table.top_by_name(5)))
+        results[count] = {"legacy_ms": legacy_ms, "process_table_ms": table_ms}
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'procesos':>10} {'anterior (ms)':>15} {'ProcessTable (ms)':>19}")
+    for count, row in run().items():
+        print(f"{count:>10} {row['legacy_ms']:>15.3f} {row['process_table_ms']:>19.3f}")
+
+    table = ProcessTable(); table.refresh()
+    start = time.perf_counter(); table.refresh(); table.top_by_name(5)
+    table_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter(); legacy_top_processes(psutil, 5)
+    legacy_ms = (time.perf_counter() - start) * 1000
+    print(f"\nEsta máquina ({len(table.entries)} procesos reales): anterior {legacy_ms:.3f} ms, ProcessTable {table_ms:.3f} ms")
@@ -0,0 +1,87 @@
+# AG_Optimizer/benchmarks/bench_progress_paint.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Coste de pintar CircularProgressBar: paintEvent original (gradiente, plumas, fuentes y
+anillo de fondo rehechos en cada repintado) frente a la capa estática cacheada. También
+cuenta cuántos repintados provoca una serie de lecturas de CPU con decimales.
+
+Uso: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_progress_paint
+"""
+
+import os
+import time
+import random
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt, QRectF, QPointF
+from PySide6.QtGui import QPainter, QPen, QColor, QConicalGradient, QFont, QPixmap
+
+from views.custom_widgets import CircularProgressBar
+
+FRAMES = 500
+READINGS = 300
+
+
+class LegacyCircularProgressBar(CircularProgressBar):
+    """ paintEvent y setValue originales, para comparar. """
+    def setValue(self, value): self._value = value; self.update()
+    def paintEvent(self, event):
+        self.paints = getattr(self, "paints", 0) + 1
+        w, h = self.width(), self.height(); side = min(w, h); painter = QPainter(self); painter.setRenderHint(QPainter.Antialiasing)
+        gradient = QConicalGradient(QPointF(side/2, side/2), -90); gradient.setColorAt(0, self.color1); gradient.setColorAt(1, self.color2)
+        painter.setPen(QPen(QColor("#2A2A2A"), 14, Qt.SolidLine, Qt.FlatCap)); painter.drawArc(QRectF(12, 12, side - 24, side - 24), 0, 360 * 16)
+        painter.setPen(QPen(gradient, 14, Qt.SolidLine, Qt.RoundCap))
+        angle = self._value * 3.6; painter.drawArc(QRectF(12, 12, side - 24, side - 24), 90 * 16, int(-angle * 16))
+        painter.setPen(QColor("#E0E0E0")); painter.setFont(QFont("Inter", 26, QFont.Bold)); painter.drawText(QRectF(0,0,side,side), Qt.AlignCenter, f"{int(self._value)}%")
+        painter.setPen(QColor("#8E8E8E")); painter.setFont(QFont("Inter", 11, QFont.Medium)); painter.drawText(QRectF(0, 35, side, side), Qt.AlignCenter, self.title)
+
+
+class CountingCircularProgressBar(CircularProgressBar):
+    def paintEvent(self, event):
+        self.paints = getattr(self, "paints", 0) + 1
+        super().paintEvent(event)
+
+
+def paint_cost_ms(widget, frames=FRAMES):
+    """ Tiempo medio de paintEvent renderizando fuera de pantalla con valores cambiantes. """
+    target = QPixmap(widget.size() * widget.devicePixelRatioF()); target.setDevicePixelRatio(widget.devicePixelRatioF())
+    widget.render(target)  # primer pintado: construye la caché
+    start = time.perf_counter()
+    for frame in range(frames):
+        widget._set_animated_value(frame % 100)
+        widget.render(target)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def repaints_for_readings(app, widget, readings):
+    widget.show(); app.processEvents(); widget.paints = 0
+    for value in readings:
+        widget.setValue(value); app.processEvents()
+    return widget.paints
+
+
+def run(frames=FRAMES, readings=READINGS):
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(7)
+    # Lecturas de CPU realistas: ruido de décimas alrededor de un valor que cambia poco.
+    values = [min(max(30 + rng.gauss(0, 0.4), 0), 100) for _ in range(readings)]
+    results = {}
+    for name, widget_class in (("legacy", LegacyCircularProgressBar), ("cached", CountingCircularProgressBar)):
+        widget = widget_class("Uso de CPU", "#7F5AF0", "#9D82F2"); widget.resize(220, 220)
+        if widget_class is CountingCircularProgressBar: widget.animated = False
+        results[f"{name}_paint_ms"] = paint_cost_ms(widget, frames)
+        results[f"{name}_repaints"] = repaints_for_readings(app, widget, values)
+        widget.close()
+    results["readings"] = readings
+    return results
+
+
+if __name__ == "__main__":
+    result = run()
+    print(f"Pintado de CircularProgressBar (media de {FRAMES} fotogramas, plataforma {os.environ['QT_QPA_PLATFORM']})")
+    print(f"  antes:   {result['legacy_paint_ms']:.3f} ms por pintado, {result['legacy_repaints']} repintados para {result['readings']} lecturas")
+    print(f"  después: {result['cached_paint_ms']:.3f} ms por pintado, {result['cached_repaints']} repintados para {result['readings']} lecturas")
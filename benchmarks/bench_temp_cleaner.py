@@ -0,0 +1,61 @@
+# AG_Optimizer/benchmarks/bench_temp_cleaner.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Coste de TempCleaner sobre árboles generados de 10.000 y 100.000 archivos pequeños,
+repartidos en carpetas de primer nivel (las que se reparten entre los hilos).
+
+Dos pasadas por escala: un recorrido en el que todos los archivos son recientes y no se
+borra nada (el caso habitual en una carpeta temporal en uso) y una limpieza completa.
+No se cuenta el tiempo de generar el árbol.
+
+Uso: python -m benchmarks.bench_temp_cleaner
+"""
+
+import os
+import time
+import tempfile
+
+from services.optimization_service import TempCleaner
+
+SCALES = (10_000, 100_000)
+TOP_DIRS = 50
+FILES_PER_DIR = 100
+FILE_SIZE = 512
+
+
+def make_tree(root, files):
+    """ TOP_DIRS carpetas con subcarpetas de FILES_PER_DIR archivos cada una. """
+    payload = b"x" * FILE_SIZE; created = set()
+    for index in range(files):
+        directory = os.path.join(root, f"top{index % TOP_DIRS:03d}", f"sub{index // (TOP_DIRS * FILES_PER_DIR):04d}")
+        if directory not in created: os.makedirs(directory); created.add(directory)
+        with open(os.path.join(directory, f"f{index}.tmp"), 'wb') as f:
+            f.write(payload)
+
+
+def clean(root, min_age_minutes, workers):
+    """ Ejecuta el TempCleaner en este hilo; devuelve (ms, archivos borrados). """
+    cleaner = TempCleaner(root, min_age_minutes=min_age_minutes, max_workers=workers)
+    start = time.perf_counter(); cleaner.run()
+    return (time.perf_counter() - start) * 1000, cleaner.files_removed
+
+
+def run(scales=SCALES, workers=4):
+    results = {}
+    for files in scales:
+        with tempfile.TemporaryDirectory(prefix="bench-temp-") as root:
+            make_tree(root, files)
+            scan_ms, kept_removed = clean(root, 60, workers)
+            # Con una antigüedad mínima negativa el corte queda en el futuro: todo cuenta como viejo.
+            clean_ms, removed = clean(root, -1, workers)
+        assert kept_removed == 0 and removed == files
+        results[files] = {"scan_ms": scan_ms, "clean_ms": clean_ms, "files_per_s": files / (clean_ms / 1000)}
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'archivos':>10} {'recorrido (ms)':>16} {'limpieza (ms)':>15} {'archivos/s':>12}")
+    for files, row in run().items():
+        print(f"{files:>10} {row['scan_ms']:>16.1f} {row['clean_ms']:>15.1f} {row['files_per_s']:>12.0f}")
@@ -0,0 +1,79 @@
+# AG_Optimizer/benchmarks/bench_theme_switch.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Coste de cambiar de tema: generar la hoja con get_app_stylesheet y aplicarla con
+setStyleSheet a una ventana con los widgets de la aplicación (barra lateral, anillos,
+tabla de procesos, calendario, ajustes y reproductor), incluido el repintado.
+
+La ventana se monta con los widgets sueltos y no con AGOptimizerApp para no arrancar
+los servicios (colector, multimedia, programador) durante la medida. Las páginas de notas
+usan una base de datos temporal, no la notes.db del usuario.
+
+Uso: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_theme_switch
+"""
+
+import os
+import time
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QWidget, QFrame, QHBoxLayout, QVBoxLayout, QGridLayout, QTableView
+
+from benchmarks.fake_psutil import FakePsutil
+from helpers.style_helper import get_app_stylesheet
+from services.notes_store import get_notes_store, close_notes_store
+from services.process_list import ProcessListDiffer
+from services.system_service import ProcessTable
+from views.custom_widgets import NavButton, CircularProgressBar, MediaPlayerWidget
+from views.page_widgets import CalendarPage, SettingsPage
+from views.process_model import ProcessTableModel
+
+SWITCHES = 20
+PROCESSES = 500
+
+
+def build_window():
+    window = QWidget(); layout = QHBoxLayout(window)
+    sidebar = QFrame(objectName="sidebar"); sidebar_layout = QVBoxLayout(sidebar); layout.addWidget(sidebar)
+    for icon, text in (("layout-dashboard", "Dashboard"), ("shield-check", "Optimización"), ("notebook-pen", "Notas Rápidas"),
+                       ("calendar-days", "Calendario"), ("sliders-horizontal", "Ajustes")):
+        sidebar_layout.addWidget(NavButton(f"resources/icons/{icon}.svg", text))
+    content = QVBoxLayout(); layout.addLayout(content, 1); grid = QGridLayout(); content.addLayout(grid, 1)
+    for column, title in enumerate(("Uso de CPU", "Uso de RAM")):
+        card = QFrame(objectName="card"); QVBoxLayout(card).addWidget(CircularProgressBar(title, "#7F5AF0", "#9D82F2")); grid.addWidget(card, 0, column)
+    source = FakePsutil(PROCESSES); table = ProcessTable(source); table.refresh()
+    differ = ProcessListDiffer(); model = ProcessTableModel(window, differ); model.apply_changes(differ.update(table.rows()))
+    view = QTableView(); view.setModel(model); grid.addWidget(view, 1, 0)
+    grid.addWidget(CalendarPage(theme="dark"), 1, 1); grid.addWidget(SettingsPage(config={"theme": "dark"}), 2, 0)
+    content.addWidget(MediaPlayerWidget())
+    window.resize(1280, 800)
+    return window
+
+
+def run(switches=SWITCHES):
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory(prefix="bench-theme-") as directory:
+        # Se abre antes que CalendarPage, que luego recibe este mismo almacén compartido.
+        get_notes_store({"notes_store": {"path": os.path.join(directory, "notes.db")}})
+        try:
+            window = build_window(); window.setStyleSheet(get_app_stylesheet("dark")); window.show(); app.processEvents()
+            generate_s = apply_s = 0.0
+            for index in range(switches):
+                theme = "light" if index % 2 == 0 else "dark"
+                start = time.perf_counter(); stylesheet = get_app_stylesheet(theme)
+                generated = time.perf_counter(); window.setStyleSheet(stylesheet); app.processEvents()
+                generate_s += generated - start; apply_s += time.perf_counter() - generated
+            widgets = len(window.findChildren(QWidget)); window.close()
+        finally:
+            close_notes_store()
+    return {"widgets": widgets, "stylesheet_ms": generate_s / switches * 1000, "apply_ms": apply_s / switches * 1000}
+
+
+if __name__ == "__main__":
+    result = run()
+    print(f"Cambio de tema con {result['widgets']} widgets (media de {SWITCHES} cambios)")
+    print(f"  get_app_stylesheet:          {result['stylesheet_ms']:.3f} ms")
+    print(f"  setStyleSheet + repintado:   {result['apply_ms']:.3f} ms")
@@ -0,0 +1,81 @@
+# AG_Optimizer/benchmarks/fake_psutil.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Fuente de procesos sintética con la misma API que psutil (pids, Process, process_iter).
+Permite medir el coste por tick con cualquier número de procesos sin depender de la máquina.
+"""
+
+import random
+from collections import namedtuple
+from contextlib import contextmanager
+import psutil
+
+MemInfo = namedtuple("MemInfo", ["rss", "vms"])
+
+_NAMES = ["chrome.exe", "code.exe", "python.exe", "svchost.exe", "explorer.exe", "spotify.exe",
+          "firefox", "bash", "systemd", "postgres", "node", "java", "dockerd", "Xorg", "pipewire"]
+
+
+class FakeProcess:
+    def __init__(self, source, pid):
+        self._source = source
+        self.pid = pid
+        self.info = {}
+        self._create_time = source.table[pid][0]
+
+    def _row(self):
+        row = self._source.table.get(self.pid)
+        if row is None: raise psutil.NoSuchProcess(self.pid)
+        return row
+
+    @contextmanager
+    def oneshot(self):
+        yield
+
+    def is_running(self):
+        row = self._source.table.get(self.pid)
+        return row is not None and row[0] == self._create_time
+
+    def create_time(self): return self._row()[0]
+    def name(self): return self._row()[1]
+    def exe(self): return "/usr/bin/" + self._row()[1]
+    def memory_info(self): return MemInfo(self._row()[2], 0)
+
+
+class FakePsutil:
+    """ Simula 'count' procesos; cada llamada a tick() mata y crea una fracción 'churn' de ellos. """
+
+    def __init__(self, count, churn=0.01, seed=1234):
+        self._rng = random.Random(seed)
+        self._next_pid = 1
+        self._clock = 1_000_000.0
+        self.churn = churn
+        self.table = {}
+        for _ in range(count): self._spawn()
+
+    def _spawn(self):
+        pid = self._next_pid; self._next_pid += 1
+        self.table[pid] = [self._clock, self._rng.choice(_NAMES), self._rng.randint(1, 2048) * 1024 * 1024]
+
+    def tick(self):
+        self._clock += 2.0
+        victims = self._rng.sample(list(self.table), int(len(self.table) * self.churn))
+        for pid in victims:
+            del self.table[pid]; self._spawn()
+        for row in self.table.values():
+            row[2] += self._rng.randint(-4096, 4096) * 1024
+
+    def pids(self):
+        return list(self.table)
+
+    def Process(self, pid):
+        if pid not in self.table: raise psutil.NoSuchProcess(pid)
+        return FakeProcess(self, pid)
+
+    def process_iter(self, attrs=None):
+        for pid in list(self.table):
+            proc = FakeProcess(self, pid)
+            proc.info = {"name": proc.name(), "memory_info": proc.memory_info()}
+            yield proc
@@ -0,0 +1,132 @@
+# AG_Optimizer/benchmarks/run_suite.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Ejecuta los benchmarks sin pantalla, guarda los resultados en JSON y, si se indica una
+referencia, marca las regresiones.
+
+Uso:
+  python -m benchmarks.run_suite                                  # todos, a bench_results.json
+  python -m benchmarks.run_suite --only process_table theme_switch
+  python -m benchmarks.run_suite --output base.json               # guardar una referencia
+  python -m benchmarks.run_suite --baseline base.json             # comparar (sale con 1 si hay regresiones)
+
+Solo se comparan las métricas de tiempo en ms ("apply_ms", "legacy_ms_per_keystroke"...):
+una métrica empeora si supera a la referencia en más de --threshold (proporción) y en más
+de --min-delta-ms, para que el ruido de las medidas de microsegundos no cuente como regresión.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import importlib
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Nombre en los resultados -> módulo con una función run() que devuelve un dict de métricas.
+BENCHMARKS = {
+    "process_table": "benchmarks.bench_process_table",
+    "process_model": "benchmarks.bench_process_model",
+    "temp_cleaner": "benchmarks.bench_temp_cleaner",
+    "config_save": "benchmarks.bench_config_save",
+    "progress_paint": "benchmarks.bench_progress_paint",
+    "theme_switch": "benchmarks.bench_theme_switch",
+    "alerts": "benchmarks.bench_alerts",
+}
+OUTPUT_PATH = "bench_results.json"
+THRESHOLD = 0.20
+MIN_DELTA_MS = 0.05
+
+
+def environment():
+    """ Datos de la máquina que se guardan con los resultados para saber si son comparables. """
+    from PySide6 import __version__ as pyside_version
+    return {"python": platform.python_version(), "pyside6": pyside_version, "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count(), "qpa": os.environ.get("QT_QPA_PLATFORM")}
+
+
+def run_suite(names=None):
+    """ Ejecuta los benchmarks pedidos (todos por defecto) y devuelve el documento de resultados. """
+    results, timings = {}, {}
+    for name in names or BENCHMARKS:
+        print(f"- {name}...", flush=True)
+        start = time.perf_counter()
+        results[name] = importlib.import_module(BENCHMARKS[name]).run()
+        timings[name] = time.perf_counter() - start
+    return {"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(),
+            "duration_s": timings, "results": results}
+
+
+def flatten(results, prefix=""):
+    """ {"a": {10: {"x_ms": 1}}} -> {"a.10.x_ms": 1}; las claves numéricas pasan a texto, como en JSON. """
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict): flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool): flat[path] = value
+    return flat
+
+
+def is_timing(metric):
+    name = metric.rsplit(".", 1)[-1]
+    return name.endswith("_ms") or "_ms_" in name
+
+
+def compare(current, baseline, threshold=THRESHOLD, min_delta_ms=MIN_DELTA_MS):
+    """ Lista de (métrica, referencia, actual, cambio relativo) de los tiempos que empeoraron. """
+    current_flat, baseline_flat = flatten(current["results"]), flatten(baseline["results"])
+    regressions = []
+    for metric, value in current_flat.items():
+        reference = baseline_flat.get(metric)
+        if not is_timing(metric) or reference is None: continue
+        if value - reference > min_delta_ms and value > reference * (1 + threshold):
+            regressions.append((metric, reference, value, value / reference - 1 if reference else float("inf")))
+    return regressions
+
+
+def print_comparison(current, baseline, regressions):
+    current_flat, baseline_flat = flatten(current["results"]), flatten(baseline["results"])
+    flagged = {metric for metric, *_ in regressions}
+    print(f"\n{'métrica':<52} {'referencia':>12} {'actual':>12} {'cambio':>9}")
+    for metric, value in current_flat.items():
+        reference = baseline_flat.get(metric)
+        if not is_timing(metric) or reference is None: continue
+        change = f"{(value / reference - 1) * 100:+.1f} %" if reference else "-"
+        print(f"{metric:<52} {reference:>12.3f} {value:>12.3f} {change:>9}{'  REGRESIÓN' if metric in flagged else ''}")
+    if baseline.get("environment") != current["environment"]:
+        print("\nADVERTENCIA: la referencia se midió en otro entorno; las diferencias pueden no ser del código.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de AG, Optimizer")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="ejecutar solo estos benchmarks")
+    parser.add_argument("--output", default=OUTPUT_PATH, help=f"JSON de resultados (por defecto {OUTPUT_PATH})")
+    parser.add_argument("--baseline", help="JSON de referencia con el que comparar")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="empeoramiento relativo tolerado (0.20 = 20 %%)")
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS, help="diferencia mínima en ms para marcar una regresión")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f: baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"No se pudo leer la referencia {args.baseline}: {e}"); return 2
+
+    current = run_suite(args.only)
+    with open(args.output, 'w', encoding='utf-8') as f: json.dump(current, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+    if baseline is None: return 0
+
+    regressions = compare(current, baseline, args.threshold, args.min_delta_ms)
+    print_comparison(current, baseline, regressions)
+    print(f"\n{len(regressions)} regresiones" if regressions else "\nSin regresiones.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# AG_Optimizer/headless.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Modo colector sin pantalla: python main.py --headless
+
+Muestrea el sistema con SystemService (sin importar PySide6), escribe cada muestra como
+una línea JSON en stdout o en un archivo y, opcionalmente, sirve las últimas métricas en
+formato de texto de Prometheus en http://127.0.0.1:<puerto>/metrics.
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+
+from helpers.config_helper import get_section
+from services.system_service import SystemService
+
+DEFAULT_SETTINGS = {
+    "interval_s": 10,
+    "output": "-",
+    "top": 5,
+    "process_grouping": "auto",
+    "prometheus_host": "127.0.0.1",
+    "prometheus_port": 0,
+}
+
+
+def parse_args(argv):
+    settings = get_section("headless", DEFAULT_SETTINGS)
+    parser = argparse.ArgumentParser(prog="main.py --headless", description="Colector de métricas de AG, Optimizer sin interfaz gráfica.")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--interval", type=float, default=settings["interval_s"], help="segundos entre muestras")
+    parser.add_argument("--output", default=settings["output"], help="archivo JSON-lines de salida ('-' para stdout)")
+    parser.add_argument("--top", type=int, default=settings["top"], help="procesos con más RAM por muestra (0 para no enumerarlos)")
+    parser.add_argument("--grouping", choices=SystemService.GROUPING_MODES, default=settings["process_grouping"])
+    parser.add_argument("--prometheus-host", default=settings["prometheus_host"])
+    parser.add_argument("--prometheus-port", type=int, default=settings["prometheus_port"], help="puerto de /metrics (0 para desactivar)")
+    return parser.parse_args(argv)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_prometheus(snapshot):
+    """ Convierte una SystemSnapshot al formato de exposición de texto de Prometheus. """
+    lines = []
+
+    def metric(name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    metric("ag_cpu_percent", "Uso total de CPU.", [({}, snapshot.cpu_percent)])
+    metric("ag_cpu_core_percent", "Uso de CPU por núcleo lógico.",
+           [({"core": core}, value) for core, value in enumerate(snapshot.cpu_per_core)])
+    metric("ag_ram_percent", "Uso de RAM.", [({}, snapshot.ram_percent)])
+    metric("ag_swap_percent", "Uso de swap.", [({}, snapshot.swap_percent)])
+    metric("ag_disk_read_bytes_per_second", "Bytes leídos por segundo.", [({"disk": d.name}, d.read_bytes_per_s) for d in snapshot.disks])
+    metric("ag_disk_write_bytes_per_second", "Bytes escritos por segundo.", [({"disk": d.name}, d.write_bytes_per_s) for d in snapshot.disks])
+    metric("ag_disk_read_iops", "Lecturas por segundo.", [({"disk": d.name}, d.read_iops) for d in snapshot.disks])
+    metric("ag_disk_write_iops", "Escrituras por segundo.", [({"disk": d.name}, d.write_iops) for d in snapshot.disks])
+    metric("ag_network_receive_bytes_per_second", "Bytes recibidos por segundo.", [({"nic": n.name}, n.rx_bytes_per_s) for n in snapshot.nics])
+    metric("ag_network_transmit_bytes_per_second", "Bytes enviados por segundo.", [({"nic": n.name}, n.tx_bytes_per_s) for n in snapshot.nics])
+    metric("ag_network_receive_packets_per_second", "Paquetes recibidos por segundo.", [({"nic": n.name}, n.rx_packets_per_s) for n in snapshot.nics])
+    metric("ag_network_transmit_packets_per_second", "Paquetes enviados por segundo.", [({"nic": n.name}, n.tx_packets_per_s) for n in snapshot.nics])
+    metric("ag_top_memory_bytes", "Memoria de los mayores consumidores.",
+           [({"group": name}, data["rss"]) for name, data in snapshot.top_processes])
+    return "\n".join(lines) + "\n"
+
+
+class HeadlessCollector:
+    def __init__(self, args):
+        self.args = args
+        self.service = SystemService(grouping=args.grouping)
+        self.latest = None
+
+    async def handle_http(self, reader, writer):
+        """ Servidor HTTP mínimo: solo responde a GET /metrics. """
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics" and self.latest is not None:
+                status, body = "200 OK", format_prometheus(self.latest).encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        server = None
+        if self.args.prometheus_port:
+            server = await asyncio.start_server(self.handle_http, self.args.prometheus_host, self.args.prometheus_port)
+        output = sys.stdout if self.args.output == "-" else open(self.args.output, "a", encoding="utf-8")
+        try:
+            next_tick = loop.time()
+            while True:
+                # El muestreo bloquea unos milisegundos; se hace en un hilo para no frenar /metrics.
+                self.latest = await asyncio.to_thread(self.service.sample, self.args.top)
+                output.write(json.dumps(self.latest.to_dict(), separators=(",", ":")) + "\n")
+                output.flush()
+                next_tick = max(next_tick + self.args.interval, loop.time())
+                await asyncio.sleep(next_tick - loop.time())
+        finally:
+            if server: server.close()
+            if output is not sys.stdout: output.close()
+
+
+def main(argv):
+    args = parse_args(argv)
+    try:
+        asyncio.run(HeadlessCollector(args).run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
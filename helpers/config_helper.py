@@ -6,11 +6,19 @@
 
 import json
 import os
+import time
+import atexit
+import tempfile
+import threading
+
+from helpers.diagnostics_helper import measure
 
 CONFIG_FILE = "config.json"
 
 def load_config():
     """ Carga la configuración desde config.json. Si no existe, devuelve un dict vacío. """
+    pending = _writer.pending()
+    if pending is not None: return pending
     if os.path.exists(CONFIG_FILE):
         try:
             with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
@@ -20,9 +28,137 @@ def load_config():
     return {}
 
 def save_config(config_data):
-    """ Guarda el diccionario de configuración en config.json. """
+    """ Guarda el diccionario de configuración en config.json de inmediato y de forma atómica. """
+    _writer.write_now(config_data)
+
+def save_config_deferred(config_data):
+    """
+    Programa el guardado de la configuración. Los cambios que llegan dentro de la ventana
+    de espera se agrupan en una sola escritura, que se hace en un hilo aparte.
+    """
+    _writer.schedule(config_data)
+
+def flush_config():
+    """ Escribe ya cualquier guardado pendiente (p. ej. al cerrar la aplicación). """
+    _writer.flush()
+
+def get_section(name, defaults, config=None):
+    """ Devuelve la sección 'name' de la configuración completada con los valores por defecto. """
+    if config is None: config = load_config()
+    section = dict(defaults)
+    section.update(config.get(name) or {})
+    return section
+
+
+def write_file_atomically(path, text):
+    """ Escribe en un temporal del mismo directorio, hace fsync y lo renombra sobre 'path'. """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=4)
-    except IOError as e:
-        print(f"Error al guardar la configuración: {e}")
\ No newline at end of file
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try: os.unlink(temp_path)
+        except OSError: pass
+        raise
+
+
+def _copy_config(value):
+    """ Copia la estructura (dicts y listas); las cadenas son inmutables y se comparten. """
+    if isinstance(value, dict): return {key: _copy_config(item) for key, item in value.items()}
+    if isinstance(value, list): return [_copy_config(item) for item in value]
+    return value
+
+
+class ConfigWriter:
+    """
+    Escritura diferida de config.json.
+
+    schedule() solo copia la estructura del dict en el hilo que llama; la serialización y
+    la escritura atómica ocurren en un hilo propio cuando pasan 'debounce_s' segundos sin
+    cambios (o, como mucho, 'max_delay_s' segundos desde el primer cambio pendiente).
+    """
+
+    def __init__(self, path=CONFIG_FILE, debounce_s=0.5, max_delay_s=3.0):
+        self.path = path
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self.writes = 0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._first_change = self._last_change = 0.0
+        self._thread = None
+        self._in_flight = False
+        # Cada versión lleva un número creciente para que una escritura vieja nunca pise a una nueva.
+        self._generation = 0
+        self._written_generation = 0
+
+    def pending(self):
+        with self._cond:
+            return None if self._pending is None else _copy_config(self._pending[1])
+
+    def schedule(self, config_data):
+        snapshot = _copy_config(config_data)
+        with self._cond:
+            now = time.monotonic()
+            if self._pending is None: self._first_change = now
+            self._generation += 1
+            self._pending = (self._generation, snapshot)
+            self._last_change = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ConfigWriter", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def write_now(self, config_data):
+        # Un guardado inmediato reemplaza a cualquier versión anterior pendiente.
+        with self._cond:
+            self._pending = None
+            self._generation += 1
+            generation = self._generation
+        self._write(generation, config_data)
+
+    def flush(self):
+        with self._cond:
+            pending, self._pending = self._pending, None
+            # Espera a que termine una escritura que el hilo tenga en curso.
+            self._cond.wait_for(lambda: not self._in_flight)
+        if pending is not None:
+            self._write(*pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                deadline = min(self._last_change + self.debounce_s, self._first_change + self.max_delay_s)
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                pending, self._pending = self._pending, None
+                self._in_flight = True
+            try:
+                self._write(*pending)
+            finally:
+                with self._cond:
+                    self._in_flight = False
+                    self._cond.notify_all()
+
+    def _write(self, generation, config_data):
+        with self._write_lock:
+            if generation < self._written_generation: return
+            try:
+                with measure("config.save"): write_file_atomically(self.path, json.dumps(config_data, indent=4))
+                self._written_generation = generation
+                self.writes += 1
+            except (IOError, OSError, TypeError, ValueError) as e:
+                print(f"Error al guardar la configuración: {e}")
+
+
+_writer = ConfigWriter()
+atexit.register(flush_config)
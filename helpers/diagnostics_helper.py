@@ -0,0 +1,146 @@
+# AG_Optimizer/helpers/diagnostics_helper.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Medidas del coste de la propia aplicación, para la página de diagnóstico.
+
+Cada medida es un Histogram de cubos fijos (memoria constante aunque la app pase días
+abierta). Se registra con el decorador @timed("nombre") o con el gestor de contexto
+measure("nombre").
+
+Se activa con python main.py --diagnostics o con "diagnostics": {"enabled": true} en
+config.json. Desactivado, measure() devuelve siempre el mismo objeto vacío y @timed deja
+la función tal cual; por eso enable() tiene que llamarse antes de importar los módulos
+con funciones decoradas (main.py lo hace antes de importar las vistas).
+"""
+
+import time
+import threading
+import functools
+from bisect import bisect_left
+
+DEFAULTS = {"enabled": False}
+# Límites superiores de los cubos en ms: 8 por década, de 10 µs a 100 s, más uno abierto al final.
+BUCKET_BOUNDS_MS = tuple(10 ** (exponent / 8) for exponent in range(-16, 41))
+
+_enabled = False
+_histograms = {}
+_registry_lock = threading.Lock()
+
+
+class Histogram:
+    """
+    Duraciones en ms agrupadas en BUCKET_BOUNDS_MS. Un percentil se da como el límite
+    superior de su cubo (como mucho un 33 % por encima del valor real), acotado por el máximo visto.
+    """
+    __slots__ = ("name", "counts", "count", "total_ms", "max_ms", "_lock")
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+            self.count = 0; self.total_ms = 0.0; self.max_ms = 0.0
+
+    def record(self, ms):
+        index = bisect_left(BUCKET_BOUNDS_MS, ms)
+        with self._lock:
+            self.counts[index] += 1; self.count += 1; self.total_ms += ms
+            if ms > self.max_ms: self.max_ms = ms
+
+    def stats(self, quantiles=(0.5, 0.95, 0.99)):
+        """ {"count", "mean_ms", "max_ms", "p50_ms", ...}; sin muestras solo trae "count". """
+        with self._lock:
+            counts, count, total_ms, max_ms = list(self.counts), self.count, self.total_ms, self.max_ms
+        if not count: return {"count": 0}
+        result = {"count": count, "mean_ms": total_ms / count, "max_ms": max_ms}
+        for quantile in quantiles:
+            # Rango de la muestra que cae en el percentil (1 = la más rápida).
+            rank, seen = max(1, round(quantile * count)), 0
+            for index, bucket in enumerate(counts):
+                seen += bucket
+                if seen >= rank: break
+            bound = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else max_ms
+            result[f"p{round(quantile * 100)}_ms"] = min(bound, max_ms)
+        return result
+
+
+class _NullMeasure:
+    """ Medida que no hace nada, para cuando el diagnóstico está desactivado. """
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc_info): return False
+
+
+_NULL_MEASURE = _NullMeasure()
+
+
+class _Measure:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.record((time.perf_counter_ns() - self.start) / 1e6)
+        return False
+
+
+def enable():
+    """ Activa el diagnóstico; las funciones decoradas antes de llamarlo no se miden. """
+    global _enabled
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def histogram(name):
+    """ El histograma 'name', creándolo la primera vez. """
+    found = _histograms.get(name)
+    if found is None:
+        with _registry_lock:
+            found = _histograms.setdefault(name, Histogram(name))
+    return found
+
+
+def histograms():
+    """ Copia del registro {nombre: Histogram}, en orden de creación. """
+    with _registry_lock:
+        return dict(_histograms)
+
+
+def reset_all():
+    for found in histograms().values(): found.reset()
+
+
+def measure(name):
+    """ Mide el bloque with measure("...") en el histograma 'name'. """
+    if not _enabled: return _NULL_MEASURE
+    return _Measure(histogram(name))
+
+
+def timed(name):
+    """ Decorador: mide cada llamada en el histograma 'name'. Desactivado, devuelve la función sin tocar. """
+    def decorate(function):
+        if not _enabled: return function
+        found = histogram(name)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                found.record((time.perf_counter_ns() - start) / 1e6)
+        return wrapper
+    return decorate
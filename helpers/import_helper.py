@@ -0,0 +1,42 @@
+# AG_Optimizer/helpers/import_helper.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+""" Importación diferida de dependencias pesadas, para no pagarlas durante el arranque. """
+
+import sys
+import importlib
+import importlib.util
+
+
+class LazyModule:
+    """
+    Se comporta como el módulo 'name', pero no lo importa hasta el primer acceso a uno de
+    sus atributos. import_module ya es seguro entre hilos, así que no hace falta cerrojo.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        # Solo se llama para atributos que no son de esta clase.
+        module = self._module
+        if module is None: module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name!r}{' (cargado)' if self._module is not None else ''}>"
+
+
+def lazy_module(name):
+    """ Módulo 'name' cargado en el primer uso. Si ya estaba importado se devuelve tal cual. """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_installed(name):
+    """ Comprueba si el paquete de primer nivel 'name' está instalado, sin importarlo. """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,261 @@
+# AG_Optimizer/helpers/trace_helper.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Trazado del arranque: python main.py --profile-startup [--profile-imports]
+
+Las fases del arranque se marcan con span() (gestor de contexto) o @traced (decorador).
+Los tramos se anidan por hilo y se miden con un reloj monótono. Los que se abren con
+begin() y se cierran más tarde, en otro punto del programa, quedan fuera del anidamiento. Al terminar el arranque,
+write_report() guarda un JSON en formato Chrome trace-event (chrome://tracing o
+https://ui.perfetto.dev) y un resumen de texto.
+
+Sin --profile-startup no se registra nada: span() devuelve siempre el mismo objeto vacío.
+Con --profile-imports se mide además cada importación de módulo (ejecución del módulo,
+incluidas las importaciones que haga a su vez).
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import importlib.abc
+
+TRACE_PATH = "startup_trace.json"
+SUMMARY_PATH = "startup_summary.txt"
+# Importaciones más lentas (tiempo propio) que se listan en el resumen.
+SLOWEST_IMPORTS = 15
+
+_tracer = None
+
+
+class _NullSpan:
+    """ Tramo que no hace nada, para cuando el trazado está desactivado. """
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc_info): return False
+    def end(self): pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Tramo medido. Uno 'detached' no entra en la pila de anidamiento del hilo: puede cerrarse
+    en cualquier orden sin desplazar la profundidad de los demás, y en la traza es asíncrono.
+    """
+    __slots__ = ("tracer", "name", "category", "args", "start", "tid", "depth", "detached")
+
+    def __init__(self, tracer, name, category, args, detached=False):
+        self.tracer, self.name, self.category, self.args = tracer, name, category, args
+        self.start = None; self.detached = detached
+
+    def begin(self):
+        stack = self.tracer.stack()
+        self.depth = len(stack)
+        if not self.detached: stack.append(self)
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def end(self):
+        if self.start is None: return
+        end = time.perf_counter_ns()
+        if not self.detached:
+            stack = self.tracer.stack()
+            if self in stack: stack.remove(self)
+        self.tracer.events.append((self.name, self.category, self.start, end, self.tid, self.depth, self.args, self.detached))
+        self.start = None
+
+    def __enter__(self): return self.begin()
+
+    def __exit__(self, *exc_info):
+        self.end()
+        return False
+
+
+class StartupTracer:
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.origin_wall = time.time()
+        # (nombre, categoría, inicio_ns, fin_ns, hilo, profundidad, args, suelto); list.append es atómico.
+        self.events = []
+        self.marks = []
+        self.thread_names = {}
+        self._local = threading.local()
+
+    def stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            self.thread_names[threading.get_ident()] = threading.current_thread().name
+        return stack
+
+    def chrome_trace(self):
+        """
+        Eventos en formato Chrome trace-event: "X" para tramos, "b"/"e" para los sueltos (que
+        no tienen por qué anidarse con los demás), "i" para marcas y "M" para nombres de hilo.
+        """
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in self.thread_names.items()]
+        for index, (name, category, start, end, tid, _, args, detached) in enumerate(self.events):
+            if detached:
+                common = {"name": name, "cat": category, "pid": pid, "tid": tid, "id": index}
+                events.append(dict(common, ph="b", ts=(start - self.origin) / 1000, args=args))
+                events.append(dict(common, ph="e", ts=(end - self.origin) / 1000))
+                continue
+            events.append({"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                           "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000, "args": args})
+        for name, moment, tid in self.marks:
+            events.append({"name": name, "cat": "startup", "ph": "i", "s": "g", "pid": pid, "tid": tid, "ts": (moment - self.origin) / 1000})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"started_at": self.origin_wall, "python_startup_ms": _python_startup_ms(self.origin_wall)}}
+
+    def summary(self):
+        """ Árbol de tramos por hilo (inicio y duración en ms) y, si se midieron, las importaciones más lentas. """
+        lines = []
+        python_ms = _python_startup_ms(self.origin_wall)
+        if python_ms is not None: lines.append(f"Arranque del intérprete hasta main.py: {python_ms:.1f} ms")
+        for name, moment, _ in self.marks:
+            lines.append(f"{name}: {(moment - self.origin) / 1e6:.1f} ms")
+        phases = sorted((event for event in self.events if event[1] != "import"), key=lambda event: (event[4] != threading.main_thread().ident, event[4], event[2]))
+        tid = None
+        for name, _, start, end, event_tid, depth, _, _ in phases:
+            if event_tid != tid:
+                tid = event_tid; lines.append(f"\n[{self.thread_names.get(tid, tid)}]")
+                lines.append(f"{'inicio':>9} {'duración':>10}")
+            lines.append(f"{(start - self.origin) / 1e6:>9.1f} {(end - start) / 1e6:>10.1f}  {'  ' * depth}{name}")
+        imports = [event for event in self.events if event[1] == "import"]
+        if imports:
+            lines.append(f"\nImportaciones más lentas (tiempo propio / total, ms) de {len(imports)} módulos:")
+            for name, self_ns, total_ns in _slowest_imports(imports)[:SLOWEST_IMPORTS]:
+                lines.append(f"{self_ns / 1e6:>9.1f} {total_ns / 1e6:>10.1f}  {name}")
+        return "\n".join(lines)
+
+
+def _slowest_imports(imports):
+    """ Tiempo propio de cada importación: su duración menos la de las importaciones anidadas. """
+    nested, open_imports = {}, {}
+    for name, _, start, end, tid, _, _, _ in sorted(imports, key=lambda event: (event[4], event[2])):
+        # Por hilo, la pila de importaciones abiertas en 'start'; la de arriba es la que contiene a esta.
+        stack = open_imports.setdefault(tid, [])
+        while stack and stack[-1][2] <= start: stack.pop()
+        if stack: nested[stack[-1][0]] = nested.get(stack[-1][0], 0) + (end - start)
+        stack.append((name, start, end))
+    rows = [(name[len("import "):], (end - start) - nested.get(name, 0), end - start) for name, _, start, end, _, _, _, _ in imports]
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+def _python_startup_ms(origin_wall):
+    """ Tiempo desde que se creó el proceso hasta enable(), si psutil puede decirlo. """
+    try:
+        import psutil
+        return (origin_wall - psutil.Process().create_time()) * 1000
+    except Exception:
+        return None
+
+
+class _TimedLoader:
+    """ Envuelve el cargador real y mide desde create_module() hasta el final de exec_module(). """
+
+    def __init__(self, loader, name, tracer):
+        self._loader, self._name, self._tracer = loader, name, tracer
+        self._span = None
+
+    def create_module(self, spec):
+        # En los módulos de extensión la carga de la biblioteca ocurre aquí, no en exec_module().
+        self._span = Span(self._tracer, f"import {self._name}", "import", {}).begin()
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # El módulo y cualquiera que lo inspeccione después deben ver el cargador original.
+        module.__loader__ = self._loader
+        if module.__spec__ is not None: module.__spec__.loader = self._loader
+        if self._span is None: self._span = Span(self._tracer, f"import {self._name}", "import", {}).begin()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            if self._span is not None: self._span.end()
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """ Primer buscador de sys.meta_path: delega en los demás y envuelve el cargador que encuentren. """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"): continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None: break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, name, self.tracer)
+        return spec
+
+
+def enable(trace_imports=False):
+    """ Activa el trazado; conviene llamarlo antes de importar PySide6 y las vistas. """
+    global _tracer
+    if _tracer is None: _tracer = StartupTracer()
+    if trace_imports and not any(isinstance(finder, _ImportTimer) for finder in sys.meta_path):
+        sys.meta_path.insert(0, _ImportTimer(_tracer))
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+def span(name, category="startup", **args):
+    """ Tramo medido como gestor de contexto (with span("...")) o abierto a mano con .begin()/.end(). """
+    if _tracer is None: return _NULL_SPAN
+    return Span(_tracer, name, category, args)
+
+
+def begin(name, category="startup", **args):
+    """ Abre un tramo suelto que se cierra más tarde con .end(), p. ej. desde otra función. """
+    if _tracer is None: return _NULL_SPAN
+    return Span(_tracer, name, category, args, detached=True).begin()
+
+
+def traced(name=None):
+    """ Decorador: mide cada llamada a la función como un tramo con su nombre cualificado. """
+    def decorate(function):
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _tracer is None: return function(*args, **kwargs)
+            with Span(_tracer, label, "startup", {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def mark(name):
+    """ Marca instantánea (p. ej. "primer pintado"). """
+    if _tracer is not None: _tracer.marks.append((name, time.perf_counter_ns(), threading.get_ident()))
+
+
+def write_report(trace_path=TRACE_PATH, summary_path=SUMMARY_PATH):
+    """ Guarda la traza y el resumen; devuelve el resumen, o None si el trazado está desactivado. """
+    if _tracer is None: return None
+    summary = _tracer.summary()
+    try:
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump(_tracer.chrome_trace(), f)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(summary + "\n")
+    except OSError as e:
+        print(f"No se pudo guardar la traza de arranque: {e}")
+    return summary
@@ -4,48 +4,94 @@
 
 import sys
 import os
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QTimer, Qt
-from PySide6.QtGui import QFontDatabase
-from views.splash_view import SplashScreen
-from views.main_window import AGOptimizerApp
-from views.onboarding_view import OnboardingWindow
-from helpers.config_helper import load_config
+import multiprocessing
+
+from helpers import trace_helper, diagnostics_helper
+from helpers.config_helper import get_section
+
+# El modo sin pantalla se resuelve antes de importar PySide6 para no cargar Qt en servidores.
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    from headless import main as headless_main
+    sys.exit(headless_main(sys.argv[1:]))
+
+# --profile-startup guarda una traza del arranque; --profile-imports añade el tiempo de cada importación.
+PROFILE_STARTUP = __name__ == "__main__" and bool({"--profile-startup", "--profile-imports"} & set(sys.argv[1:]))
+if PROFILE_STARTUP: trace_helper.enable(trace_imports="--profile-imports" in sys.argv[1:])
+
+# --diagnostics (o "diagnostics": {"enabled": true} en config.json) activa las medidas de la página
+# de diagnóstico; tiene que ser antes de importar las vistas, que se decoran al importarse.
+if __name__ == "__main__" and ("--diagnostics" in sys.argv[1:] or get_section("diagnostics", diagnostics_helper.DEFAULTS)["enabled"]):
+    diagnostics_helper.enable()
 
 if __name__ == "__main__":
+    # Necesario para los procesos del buscador de duplicados en ejecutables empaquetados.
+    multiprocessing.freeze_support()
+
+    # Dentro del bloque principal: los procesos 'spawn' del buscador de duplicados vuelven a
+    # importar este módulo y no deben cargar Qt ni las vistas.
+    with trace_helper.span("importar PySide6 y splash"):
+        from PySide6.QtWidgets import QApplication
+        from PySide6.QtCore import QTimer, Qt
+        from PySide6.QtGui import QFontDatabase
+        from views.splash_view import SplashScreen
+        from views.onboarding_view import OnboardingWindow
+        from helpers.config_helper import load_config
+
     # CORRECCIÓN 1: Esta configuración ahora se ejecuta ANTES de crear la aplicación.
     if hasattr(QApplication, 'setHighDpiScaleFactorRoundingPolicy'):
         QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
     
-    app = QApplication(sys.argv)
+    with trace_helper.span("QApplication"):
+        app = QApplication(sys.argv)
     
     # --- CARGA DE FUENTES PERSONALIZADAS ---
     font_dir = os.path.join("resources", "fonts")
     regular_font_path = os.path.join(font_dir, "Inter_18pt-Regular.ttf")
     bold_font_path = os.path.join(font_dir, "Inter_18pt-Bold.ttf")
     
-    if os.path.exists(regular_font_path) and os.path.exists(bold_font_path):
-        QFontDatabase.addApplicationFont(regular_font_path)
-        QFontDatabase.addApplicationFont(bold_font_path)
-    else:
-        print("ADVERTENCIA: No se encontraron los archivos de la fuente 'Inter' en 'resources/fonts/'. Se usará una fuente de sistema.")
+    with trace_helper.span("fuentes"):
+        if os.path.exists(regular_font_path) and os.path.exists(bold_font_path):
+            QFontDatabase.addApplicationFont(regular_font_path)
+            QFontDatabase.addApplicationFont(bold_font_path)
+        else:
+            print("ADVERTENCIA: No se encontraron los archivos de la fuente 'Inter' en 'resources/fonts/'. Se usará una fuente de sistema.")
     
-    config = load_config()
+    with trace_helper.span("load_config"):
+        config = load_config()
     main_win = None
 
     def launch_main_app():
         global main_win
         logo_path = os.path.join("resources", "logo.png")
-        splash = SplashScreen(logo_path)
-        splash.show()
+        # Tramo abierto mientras el splash está en pantalla (incluye su animación de entrada).
+        splash_span = trace_helper.begin("splash visible")
+        with trace_helper.span("SplashScreen"):
+            splash = SplashScreen(logo_path)
+            splash.show(); app.processEvents()
         
+        def on_first_paint():
+            splash.finish(main_win); splash_span.end()
+            # Tras esta vuelta del bucle ya ha terminado el trabajo diferido del primer pintado.
+            if PROFILE_STARTUP: QTimer.singleShot(0, report_startup)
+
         def show_main():
             global main_win
-            main_win = AGOptimizerApp()
+            # La ventana principal (y con ella los servicios) se importa con el splash ya en pantalla.
+            with trace_helper.span("importar ventana principal"):
+                from views.main_window import AGOptimizerApp
+            with trace_helper.span("AGOptimizerApp()"):
+                main_win = AGOptimizerApp()
+            main_win.first_painted.connect(on_first_paint)
             main_win.show()
-            splash.finish(main_win)
         
-        QTimer.singleShot(2000, show_main)
+        # El splash se cierra en cuanto la ventana principal se ha pintado, no tras un tiempo fijo.
+        QTimer.singleShot(0, show_main)
+
+    def report_startup():
+        print(trace_helper.write_report())
+        print(f"Traza guardada en {trace_helper.TRACE_PATH} y resumen en {trace_helper.SUMMARY_PATH}")
+        # Al salir se reescribe con lo medido después (p. ej. las páginas construidas en segundo plano).
+        app.aboutToQuit.connect(trace_helper.write_report)
 
     if config.get('onboarding_complete', False):
         launch_main_app()
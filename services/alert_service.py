@@ -0,0 +1,239 @@
+# AG_Optimizer/services/alert_service.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Alertas sobre las muestras del colector de métricas (bloque 'alerts' de config.json).
+
+Cada regla se compila una vez en un evaluador con estado de tamaño fijo, que se actualiza
+con cada muestra sin volver a mirar el historial:
+
+  Umbral sostenido:  {"metric": "ram_percent", "above": 90, "for_s": 30}
+      "below" en lugar de "above" para umbrales por abajo. "clear_at" añade histéresis: tras
+      disparar, la regla no se rearma hasta que el valor cruza ese nivel (por defecto el propio
+      umbral). "smoothing_s" compara una media móvil exponencial con esa constante de tiempo.
+  Crecimiento:       {"metric": "process_rss_mb", "process": "chrome", "grows_by": 500, "within_s": 300}
+      Dispara si el valor sube más de 'grows_by' dentro de la ventana de 'within_s' segundos.
+
+Métricas: las de METRICS y "process_rss_mb", la memoria (RSS) sumada de los procesos con ese
+nombre (sin distinguir mayúsculas ni la extensión .exe).
+
+Al disparar, la regla avisa con una notificación de escritorio ("notify", activado por defecto)
+y/o lanza una tarea del programador ("task", un nombre de TASK_FACTORIES; el resto de campos de
+la regla se pasan a la tarea, como "root" para disk_usage). "cooldown_s" es el tiempo mínimo
+entre dos disparos de la misma regla.
+"""
+
+import math
+from operator import attrgetter
+from PySide6.QtCore import QObject, Signal
+
+from helpers.config_helper import get_section
+from services.scheduler_service import ScheduledTask, TASK_FACTORIES
+
+DEFAULT_SETTINGS = {"enabled": True, "cooldown_s": 300, "rules": []}
+MB = 1024 * 1024
+
+
+def _disk_mb_per_s(snapshot):
+    if not snapshot.disks: return None
+    return sum(disk.read_bytes_per_s + disk.write_bytes_per_s for disk in snapshot.disks) / MB
+
+
+def _net_mb_per_s(snapshot):
+    if not snapshot.nics: return None
+    return sum(nic.rx_bytes_per_s + nic.tx_bytes_per_s for nic in snapshot.nics) / MB
+
+
+# Métrica -> (canal del colector que la trae, lectura de una SystemSnapshot, nombre para los avisos).
+# Una lectura devuelve None si la muestra no trae el dato; entonces la regla no se actualiza.
+METRICS = {
+    "cpu_percent": ("core", attrgetter("cpu_percent"), "CPU (%)"),
+    "ram_percent": ("core", attrgetter("ram_percent"), "RAM (%)"),
+    "swap_percent": ("core", attrgetter("swap_percent"), "Swap (%)"),
+    "disk_mb_per_s": ("io", _disk_mb_per_s, "Disco (MB/s)"),
+    "net_mb_per_s": ("io", _net_mb_per_s, "Red (MB/s)"),
+}
+PROCESS_METRIC = "process_rss_mb"
+
+
+def process_key(name):
+    name = name.lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+def process_totals(processes):
+    """ RSS en MB por nombre de proceso normalizado; se calcula una vez por muestra para todas las reglas. """
+    totals = {}
+    for process in processes:
+        key = process_key(process.name)
+        totals[key] = totals.get(key, 0) + process.rss
+    return {key: rss / MB for key, rss in totals.items()}
+
+
+class ThresholdEvaluator:
+    """ Valor por encima (o por debajo) de un umbral durante for_s segundos, con histéresis y EWMA opcionales. """
+    __slots__ = ("threshold", "above", "for_s", "clear_at", "smoothing_s", "since", "active", "smoothed", "last_time")
+
+    def __init__(self, threshold, above=True, for_s=0.0, clear_at=None, smoothing_s=0.0):
+        self.threshold, self.above, self.for_s, self.smoothing_s = threshold, above, for_s, smoothing_s
+        self.clear_at = threshold if clear_at is None else clear_at
+        if (self.clear_at > threshold) if above else (self.clear_at < threshold):
+            raise ValueError("'clear_at' tiene que quedar del lado normal del umbral")
+        # Desde cuándo se cumple la condición, si la regla ya disparó y el último valor suavizado.
+        self.since = None; self.active = False
+        self.smoothed = self.last_time = None
+
+    def update(self, now, value):
+        """ Devuelve True solo en la muestra en que la condición completa for_s segundos. """
+        if self.smoothing_s:
+            if self.smoothed is None: self.smoothed = value
+            else: self.smoothed += (1 - math.exp(-(now - self.last_time) / self.smoothing_s)) * (value - self.smoothed)
+            self.last_time = now; value = self.smoothed
+        if self.active:
+            if (value < self.clear_at) if self.above else (value > self.clear_at): self.active = False; self.since = None
+            return False
+        if not ((value > self.threshold) if self.above else (value < self.threshold)):
+            self.since = None
+            return False
+        if self.since is None: self.since = now
+        if now - self.since < self.for_s: return False
+        self.active = True
+        return True
+
+
+class GrowthEvaluator:
+    """
+    Subida de más de 'grows_by' dentro de 'within_s' segundos. La ventana se parte en BUCKETS
+    tramos que solo guardan su mínimo: el crecimiento es el valor actual menos el mínimo de la
+    ventana, con memoria fija y coste constante por muestra. La ventana real abarca entre
+    (BUCKETS - 1) y BUCKETS tramos. Tras disparar se empieza a medir de nuevo desde el valor actual.
+    Los tramos vacíos valen infinito, así min() no tiene que saltárselos.
+    """
+    BUCKETS = 10
+    __slots__ = ("grows_by", "bucket_s", "minimums", "bucket")
+
+    def __init__(self, grows_by, within_s):
+        if within_s <= 0: raise ValueError("'within_s' tiene que ser positivo")
+        self.grows_by, self.bucket_s = grows_by, within_s / self.BUCKETS
+        self.minimums = [math.inf] * self.BUCKETS; self.bucket = None
+
+    def update(self, now, value):
+        bucket = int(now // self.bucket_s)
+        if self.bucket is None or bucket - self.bucket >= self.BUCKETS:
+            self.minimums = [math.inf] * self.BUCKETS
+        else:
+            # Los tramos que se saltaron (sin muestras) salen de la ventana.
+            for skipped in range(self.bucket + 1, bucket + 1): self.minimums[skipped % self.BUCKETS] = math.inf
+        self.bucket = bucket; slot = bucket % self.BUCKETS
+        if value < self.minimums[slot]: self.minimums[slot] = value
+        if value - min(self.minimums) <= self.grows_by: return False
+        self.minimums = [math.inf] * self.BUCKETS; self.minimums[slot] = value
+        return True
+
+
+class AlertRule:
+    __slots__ = ("name", "options", "metric", "process", "channel", "read", "label", "evaluator", "notify", "task", "cooldown_s", "last_fired")
+
+    def __init__(self, options, cooldown_s=DEFAULT_SETTINGS["cooldown_s"]):
+        self.options = options; self.metric = options["metric"]; self.process = None
+        if self.metric == PROCESS_METRIC:
+            self.process = process_key(options["process"]); self.channel = "process_list"
+            self.read = None; self.label = f"Memoria de {options['process']} (MB)"
+        elif self.metric in METRICS:
+            self.channel, self.read, self.label = METRICS[self.metric]
+        else:
+            raise ValueError(f"Métrica desconocida: {self.metric!r}")
+        self.name = options.get("name") or self.label
+        if "grows_by" in options:
+            self.evaluator = GrowthEvaluator(float(options["grows_by"]), float(options["within_s"]))
+        elif "above" in options or "below" in options:
+            above = "above" in options
+            self.evaluator = ThresholdEvaluator(float(options["above" if above else "below"]), above, float(options.get("for_s", 0)),
+                                                options.get("clear_at"), float(options.get("smoothing_s", 0)))
+        else:
+            raise ValueError(f"La regla {self.name!r} necesita 'above', 'below' o 'grows_by'")
+        self.task = options.get("task")
+        if self.task is not None and self.task not in TASK_FACTORIES: raise ValueError(f"Tarea desconocida: {self.task!r}")
+        self.notify = options.get("notify", True)
+        self.cooldown_s = float(options.get("cooldown_s", cooldown_s))
+        self.last_fired = None
+
+    def describe(self, value):
+        options = self.options
+        if "grows_by" in options: return f"{self.label} subió más de {options['grows_by']} en {options['within_s']} s (ahora {value:.1f})"
+        condition = f"> {options['above']}" if "above" in options else f"< {options['below']}"
+        duration = f" durante {options['for_s']} s" if options.get("for_s") else ""
+        return f"{self.label} {condition}{duration} (ahora {value:.1f})"
+
+
+class AlertEngine:
+    """ Evalúa todas las reglas con cada muestra; no depende de Qt. """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.channels = frozenset(rule.channel for rule in self.rules)
+
+    def evaluate(self, snapshot):
+        """ Actualiza las reglas con 'snapshot' y devuelve los avisos de las que dispararon. """
+        totals = process_totals(snapshot.processes) if snapshot.processes and "process_list" in self.channels else None
+        return self.evaluate_rules(snapshot, totals)
+
+    def evaluate_rules(self, snapshot, totals=None):
+        """ Como evaluate(), con la memoria por proceso (process_totals) ya calculada. """
+        now = snapshot.timestamp; fired = []
+        for rule in self.rules:
+            if rule.process is not None: value = totals.get(rule.process) if totals is not None else None
+            else: value = rule.read(snapshot)
+            if value is None or not rule.evaluator.update(now, value): continue
+            if rule.last_fired is not None and now - rule.last_fired < rule.cooldown_s: continue
+            rule.last_fired = now
+            fired.append({"rule": rule.name, "message": rule.describe(value), "value": value, "wall_time": snapshot.wall_time,
+                          "notify": rule.notify, "task": rule.task})
+        return fired
+
+
+def compile_rules(settings):
+    """ Compila las reglas de la configuración; las que no son válidas se descartan con un aviso. """
+    rules = []
+    for options in settings["rules"]:
+        try:
+            rules.append(AlertRule(options, settings["cooldown_s"]))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Regla de alerta no válida en la configuración: {e}")
+    return rules
+
+
+class AlertService(QObject):
+    """
+    Conecta el AlertEngine al MetricsCollector como observador: las reglas se evalúan en el
+    hilo del colector con cada muestra, sin perder ninguna. alert_triggered llega al hilo de
+    la GUI; las tareas de las reglas se lanzan con el SchedulerService (una a la vez, con
+    prioridad baja y en su historial).
+    """
+    alert_triggered = Signal(dict)
+
+    def __init__(self, config=None, scheduler=None):
+        super().__init__()
+        self.settings = get_section("alerts", DEFAULT_SETTINGS, config)
+        self.scheduler = scheduler
+        self.engine = AlertEngine(compile_rules(self.settings) if self.settings["enabled"] else ())
+        self._rules_by_name = {rule.name: rule for rule in self.engine.rules}
+        # Método de este QObject para que el aviso llegue encolado al hilo de la GUI.
+        self.alert_triggered.connect(self._run_task)
+
+    def attach(self, collector):
+        """ Empieza a evaluar las muestras de 'collector', pidiéndole los canales que usan las reglas. """
+        if not self.engine.rules: return
+        collector.add_observer(self.evaluate)
+        collector.set_demand("alerts", self.engine.channels, background=True)
+
+    def evaluate(self, snapshot):
+        for alert in self.engine.evaluate(snapshot): self.alert_triggered.emit(alert)
+
+    def _run_task(self, alert):
+        rule = self._rules_by_name.get(alert["rule"])
+        if rule is None or rule.task is None or self.scheduler is None: return
+        if self.scheduler.running is not None:
+            print(f"La alerta {rule.name!r} no lanza la tarea {rule.task!r}: hay otra tarea en curso."); return
+        self.scheduler.run_task(ScheduledTask(dict(rule.options, name=f"{rule.name} (alerta)"), on_demand=True))
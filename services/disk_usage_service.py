@@ -0,0 +1,217 @@
+# AG_Optimizer/services/disk_usage_service.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Analizador de uso de disco.
+
+El resultado de cada análisis se guarda como un índice compacto: un árbol de directorios
+identificados por número (padre, nombre, mtime, bytes y archivos propios, y sus archivos
+más grandes). Al volver a analizar la misma carpeta, los directorios cuyo mtime no ha
+cambiado no se listan de nuevo: basta un stat por directorio para reutilizar sus datos.
+"""
+
+import os
+import json
+import time
+import heapq
+import hashlib
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from PySide6.QtCore import QRunnable
+
+from helpers.config_helper import get_section, write_file_atomically
+from services.optimization_service import WorkerSignals
+
+DEFAULT_SETTINGS = {"cache_dir": "disk_usage_cache", "workers": 8}
+INDEX_VERSION = 1
+
+
+class DiskUsageIndex:
+    """ Árbol de directorios con tamaños; el nodo 0 es la raíz analizada. """
+    TOP_FILES = 10
+
+    def __init__(self, root):
+        self.root = root
+        self.parents = array('q')
+        self.names = []
+        self.mtimes = array('d')
+        self.own_sizes = array('q')
+        self.own_counts = array('q')
+        self.top_files = []
+        self.total_sizes = array('q')
+        self.total_counts = array('q')
+        self.children = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, parent, name, mtime, own_size, own_count, top_files):
+        node = len(self.names)
+        self.parents.append(parent); self.names.append(name); self.mtimes.append(mtime)
+        self.own_sizes.append(own_size); self.own_counts.append(own_count); self.top_files.append(top_files)
+        self.total_sizes.append(own_size); self.total_counts.append(own_count); self.children.append([])
+        if parent >= 0: self.children[parent].append(node)
+        # Los totales de los antecesores se actualizan al momento para poder mostrar resultados parciales.
+        while parent >= 0:
+            self.total_sizes[parent] += own_size
+            self.total_counts[parent] += own_count
+            parent = self.parents[parent]
+        return node
+
+    def path(self, node):
+        parts = []
+        while node > 0:
+            parts.append(self.names[node]); node = self.parents[node]
+        return os.path.join(self.root, *reversed(parts))
+
+    def paths(self):
+        """ Diccionario ruta -> nodo de todo el índice. """
+        paths = [self.root] * len(self.names)
+        for node in range(1, len(self.names)):
+            # Los padres siempre tienen un identificador menor que sus hijos.
+            paths[node] = os.path.join(paths[self.parents[node]], self.names[node])
+        return {path: node for node, path in enumerate(paths)}
+
+    def largest_dirs(self, count):
+        nodes = heapq.nlargest(count, range(1, len(self.names)), key=self.total_sizes.__getitem__)
+        return [(self.path(node), self.total_sizes[node], self.total_counts[node]) for node in nodes]
+
+    def largest_files(self, count):
+        candidates = ((size, node, name) for node, files in enumerate(self.top_files) for size, name in files)
+        return [(os.path.join(self.path(node), name), size) for size, node, name in heapq.nlargest(count, candidates)]
+
+    def save(self, path):
+        rows = [[self.parents[i], self.names[i], self.mtimes[i], self.own_sizes[i], self.own_counts[i], self.top_files[i]]
+                for i in range(len(self.names))]
+        write_file_atomically(path, json.dumps({"version": INDEX_VERSION, "root": self.root, "dirs": rows}, separators=(",", ":")))
+
+    @classmethod
+    def load(cls, path, root):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get("version") != INDEX_VERSION or data.get("root") != root: return None
+        index = cls(root)
+        for parent, name, mtime, own_size, own_count, top_files in data["dirs"]:
+            index.add(parent, name, mtime, own_size, own_count, [tuple(item) for item in top_files])
+        return index
+
+
+def index_path_for(root, cache_dir):
+    digest = hashlib.sha1(root.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+class DiskUsageScanner(QRunnable):
+    """
+    Analiza 'root' en paralelo (una tarea por directorio en un ThreadPoolExecutor) y
+    publica resultados parciales por signals.progress. Al terminar emite el
+    DiskUsageIndex por signals.result y guarda el índice para el próximo análisis.
+    """
+
+    def __init__(self, root, cache_dir=None, max_workers=None, progress_interval_s=0.5, top_count=10):
+        super().__init__()
+        settings = get_section("disk_usage", DEFAULT_SETTINGS)
+        self.signals = WorkerSignals()
+        self.root = os.path.abspath(root)
+        self.cache_dir = cache_dir or settings["cache_dir"]
+        self.max_workers = max_workers or settings["workers"]
+        self.progress_interval_s = progress_interval_s
+        self.top_count = top_count
+        self.reused_dirs = 0
+        self._previous = None
+        self._previous_paths = {}
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            start = time.monotonic()
+            index_path = index_path_for(self.root, self.cache_dir)
+            self._previous = DiskUsageIndex.load(index_path, self.root)
+            if self._previous is not None: self._previous_paths = self._previous.paths()
+            self._root_device = os.stat(self.root).st_dev
+
+            index = self._scan(DiskUsageIndex(self.root))
+            if index is None:
+                self.signals.finished.emit("Análisis de disco cancelado.")
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            index.save(index_path)
+            self._emit_progress(index, done=True)
+            self.signals.result.emit(index)
+            elapsed = time.monotonic() - start
+            self.signals.finished.emit(
+                f"Análisis completado: {index.total_sizes[0] / (1024 * 1024):.1f} MB en {index.total_counts[0]} archivos "
+                f"({len(index)} carpetas, {self.reused_dirs} sin cambios) en {elapsed:.1f} s.")
+        except Exception as e:
+            self.signals.error.emit(f"Error al analizar el disco: {e}")
+
+    def _scan(self, index):
+        last_progress = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="DiskUsage") as pool:
+            pending = {pool.submit(self._scan_dir, self.root): (self.root, -1)}
+            while pending:
+                done, _ = wait(pending, timeout=self.progress_interval_s, return_when=FIRST_COMPLETED)
+                if self._cancelled.is_set():
+                    for future in pending: future.cancel()
+                    return None
+                for future in done:
+                    path, parent = pending.pop(future)
+                    try:
+                        scanned = future.result()
+                    except OSError:
+                        continue
+                    if scanned is None: continue
+                    mtime, own_size, own_count, top_files, child_names, reused = scanned
+                    self.reused_dirs += reused
+                    node = index.add(parent, path if parent < 0 else os.path.basename(path), mtime, own_size, own_count, top_files)
+                    for name in child_names:
+                        child_path = os.path.join(path, name)
+                        pending[pool.submit(self._scan_dir, child_path)] = (child_path, node)
+                now = time.monotonic()
+                if now - last_progress >= self.progress_interval_s:
+                    last_progress = now; self._emit_progress(index)
+        return index
+
+    def _scan_dir(self, path):
+        """ Se ejecuta en los hilos del grupo; no toca el índice nuevo. """
+        info = os.stat(path, follow_symlinks=False)
+        # No cruzamos a otros sistemas de archivos (p. ej. /proc al analizar /).
+        if info.st_dev != self._root_device: return None
+
+        previous_node = self._previous_paths.get(path)
+        if previous_node is not None and self._previous.mtimes[previous_node] == info.st_mtime:
+            previous = self._previous
+            child_names = [previous.names[child] for child in previous.children[previous_node]]
+            return (info.st_mtime, previous.own_sizes[previous_node], previous.own_counts[previous_node],
+                    previous.top_files[previous_node], child_names, True)
+
+        own_size = own_count = 0
+        top_files, child_names = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        child_names.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        size = entry.stat(follow_symlinks=False).st_size
+                        own_size += size; own_count += 1
+                        if len(top_files) < DiskUsageIndex.TOP_FILES: heapq.heappush(top_files, (size, entry.name))
+                        elif size > top_files[0][0]: heapq.heapreplace(top_files, (size, entry.name))
+                except OSError:
+                    continue
+        return (info.st_mtime, own_size, own_count, sorted(top_files, reverse=True), child_names, False)
+
+    def _emit_progress(self, index, done=False):
+        self.signals.progress.emit({
+            "done": done, "dirs": len(index), "files": index.total_counts[0] if len(index) else 0,
+            "bytes": index.total_sizes[0] if len(index) else 0, "reused_dirs": self.reused_dirs,
+            "largest_dirs": index.largest_dirs(self.top_count), "largest_files": index.largest_files(self.top_count),
+        })
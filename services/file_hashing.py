@@ -0,0 +1,45 @@
+# AG_Optimizer/services/file_hashing.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Funciones de hash que ejecutan los procesos del buscador de duplicados.
+
+Este módulo no importa PySide6 para que los procesos hijos arranquen rápido (en Windows
+cada proceso vuelve a importar el módulo). Los archivos se leen con mmap y el hash se
+calcula directamente sobre el mapa, sin copiar el contenido a buffers de Python.
+"""
+
+import mmap
+import hashlib
+
+EDGE_SIZE = 64 * 1024
+
+
+def _digest(path, head_and_tail):
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            h = hashlib.blake2b(digest_size=20)
+            with memoryview(mapped) as view:
+                if head_and_tail and len(view) > 2 * EDGE_SIZE:
+                    h.update(view[:EDGE_SIZE]); h.update(view[-EDGE_SIZE:])
+                else:
+                    h.update(view)
+            return h.hexdigest()
+
+
+def hash_edges(paths):
+    """ Hash de los primeros y últimos 64 KiB de cada ruta (None si no se pudo leer). """
+    return [_safe_digest(path, True) for path in paths]
+
+
+def hash_contents(paths):
+    """ Hash del contenido completo de cada ruta (None si no se pudo leer). """
+    return [_safe_digest(path, False) for path in paths]
+
+
+def _safe_digest(path, head_and_tail):
+    try:
+        return _digest(path, head_and_tail)
+    except (OSError, ValueError):
+        return None
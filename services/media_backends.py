@@ -0,0 +1,284 @@
+# AG_Optimizer/services/media_backends.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Backends del reproductor multimedia para MediaService.
+
+Todos funcionan por eventos sobre el bucle asyncio de MediaService: en lugar de consultar
+cada pocos segundos, se suscriben a los cambios de sesión y de propiedades del sistema y
+solo entonces leen el estado. Sin eventos, el bucle no se despierta.
+
+- WinRTMediaBackend: GlobalSystemMediaTransportControlsSessionManager de Windows.
+- MprisMediaBackend: reproductores MPRIS de Linux por D-Bus (requiere dbus-next).
+- FakeMediaBackend: backend en memoria para pruebas y benchmarks.
+"""
+
+import os
+import asyncio
+
+from helpers.import_helper import lazy_module, is_installed
+
+# Las librerías de cada plataforma se importan al arrancar el backend, ya en el hilo de
+# MediaService; aquí solo se comprueba que estén instaladas.
+WINRT_AVAILABLE = is_installed("pywinrt")
+DBUS_AVAILABLE = is_installed("dbus_next")
+media_control = lazy_module("pywinrt.windows.media.control")
+dbus_next = lazy_module("dbus_next")
+dbus_aio = lazy_module("dbus_next.aio")
+
+COMMANDS = ("play_pause", "next", "prev")
+# Valor de GlobalSystemMediaTransportControlsSessionPlaybackStatus.PLAYING
+WINRT_PLAYING = 4
+
+
+class MediaBackend:
+    """
+    Interfaz de un backend. start() se llama dentro del bucle de MediaService con una
+    función on_change(info) que recibe {"title", "artist", "is_playing"} o None si no hay
+    reproductor. Las subclases implementan read_state() y llaman a request_refresh()
+    desde sus eventos; las ráfagas de eventos se agrupan en una sola lectura.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.on_change = None
+        self._refresh_task = None
+        self._dirty = False
+
+    async def start(self, on_change):
+        self.loop = asyncio.get_running_loop()
+        self.on_change = on_change
+        self.request_refresh()
+
+    async def stop(self):
+        if self._refresh_task is not None: self._refresh_task.cancel()
+
+    async def read_state(self):
+        raise NotImplementedError
+
+    async def send(self, command):
+        raise NotImplementedError
+
+    def request_refresh(self):
+        """ Solo desde el hilo del bucle; desde otros hilos, usar request_refresh_threadsafe(). """
+        self._dirty = True
+        if self._refresh_task is None: self._refresh_task = self.loop.create_task(self._refresh())
+
+    def request_refresh_threadsafe(self):
+        self.loop.call_soon_threadsafe(self.request_refresh)
+
+    async def _refresh(self):
+        try:
+            while self._dirty:
+                self._dirty = False
+                try:
+                    info = await self.read_state()
+                except Exception as e:
+                    print(f"Error al leer el estado del reproductor: {e}")
+                    info = None
+                self.on_change(info)
+        finally:
+            self._refresh_task = None
+
+
+class WinRTMediaBackend(MediaBackend):
+    """ El gestor de sesiones se pide una sola vez; los eventos de WinRT llegan desde otros hilos. """
+
+    def __init__(self):
+        super().__init__()
+        self.manager = None
+        self.session = None
+        self._manager_token = None
+        self._session_tokens = ()
+
+    @staticmethod
+    def is_available():
+        return WINRT_AVAILABLE
+
+    async def start(self, on_change):
+        self.manager = await media_control.GlobalSystemMediaTransportControlsSessionManager.request_async()
+        await super().start(on_change)
+        self._manager_token = self.manager.add_current_session_changed(self._on_session_changed)
+        self._attach(self.manager.get_current_session())
+
+    async def stop(self):
+        self._attach(None)
+        if self._manager_token is not None: self.manager.remove_current_session_changed(self._manager_token)
+        await super().stop()
+
+    def _on_session_changed(self, sender, args):
+        self.loop.call_soon_threadsafe(self._session_changed)
+
+    def _session_changed(self):
+        self._attach(self.manager.get_current_session())
+        self.request_refresh()
+
+    def _attach(self, session):
+        if self.session is not None and self._session_tokens:
+            media_token, playback_token = self._session_tokens
+            self.session.remove_media_properties_changed(media_token)
+            self.session.remove_playback_info_changed(playback_token)
+        self.session, self._session_tokens = session, ()
+        if session is not None:
+            self._session_tokens = (session.add_media_properties_changed(self._on_session_event),
+                                    session.add_playback_info_changed(self._on_session_event))
+
+    def _on_session_event(self, sender, args):
+        self.request_refresh_threadsafe()
+
+    async def read_state(self):
+        session = self.session
+        if session is None: return None
+        info = await session.try_get_media_properties_async()
+        return {"artist": info.artist, "title": info.title,
+                "is_playing": session.get_playback_info().playback_status == WINRT_PLAYING}
+
+    async def send(self, command):
+        session = self.session
+        if session is None: return
+        if command == "play_pause": await session.try_toggle_play_pause_async()
+        elif command == "next": await session.try_skip_next_async()
+        elif command == "prev": await session.try_skip_previous_async()
+
+
+class MprisMediaBackend(MediaBackend):
+    """
+    Sigue a todos los reproductores MPRIS del bus de sesión mediante las señales
+    NameOwnerChanged y PropertiesChanged; el activo es el último que empezó a reproducir.
+    """
+    PREFIX = "org.mpris.MediaPlayer2."
+    PATH = "/org/mpris/MediaPlayer2"
+    PLAYER_INTERFACE = "org.mpris.MediaPlayer2.Player"
+    METHODS = {"play_pause": "PlayPause", "next": "Next", "prev": "Previous"}
+
+    def __init__(self):
+        super().__init__()
+        self.bus = None
+        # nombre conocido -> {"owner", "title", "artist", "status"}
+        self.players = {}
+        self._order = []
+
+    @staticmethod
+    def is_available():
+        return DBUS_AVAILABLE and bool(os.environ.get("DBUS_SESSION_BUS_ADDRESS"))
+
+    async def start(self, on_change):
+        # _on_message usa el bucle y on_change: las señales pueden llegar ya durante las llamadas
+        # al bus de abajo, antes de que super().start() pida la primera lectura.
+        self.loop = asyncio.get_running_loop(); self.on_change = on_change
+        self.bus = await dbus_aio.MessageBus(bus_type=dbus_next.BusType.SESSION).connect()
+        self.bus.add_message_handler(self._on_message)
+        for rule in (f"type='signal',interface='org.freedesktop.DBus.Properties',member='PropertiesChanged',path='{self.PATH}'",
+                     f"type='signal',interface='org.freedesktop.DBus',member='NameOwnerChanged',arg0namespace='{self.PREFIX.rstrip('.')}'"):
+            await self._call_bus("AddMatch", "s", [rule])
+        names = (await self._call_bus("ListNames")).body[0]
+        for name in names:
+            if name.startswith(self.PREFIX): await self._add_player(name)
+        await super().start(on_change)
+
+    async def stop(self):
+        if self.bus is not None: self.bus.disconnect()
+        await super().stop()
+
+    async def _call_bus(self, member, signature="", body=()):
+        return await self.bus.call(dbus_next.Message(destination="org.freedesktop.DBus", path="/org/freedesktop/DBus",
+                                                     interface="org.freedesktop.DBus", member=member, signature=signature, body=list(body)))
+
+    async def _add_player(self, name):
+        try:
+            owner = (await self._call_bus("GetNameOwner", "s", [name])).body[0]
+            reply = await self.bus.call(dbus_next.Message(destination=name, path=self.PATH, interface="org.freedesktop.DBus.Properties",
+                                                          member="GetAll", signature="s", body=[self.PLAYER_INTERFACE]))
+        except Exception as e:
+            print(f"No se pudo leer el reproductor {name}: {e}")
+            return
+        if reply.message_type != dbus_next.MessageType.METHOD_RETURN: return
+        self.players[name] = {"owner": owner, "title": "", "artist": "", "status": "Stopped"}
+        self._update(name, reply.body[0])
+
+    def _update(self, name, properties):
+        player = self.players[name]
+        if "Metadata" in properties:
+            metadata = properties["Metadata"].value
+            player["title"] = metadata["xesam:title"].value if "xesam:title" in metadata else ""
+            artists = metadata["xesam:artist"].value if "xesam:artist" in metadata else []
+            player["artist"] = ", ".join(artists) if isinstance(artists, list) else str(artists)
+        if "PlaybackStatus" in properties:
+            player["status"] = properties["PlaybackStatus"].value
+            if player["status"] == "Playing":
+                if name in self._order: self._order.remove(name)
+                self._order.append(name)
+
+    def _on_message(self, message):
+        if message.message_type != dbus_next.MessageType.SIGNAL: return None
+        if message.member == "NameOwnerChanged" and message.body[0].startswith(self.PREFIX):
+            name, _, new_owner = message.body
+            self.players.pop(name, None)
+            if name in self._order: self._order.remove(name)
+            if new_owner:
+                self.loop.create_task(self._add_player_and_refresh(name))
+            else:
+                self.request_refresh()
+        elif message.member == "PropertiesChanged" and message.body[0] == self.PLAYER_INTERFACE:
+            for name, player in self.players.items():
+                if player["owner"] == message.sender:
+                    self._update(name, message.body[1])
+                    self.request_refresh()
+        return None
+
+    async def _add_player_and_refresh(self, name):
+        await self._add_player(name)
+        self.request_refresh()
+
+    def active_player(self):
+        playing = [name for name in reversed(self._order) if self.players.get(name, {}).get("status") == "Playing"]
+        if playing: return playing[0]
+        if self._order and self._order[-1] in self.players: return self._order[-1]
+        return next(iter(self.players), None)
+
+    async def read_state(self):
+        name = self.active_player()
+        if name is None: return None
+        player = self.players[name]
+        return {"title": player["title"], "artist": player["artist"], "is_playing": player["status"] == "Playing"}
+
+    async def send(self, command):
+        name = self.active_player()
+        if name is None or command not in self.METHODS: return
+        await self.bus.call(dbus_next.Message(destination=name, path=self.PATH, interface=self.PLAYER_INTERFACE, member=self.METHODS[command]))
+
+
+class FakeMediaBackend(MediaBackend):
+    """ Reproductor simulado: set_state() puede llamarse desde cualquier hilo y send() queda registrado. """
+
+    def __init__(self, state=None):
+        super().__init__()
+        self.state = dict(state) if state else None
+        self.commands = []
+
+    @staticmethod
+    def is_available():
+        return True
+
+    def set_state(self, state):
+        def apply():
+            self.state = dict(state) if state else None
+            self.request_refresh()
+        self.loop.call_soon_threadsafe(apply)
+
+    async def read_state(self):
+        return dict(self.state) if self.state else None
+
+    async def send(self, command):
+        self.commands.append(command)
+        if command == "play_pause" and self.state:
+            self.state["is_playing"] = not self.state.get("is_playing")
+            self.request_refresh()
+
+
+def create_default_backend():
+    """ El backend nativo de la plataforma, o None si no hay ninguno disponible. """
+    for backend_class in (WinRTMediaBackend, MprisMediaBackend):
+        if backend_class.is_available(): return backend_class()
+    return None
@@ -2,74 +2,123 @@
 # -*- coding: utf-8 -*-
 # © 2025 Agustín Bahamondes. Todos los derechos reservados.
 
+"""
+Servicio del reproductor multimedia. Un QThread con su propio bucle asyncio donde vive el
+backend de la plataforma (services/media_backends.py); el backend avisa de cada cambio de
+sesión o de propiedades, así que sin eventos el hilo no se despierta.
+
+Los botones del reproductor envían sus comandos a ese mismo bucle con
+run_coroutine_threadsafe. Las pulsaciones que llegan mientras otro comando está en curso
+se agrupan: dos play/pause se anulan y los "siguiente"/"anterior" se suman.
+"""
+
+import time
 import asyncio
-from threading import Thread
+import threading
+from collections import deque
 from PySide6.QtCore import QObject, Signal, QThread
 
-try:
-    from pywinrt.windows.media.control import GlobalSystemMediaTransportControlsSessionManager as MediaManager
-    IS_AVAILABLE = True
-except ImportError:
-    IS_AVAILABLE = False
+from services.media_backends import create_default_backend
+from helpers.trace_helper import span
 
 class MediaService(QThread):
     media_changed = Signal(dict)
 
-    def __init__(self):
+    def __init__(self, backend=None):
         super().__init__()
         self.running = True
-        self.loop = None
+        self.backend = backend if backend is not None else create_default_backend()
+        # El bucle se crea aquí para que stop() pueda encolar la parada aunque run() no haya empezado.
+        self.loop = asyncio.new_event_loop()
+        self._stopped = asyncio.Event()
+        self._last_info = None
+        # Comandos pendientes: número de play/pause y saltos netos (+ siguiente, - anterior).
+        self._command_lock = threading.Lock()
+        self._pending_toggles = 0
+        self._pending_skips = 0
+        self._pending_since = None
+        self._draining = False
+        self.coalesced_commands = 0
+        self.latencies_ms = deque(maxlen=256)
 
-    async def _get_media_info(self):
-        if not IS_AVAILABLE: return None
-        try:
-            manager = await MediaManager.request_async()
-            session = manager.get_current_session()
-            if session:
-                info = await session.try_get_media_properties_async()
-                return {
-                    "artist": info.artist, "title": info.title,
-                    "is_playing": session.get_playback_info().playback_status == 3
-                }
-        except Exception: pass
-        return None
+    def _on_backend_change(self, info):
+        info = info or {}
+        if info != self._last_info:
+            self._last_info = info
+            self.media_changed.emit(info)
 
     async def _main_loop(self):
-        last_info = {}
-        while self.running:
-            current_info = await self._get_media_info()
-            if current_info and current_info != last_info:
-                self.media_changed.emit(current_info)
-                last_info = current_info
-            await asyncio.sleep(2)
+        try:
+            with span(f"{type(self.backend).__name__}.start"): await self.backend.start(self._on_backend_change)
+        except Exception as e:
+            print(f"No se pudo iniciar el backend multimedia: {e}")
+            return
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.backend.stop()
 
     def run(self):
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_until_complete(self._main_loop())
+        try:
+            # Sin backend no hay nada que escuchar: el hilo termina en lugar de esperar.
+            if self.backend is None or not self.running: return
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self._main_loop())
+        finally:
+            self.loop.close()
 
     def stop(self):
         self.running = False
+        try:
+            self.loop.call_soon_threadsafe(self._stopped.set)
+        except RuntimeError:
+            # El bucle ya se cerró.
+            pass
 
-    @staticmethod
-    def _run_command_in_thread(command):
-        """ Ejecuta un comando async en un hilo separado para no bloquear. """
-        async def _send_command_async():
-            if not IS_AVAILABLE: return
+    def send_command(self, command):
+        """ Encola un comando desde cualquier hilo (normalmente el de la GUI). """
+        with self._command_lock:
+            if command == "play_pause": self._pending_toggles += 1
+            elif command == "next": self._pending_skips += 1
+            elif command == "prev": self._pending_skips -= 1
+            else: raise ValueError(f"Comando desconocido: {command}")
+            if self._pending_since is None: self._pending_since = time.monotonic()
+            elif self._draining: self.coalesced_commands += 1
+            if self._draining or self.backend is None: return
+            self._draining = True
+        drain = self._drain_commands()
+        try:
+            asyncio.run_coroutine_threadsafe(drain, self.loop)
+        except RuntimeError:
+            # El bucle ya se cerró (aplicación saliendo).
+            drain.close()
+            with self._command_lock: self._draining = False
+
+    async def _drain_commands(self):
+        while True:
+            with self._command_lock:
+                toggles, skips, since = self._pending_toggles, self._pending_skips, self._pending_since
+                self._pending_toggles = self._pending_skips = 0; self._pending_since = None
+                if since is None:
+                    self._draining = False
+                    return
+            commands = (["play_pause"] if toggles % 2 else []) + ["next" if skips > 0 else "prev"] * abs(skips)
             try:
-                manager = await MediaManager.request_async()
-                session = manager.get_current_session()
-                if session:
-                    if command == "play_pause": await session.try_toggle_play_pause_async()
-                    elif command == "next": await session.try_skip_next_async()
-                    elif command == "prev": await session.try_skip_previous_async()
-            except Exception: pass
-        
-        Thread(target=lambda: asyncio.run(_send_command_async())).start()
+                for command in commands: await self.backend.send(command)
+            except Exception as e:
+                print(f"Error al enviar el comando multimedia: {e}")
+            self.latencies_ms.append((time.monotonic() - since) * 1000)
+
+    def latency_stats(self):
+        """ Latencia desde la pulsación hasta que el reproductor aceptó el comando, en ms. """
+        samples = sorted(self.latencies_ms)
+        if not samples: return {"count": 0, "coalesced": self.coalesced_commands}
+        return {
+            "count": len(samples), "coalesced": self.coalesced_commands,
+            "p50_ms": samples[len(samples) // 2], "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max_ms": samples[-1],
+        }
 
-    @classmethod
-    def send_play_pause(cls): cls._run_command_in_thread("play_pause")
-    @classmethod
-    def send_next(cls): cls._run_command_in_thread("next")
-    @classmethod
-    def send_prev(cls): cls._run_command_in_thread("prev")
\ No newline at end of file
+    def send_play_pause(self): self.send_command("play_pause")
+    def send_next(self): self.send_command("next")
+    def send_prev(self): self.send_command("prev")
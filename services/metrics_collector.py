@@ -0,0 +1,181 @@
+# AG_Optimizer/services/metrics_collector.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Integración de SystemService con Qt: hilo colector de métricas y sondeo de hardware
+en segundo plano. SystemService no depende de PySide6 para poder usarse sin pantalla.
+"""
+
+import time
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThread, QTimer, Signal, Qt
+
+from services.system_service import SystemService
+from helpers.diagnostics_helper import measure, histogram
+
+# Canales que un consumidor puede pedir al colector. "core" (CPU, RAM, swap) es barato;
+# "processes" calcula el top de procesos, "process_list" entrega la lista completa y
+# "io" lee los contadores de disco y red.
+CHANNELS = ("core", "processes", "process_list", "io")
+DEFAULT_POLLING = {"active_interval_ms": 2000, "idle_interval_ms": 10000}
+
+
+class MetricsCollector(QThread):
+    """
+    Hilo que muestrea el sistema con su propio intervalo y publica SystemSnapshot
+    a las vistas mediante la señal snapshot_ready.
+
+    Si la interfaz se retrasa, las muestras viejas se descartan: solo hay como
+    máximo una entrega pendiente en la cola de eventos de Qt y siempre transporta
+    la muestra más reciente.
+
+    La frecuencia depende de la demanda: mientras algún consumidor visible pida datos
+    (set_demand) se muestrea cada interval_ms y solo los canales pedidos; sin consumidores
+    visibles se baja a idle_interval_ms con los canales baratos, lo justo para el historial.
+    """
+    snapshot_ready = Signal(object)
+    _snapshot_pending = Signal()
+
+    def __init__(self, system_service=None, interval_ms=2000, top_count=5, idle_interval_ms=10000):
+        super().__init__()
+        self.system_service = system_service or SystemService()
+        self.interval_ms = interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self._demands = {}
+        self._background_demands = {}
+        self.top_count = top_count
+        self.running = True
+        self.dropped_snapshots = 0
+        self._observers = []
+        self._latest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        # El QThread vive en el hilo de la GUI, así que este slot se ejecuta allí.
+        self._snapshot_pending.connect(self._deliver_snapshot, Qt.QueuedConnection)
+
+    def run(self):
+        next_tick = time.monotonic()
+        while self.running:
+            interval_ms, channels = self._current_plan()
+            with measure("collector.pass"):
+                try:
+                    snapshot = self.system_service.sample(self.top_count if "processes" in channels else 0,
+                                                          include_io="io" in channels,
+                                                          include_processes="process_list" in channels)
+                except Exception as e:
+                    print(f"Error al muestrear el sistema: {e}")
+                else:
+                    self._notify_observers(snapshot)
+                    self._publish(snapshot)
+
+            # Programamos contra el reloj monotónico para no acumular deriva.
+            next_tick += interval_ms / 1000
+            now = time.monotonic()
+            if next_tick < now: next_tick = now
+            woken = self._wakeup.wait(next_tick - now)
+            self._wakeup.clear()
+            if woken: next_tick = time.monotonic()
+
+    def set_demand(self, consumer, channels=(), background=False):
+        """
+        Declara qué canales necesita 'consumer' (p. ej. una página visible). Un conjunto
+        vacío retira la demanda. Si aparece un canal nuevo se muestrea de inmediato.
+        Una demanda con background=True añade sus canales a todas las muestras pero no
+        acelera el muestreo (p. ej. las alertas, que vigilan aunque no haya nada a la vista).
+        """
+        channels = frozenset(channels); demands = self._background_demands if background else self._demands
+        with self._lock:
+            previous = demands.get(consumer, frozenset())
+            if channels: demands[consumer] = channels
+            else: demands.pop(consumer, None)
+        if channels - previous: self.request_sample()
+
+    def _current_plan(self):
+        with self._lock:
+            channels = frozenset().union(*self._demands.values())
+            background = frozenset().union(*self._background_demands.values())
+        if channels: return self.interval_ms, channels | background
+        return self.idle_interval_ms, frozenset(("core",)) | background
+
+    def add_observer(self, callback):
+        """
+        Registra una función que recibe cada muestra en el hilo del colector.
+        A diferencia de snapshot_ready, los observadores nunca pierden muestras.
+        """
+        self._observers.append(callback)
+
+    def _notify_observers(self, snapshot):
+        for callback in self._observers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error en un observador de métricas: {e}")
+
+    def _publish(self, snapshot):
+        with self._lock:
+            already_pending = self._latest is not None
+            if already_pending: self.dropped_snapshots += 1
+            self._latest = snapshot
+        if not already_pending:
+            self._snapshot_pending.emit()
+
+    def _deliver_snapshot(self):
+        with self._lock:
+            snapshot, self._latest = self._latest, None
+        if snapshot is not None:
+            self.snapshot_ready.emit(snapshot)
+
+    def request_sample(self):
+        """ Despierta al hilo para tomar una muestra inmediatamente. """
+        self._wakeup.set()
+
+    def stop(self):
+        self.running = False
+        self._wakeup.set()
+
+
+class HardwareProbeSignals(QObject):
+    finished = Signal(dict)
+
+
+class HardwareProbe(QRunnable):
+    """ Sondea el hardware fuera del hilo de la GUI y refresca la caché en disco. """
+
+    def __init__(self, system_service):
+        super().__init__()
+        self.system_service = system_service
+        self.signals = HardwareProbeSignals()
+
+    def run(self):
+        try:
+            self.signals.finished.emit(self.system_service.probe_hardware_info())
+        except Exception as e:
+            print(f"Error al sondear el hardware: {e}")
+
+class EventLoopLagProbe(QObject):
+    """
+    Retraso del bucle de eventos de la GUI: un QTimer preciso salta cada interval_ms y lo
+    que tarda de más en llegar es el tiempo que el hilo de la GUI estuvo ocupado con otra cosa.
+    Se registra en el histograma "event_loop.lag" de diagnostics_helper.
+    """
+    INTERVAL_MS = 100
+
+    def __init__(self, parent=None, interval_ms=INTERVAL_MS):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.histogram = histogram("event_loop.lag")
+        self._last = None
+        self.timer = QTimer(self); self.timer.setTimerType(Qt.PreciseTimer); self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._last = time.perf_counter(); self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.histogram.record(max(0.0, (now - self._last) * 1000 - self.interval_ms))
+        self._last = now
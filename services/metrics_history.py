@@ -0,0 +1,129 @@
+# AG_Optimizer/services/metrics_history.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Historial en memoria de las métricas del sistema.
+
+Cada métrica (CPU total, CPU por núcleo, RAM, swap) se guarda en varios niveles de
+resolución (1 s, 10 s y 1 min) con mínimo, media y máximo por intervalo. Cada nivel es
+un buffer circular de tamaño fijo respaldado por array, así que una ventana de 24 horas
+ocupa siempre la misma memoria.
+
+Los buffers están "espejados": cada valor se escribe dos veces (en i y en i + capacidad),
+de modo que los últimos N puntos son siempre un tramo contiguo y se pueden devolver como
+memoryview en O(1) y sin copiar.
+"""
+
+from array import array
+from collections import namedtuple
+
+# (resolución en segundos, número de puntos que se conservan)
+DEFAULT_TIERS = ((1, 3600), (10, 8640), (60, 1440))
+
+TierView = namedtuple("TierView", ["times", "mins", "avgs", "maxs"])
+
+
+class Tier:
+    """ Nivel de resolución fija: agrega muestras por intervalo y las guarda en un buffer circular. """
+
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.count = 0
+        self._pos = 0
+        self._times = array('d', bytes(8 * 2 * capacity))
+        self._mins = array('f', bytes(4 * 2 * capacity))
+        self._avgs = array('f', bytes(4 * 2 * capacity))
+        self._maxs = array('f', bytes(4 * 2 * capacity))
+        self._views = tuple(memoryview(a).toreadonly() for a in (self._times, self._mins, self._avgs, self._maxs))
+        self._bucket = None
+        self._min = self._max = self._sum = 0.0
+        self._samples = 0
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.resolution)
+        if bucket != self._bucket:
+            if self._bucket is not None: self._close_bucket()
+            self._bucket = bucket
+            self._min = self._max = self._sum = value
+            self._samples = 1
+            return
+        if value < self._min: self._min = value
+        if value > self._max: self._max = value
+        self._sum += value
+        self._samples += 1
+
+    def _close_bucket(self):
+        pos, mirror = self._pos, self._pos + self.capacity
+        values = (self._bucket * self.resolution, self._min, self._sum / self._samples, self._max)
+        for column, value in zip((self._times, self._mins, self._avgs, self._maxs), values):
+            column[pos] = value; column[mirror] = value
+        # Primero avanza la posición y después el contador; last() los lee en orden inverso, así
+        # que un lector puede quedarse con un punto menos, pero nunca con uno sin escribir.
+        self._pos = (pos + 1) % self.capacity
+        if self.count < self.capacity: self.count += 1
+
+    def last(self, n):
+        """ Últimos 'n' intervalos cerrados, del más antiguo al más reciente, sin copiar. """
+        count = self.count; pos = self._pos
+        n = max(0, min(n, count))
+        end = pos + self.capacity
+        return TierView(*(view[end - n:end] for view in self._views))
+
+
+class MetricSeries:
+    """ Una métrica con todos sus niveles de resolución. """
+
+    def __init__(self, name, tiers=DEFAULT_TIERS):
+        self.name = name
+        self.tiers = {resolution: Tier(resolution, capacity) for resolution, capacity in tiers}
+
+    def add(self, timestamp, value):
+        for tier in self.tiers.values():
+            tier.add(timestamp, value)
+
+    def last(self, n, resolution):
+        return self.tiers[resolution].last(n)
+
+
+class MetricsHistory:
+    """
+    Almacén de series temporales alimentado con SystemSnapshot.
+
+    Se escribe desde el hilo del MetricsCollector y las vistas leen con last(), que
+    devuelve memoryviews de solo lectura sobre los buffers.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tier_spec = tuple(tiers)
+        self.series = {}
+
+    @property
+    def resolutions(self):
+        return tuple(resolution for resolution, _ in self.tier_spec)
+
+    def _series(self, name):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = MetricSeries(name, self.tier_spec)
+        return series
+
+    def add(self, name, timestamp, value):
+        self._series(name).add(timestamp, value)
+
+    def append_snapshot(self, snapshot):
+        timestamp = snapshot.wall_time
+        self.add("cpu", timestamp, snapshot.cpu_percent)
+        self.add("ram", timestamp, snapshot.ram_percent)
+        self.add("swap", timestamp, snapshot.swap_percent)
+        for core, value in enumerate(snapshot.cpu_per_core):
+            self.add(f"cpu_core_{core}", timestamp, value)
+
+    def last(self, name, n, resolution=1):
+        """ Últimos 'n' puntos de 'name' a la resolución indicada (en segundos). """
+        series = self.series.get(name)
+        if series is None:
+            empty = memoryview(array('f'))
+            return TierView(memoryview(array('d')), empty, empty, empty)
+        return series.last(n, resolution)
@@ -0,0 +1,212 @@
+# AG_Optimizer/services/metrics_store.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Persistencia del historial de métricas en un archivo circular de tamaño fijo.
+
+El archivo tiene una cabecera y 'capacity' registros empaquetados (marca de tiempo
+double + un float por campo). Se escribe a través de mmap, así que añadir un registro
+es una escritura en memoria y no una llamada a write(). La lectura también usa mmap y
+expone los registros como memoryview (o numpy, si está instalado) sin copiarlos.
+"""
+
+import os
+import mmap
+import struct
+
+from helpers.config_helper import get_section
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"AGMETRIC"
+VERSION = 1
+HEADER_SIZE = 512
+# magic, versión, tamaño de cabecera, tamaño de registro, nº de campos, capacidad, posición, nº de registros
+_HEADER = struct.Struct("<8sIIIIQQQ")
+_POSITION = struct.Struct("<QQ")
+_POSITION_OFFSET = _HEADER.size - _POSITION.size
+_FIELDS_OFFSET = _HEADER.size
+
+DEFAULT_FIELDS = ("cpu", "ram", "swap")
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "path": "metrics_history.bin",
+    "capacity": 60480,          # una semana a un registro cada 10 s
+    "record_interval_s": 10,
+}
+
+
+def _record_struct(field_count):
+    return struct.Struct(f"<d{field_count}f")
+
+
+class MetricsRingFile:
+    """ Escritor del archivo circular. Si el formato no coincide, el archivo se recrea. """
+
+    def __init__(self, path, fields=DEFAULT_FIELDS, capacity=DEFAULT_SETTINGS["capacity"]):
+        self.path = path
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self._record = _record_struct(len(self.fields))
+        self._size = HEADER_SIZE + self._record.size * capacity
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        if os.fstat(self._file.fileno()).st_size != self._size: self._file.truncate(self._size)
+        self._map = mmap.mmap(self._file.fileno(), self._size)
+        if not self._header_matches():
+            self._write_header()
+        self.position, self.count = _POSITION.unpack_from(self._map, _POSITION_OFFSET)
+
+    def _header_matches(self):
+        magic, version, header_size, record_size, field_count, capacity, _, _ = _HEADER.unpack_from(self._map, 0)
+        return (magic == MAGIC and version == VERSION and header_size == HEADER_SIZE
+                and record_size == self._record.size and capacity == self.capacity
+                and _read_fields(self._map, field_count) == self.fields)
+
+    def _write_header(self):
+        names = ",".join(self.fields).encode("utf-8")
+        if _FIELDS_OFFSET + len(names) > HEADER_SIZE:
+            raise ValueError("Demasiados campos para la cabecera del historial.")
+        self._map[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, HEADER_SIZE, self._record.size,
+                          len(self.fields), self.capacity, 0, 0)
+        self._map[_FIELDS_OFFSET:_FIELDS_OFFSET + len(names)] = names
+
+    def append(self, timestamp, values):
+        """ Escribe un registro en memoria; el sistema operativo lo vuelca a disco. """
+        offset = HEADER_SIZE + self.position * self._record.size
+        self._record.pack_into(self._map, offset, timestamp, *values)
+        self.position = (self.position + 1) % self.capacity
+        if self.count < self.capacity: self.count += 1
+        # La cabecera se actualiza después del registro para no publicar datos a medias.
+        _POSITION.pack_into(self._map, _POSITION_OFFSET, self.position, self.count)
+
+    def close(self):
+        if self._map.closed: return
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class MetricsRingReader:
+    """ Lector de solo lectura del archivo circular, sin copiar los registros. """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size, record_size, field_count, capacity, position, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} no es un historial de métricas válido.")
+        self.fields = _read_fields(self._map, field_count)
+        self.capacity, self.position, self.count = capacity, position, count
+        self._record = _record_struct(field_count)
+        self._data = memoryview(self._map)[header_size:header_size + record_size * capacity]
+
+    def segments(self):
+        """
+        Registros en orden cronológico como dos memoryviews (la parte anterior y posterior
+        al punto de escritura). Cualquiera de las dos puede estar vacía.
+        """
+        size = self._record.size
+        if self.count < self.capacity:
+            return (self._data[:self.count * size], self._data[:0])
+        split = self.position * size
+        return (self._data[split:], self._data[:split])
+
+    def records(self):
+        """ Itera (timestamp, valores...) en orden cronológico. """
+        for segment in self.segments():
+            yield from self._record.iter_unpack(segment)
+
+    def tail(self, n):
+        """ Itera los últimos 'n' registros en orden cronológico, sin recorrer los anteriores. """
+        remaining = min(n, self.count) * self._record.size; parts = []
+        for segment in reversed(self.segments()):
+            if remaining <= 0: break
+            part = segment[max(len(segment) - remaining, 0):]
+            parts.append(part); remaining -= len(part)
+        for part in reversed(parts):
+            yield from self._record.iter_unpack(part)
+
+    def numpy_segments(self):
+        """ Igual que segments(), pero como arrays estructurados de numpy (sin copia). """
+        if numpy is None:
+            raise RuntimeError("numpy no está instalado.")
+        dtype = numpy.dtype([("timestamp", "<f8")] + [(name, "<f4") for name in self.fields])
+        return tuple(numpy.frombuffer(segment, dtype=dtype) for segment in self.segments())
+
+    def close(self):
+        self._data = None
+        self._map.close()
+        self._file.close()
+
+
+def _read_fields(buffer, field_count):
+    raw = bytes(buffer[_FIELDS_OFFSET:HEADER_SIZE]).rstrip(b"\0").decode("utf-8", "replace")
+    fields = tuple(raw.split(",")) if raw else ()
+    return fields if len(fields) == field_count else ()
+
+
+class HistoryRecorder:
+    """
+    Observador del MetricsCollector que promedia las muestras de cada intervalo y
+    guarda un registro por intervalo en el MetricsRingFile.
+    """
+
+    def __init__(self, ring_file, record_interval_s=DEFAULT_SETTINGS["record_interval_s"]):
+        self.ring_file = ring_file
+        self.record_interval_s = record_interval_s
+        self._bucket = None
+        self._sums = [0.0] * len(ring_file.fields)
+        self._samples = 0
+
+    def __call__(self, snapshot):
+        bucket = int(snapshot.wall_time // self.record_interval_s)
+        if bucket != self._bucket and self._samples:
+            self.ring_file.append(self._bucket * self.record_interval_s, [value / self._samples for value in self._sums])
+            self._sums = [0.0] * len(self._sums); self._samples = 0
+        self._bucket = bucket
+        for i, field in enumerate(self.ring_file.fields):
+            self._sums[i] += getattr(snapshot, f"{field}_percent", 0.0)
+        self._samples += 1
+
+
+def load_recent_history(history, count, config=None):
+    """
+    Carga en 'history' (un MetricsHistory) los últimos 'count' registros del archivo, para que
+    las gráficas no empiecen vacías tras reiniciar. Devuelve cuántos registros se cargaron.
+    """
+    settings = get_section("metrics_history", DEFAULT_SETTINGS, config)
+    if not settings["enabled"] or not os.path.exists(settings["path"]): return 0
+    try:
+        reader = MetricsRingReader(settings["path"])
+    except (OSError, ValueError, struct.error) as e:
+        print(f"No se pudo leer el historial de métricas: {e}")
+        return 0
+    loaded = 0
+    try:
+        for timestamp, *values in reader.tail(count):
+            for field, value in zip(reader.fields, values): history.add(field, timestamp, value)
+            loaded += 1
+    finally:
+        reader.close()
+    return loaded
+
+
+def open_history_recorder(config=None):
+    """ Crea el HistoryRecorder según la sección 'metrics_history' de config.json, o None si está desactivado. """
+    settings = get_section("metrics_history", DEFAULT_SETTINGS, config)
+    if not settings["enabled"]: return None
+    try:
+        ring_file = MetricsRingFile(settings["path"], DEFAULT_FIELDS, int(settings["capacity"]))
+    except (OSError, ValueError) as e:
+        print(f"No se pudo abrir el historial de métricas: {e}")
+        return None
+    return HistoryRecorder(ring_file, settings["record_interval_s"])
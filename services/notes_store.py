@@ -0,0 +1,133 @@
+# AG_Optimizer/services/notes_store.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Almacén de notas rápidas y notas del calendario en SQLite (modo WAL).
+
+Las notas del calendario se indexan por fecha ISO (clave primaria de una tabla WITHOUT
+ROWID), así que guardar una nota es un upsert de un solo registro y cargar un mes es una
+consulta por rango sobre el índice. Todas las páginas comparten la misma instancia.
+"""
+
+import time
+import sqlite3
+
+from helpers.config_helper import get_section, save_config_deferred
+
+DEFAULT_SETTINGS = {"path": "notes.db"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calendar_notes (
+    date TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS quick_notes (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class NotesStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Con WAL, NORMAL solo hace fsync en los checkpoints: cada nota cuesta una escritura en el log.
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def get_note(self, date):
+        row = self.conn.execute("SELECT body FROM calendar_notes WHERE date = ?", (date,)).fetchone()
+        return row[0] if row else ""
+
+    def set_note(self, date, body):
+        """ Guarda la nota de 'date' (YYYY-MM-DD); un texto vacío la elimina. """
+        with self.conn:
+            if body:
+                self.conn.execute(
+                    "INSERT INTO calendar_notes (date, body, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(date) DO UPDATE SET body = excluded.body, updated_at = excluded.updated_at",
+                    (date, body, time.time()))
+            else:
+                self.conn.execute("DELETE FROM calendar_notes WHERE date = ?", (date,))
+
+    def notes_in_range(self, start, end):
+        """ Notas entre 'start' y 'end' (fechas ISO, ambas incluidas) como dict fecha -> texto. """
+        return dict(self.conn.execute(
+            "SELECT date, body FROM calendar_notes WHERE date BETWEEN ? AND ? ORDER BY date", (start, end)))
+
+    def dates_in_range(self, start, end):
+        return [row[0] for row in self.conn.execute(
+            "SELECT date FROM calendar_notes WHERE date BETWEEN ? AND ? ORDER BY date", (start, end))]
+
+    def get_quick_notes(self):
+        row = self.conn.execute("SELECT body FROM quick_notes WHERE id = 1").fetchone()
+        return row[0] if row else ""
+
+    def set_quick_notes(self, body):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO quick_notes (id, body, updated_at) VALUES (1, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET body = excluded.body, updated_at = excluded.updated_at",
+                (body, time.time()))
+
+    def migrate_from_config(self, config):
+        """
+        Importa una única vez las claves 'calendar_events' y 'user_notes' de config.json
+        y las elimina de la configuración. Devuelve True si hubo algo que migrar.
+        """
+        if "calendar_events" not in config and "user_notes" not in config: return False
+        with self.conn:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'config_migrated'").fetchone() is None:
+                now = time.time()
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO calendar_notes (date, body, updated_at) VALUES (?, ?, ?)",
+                    [(date, body.strip(), now) for date, body in (config.get("calendar_events") or {}).items() if body and body.strip()])
+                if config.get("user_notes"):
+                    self.conn.execute("INSERT OR IGNORE INTO quick_notes (id, body, updated_at) VALUES (1, ?, ?)",
+                                      (config["user_notes"], now))
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('config_migrated', ?)", (str(now),))
+        config.pop("calendar_events", None); config.pop("user_notes", None)
+        return True
+
+    def close(self):
+        self.conn.close()
+
+
+_store = None
+
+
+def get_notes_store(config=None):
+    """ Devuelve el NotesStore compartido, abriéndolo la primera vez. """
+    global _store
+    if _store is None:
+        _store = NotesStore(get_section("notes_store", DEFAULT_SETTINGS, config)["path"])
+    return _store
+
+
+def migrate_legacy_notes(config):
+    """
+    Pasa al almacén las notas que versiones anteriores guardaban en 'config' y las quita de
+    ese mismo dict, que se guarda. Tiene que recibir la configuración que usa la ventana
+    principal: si se migrara una copia, el siguiente guardado de la ventana las devolvería a
+    config.json. Sin claves antiguas no abre la base de datos.
+    """
+    if "calendar_events" not in config and "user_notes" not in config: return False
+    if not get_notes_store(config).migrate_from_config(config): return False
+    save_config_deferred(config)
+    return True
+
+
+def close_notes_store():
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
@@ -3,38 +3,358 @@
 # © 2025 Agustín Bahamondes. Todos los derechos reservados.
 
 import os
-import shutil
+import time
 import tempfile
+import threading
 import subprocess
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from PySide6.QtCore import QObject, Signal, QRunnable
 
+from helpers.config_helper import get_section
+from services.file_hashing import EDGE_SIZE, hash_edges, hash_contents
+
+TEMP_CLEANER_DEFAULTS = {"min_age_minutes": 60, "max_file_size_mb": 0, "workers": 4}
+
 class WorkerSignals(QObject):
     finished = Signal(str)
     error = Signal(str)
+    progress = Signal(dict)
+    result = Signal(object)
 
 class TempCleaner(QRunnable):
-    def __init__(self):
+    """
+    Limpia la carpeta temporal. Recorre con os.scandir aprovechando la información de cada
+    DirEntry y reparte los subárboles de primer nivel entre un grupo acotado de hilos. Los
+    hilos solo actualizan contadores; el hilo coordinador publica el progreso como mucho
+    cada 'progress_interval_s' segundos.
+    Los archivos modificados en los últimos 'min_age_minutes' minutos (o mayores que
+    'max_file_size' bytes, si se indica) se dejan intactos. cancel() detiene la limpieza.
+    """
+    def __init__(self, root=None, min_age_minutes=60, max_file_size=None, max_workers=4, progress_interval_s=0.25):
         super().__init__()
         self.signals = WorkerSignals()
+        self.root = root or tempfile.gettempdir()
+        self.min_age_minutes = min_age_minutes
+        self.max_file_size = max_file_size
+        self.max_workers = max_workers
+        self.progress_interval_s = progress_interval_s
+        self.files_removed = 0
+        self.dirs_removed = 0
+        self.bytes_reclaimed = 0
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._start = self._last_progress = 0.0
+
+    @classmethod
+    def from_config(cls, config=None):
+        """ Crea un TempCleaner con los filtros del bloque 'temp_cleaner' de la configuración. """
+        settings = get_section("temp_cleaner", TEMP_CLEANER_DEFAULTS, config)
+        max_file_size = settings["max_file_size_mb"] * 1024 * 1024 if settings["max_file_size_mb"] else None
+        return cls(min_age_minutes=settings["min_age_minutes"], max_file_size=max_file_size, max_workers=settings["workers"])
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
 
     def run(self):
         try:
-            temp_dir = tempfile.gettempdir()
-            cleaned_count = 0
-            for item in os.listdir(temp_dir):
-                item_path = os.path.join(temp_dir, item)
-                try:
-                    if os.path.isfile(item_path) or os.path.islink(item_path):
-                        os.unlink(item_path)
-                    elif os.path.isdir(item_path):
-                        shutil.rmtree(item_path)
-                    cleaned_count += 1
-                except (PermissionError, OSError):
-                    continue
-            self.signals.finished.emit(f"Limpieza de temporales completada. {cleaned_count} elementos eliminados.")
+            self._start = time.monotonic()
+            cutoff = time.time() - self.min_age_minutes * 60
+            subtrees = []
+            with os.scandir(self.root) as entries:
+                for entry in entries:
+                    if self.cancelled: break
+                    try:
+                        if entry.is_dir(follow_symlinks=False): subtrees.append(entry)
+                        else: self._remove_file(entry, cutoff)
+                    except (PermissionError, OSError):
+                        continue
+                    self._emit_progress()
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="TempCleaner") as pool:
+                pending = {pool.submit(self._clean_tree, entry, cutoff) for entry in subtrees}
+                while pending:
+                    _, pending = wait(pending, timeout=self.progress_interval_s)
+                    self._emit_progress()
+
+            self._emit_progress(force=True)
+            summary = f"{self.files_removed} archivos eliminados, {self.bytes_reclaimed / (1024 * 1024):.1f} MB liberados."
+            if self.cancelled:
+                self.signals.finished.emit(f"Limpieza de temporales cancelada. {summary}")
+            else:
+                self.signals.finished.emit(f"Limpieza de temporales completada. {summary}")
         except Exception as e:
             self.signals.error.emit(f"Error al limpiar temporales: {e}")
 
+    def _clean_tree(self, dir_entry, cutoff):
+        """ Limpia un subárbol; devuelve True si el directorio quedó vacío y se eliminó. """
+        try:
+            # La fecha del directorio se toma antes de borrar nada dentro (borrar la actualiza).
+            recently_modified = dir_entry.stat(follow_symlinks=False).st_mtime > cutoff
+            emptied = True
+            with os.scandir(dir_entry.path) as entries:
+                for entry in entries:
+                    if self.cancelled: return False
+                    try:
+                        if entry.is_dir(follow_symlinks=False): removed = self._clean_tree(entry, cutoff)
+                        else: removed = self._remove_file(entry, cutoff)
+                    except (PermissionError, OSError):
+                        removed = False
+                    emptied = emptied and removed
+            if not emptied or recently_modified: return False
+            os.rmdir(dir_entry.path)
+            with self._lock: self.dirs_removed += 1
+            return True
+        except (PermissionError, OSError):
+            return False
+
+    def _remove_file(self, entry, cutoff):
+        info = entry.stat(follow_symlinks=False)
+        if info.st_mtime > cutoff: return False
+        if self.max_file_size is not None and info.st_size > self.max_file_size: return False
+        os.unlink(entry.path)
+        with self._lock:
+            self.files_removed += 1
+            self.bytes_reclaimed += info.st_size
+        return True
+
+    def _emit_progress(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_progress < self.progress_interval_s: return
+            self._last_progress = now
+            elapsed = max(now - self._start, 1e-6)
+            progress = {
+                "files": self.files_removed, "dirs": self.dirs_removed, "bytes": self.bytes_reclaimed,
+                "elapsed_s": elapsed, "bytes_per_s": self.bytes_reclaimed / elapsed, "files_per_s": self.files_removed / elapsed,
+            }
+        self.signals.progress.emit(progress)
+
+class DuplicateFinder(QRunnable):
+    """
+    Busca archivos duplicados bajo 'root' en tres etapas, cada una más cara que la anterior
+    pero aplicada a menos archivos:
+      1. Agrupa por tamaño (un solo recorrido con os.scandir; no se lee ningún archivo).
+      2. En los tamaños repetidos compara un hash de los primeros y últimos 64 KiB.
+      3. Solo si coinciden calcula el hash completo (si el archivo cabe en los bordes, el
+         hash de la etapa 2 ya es el completo).
+    Los hashes se calculan en un ProcessPoolExecutor con lecturas mmap. Los grupos
+    confirmados se publican por signals.progress ("groups") a medida que aparecen, empezando
+    por los tamaños con más bytes recuperables; signals.result recibe la lista final. Cada
+    grupo guarda la fecha de modificación de sus rutas en la búsqueda ("mtimes", en ns).
+    """
+    BATCH_FILES = 64
+    BATCH_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, root, min_size=1, max_workers=None, progress_interval_s=0.25):
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.root = root
+        self.min_size = max(min_size, 1)
+        self.max_workers = max_workers
+        self.progress_interval_s = progress_interval_s
+        self.stage = "scan"
+        self.files_seen = 0
+        self.candidates = 0
+        self.hashed_bytes = 0
+        self.groups = []
+        self._new_groups = []
+        self._mtimes = {}
+        self._cancelled = threading.Event()
+        self._start = self._last_progress = 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        try:
+            self._start = time.monotonic()
+            buckets = self._scan_sizes()
+            if not self.cancelled: self._hash_buckets(buckets)
+            self._emit_progress(force=True)
+            self.groups.sort(key=lambda group: group["reclaimable"], reverse=True)
+            self.signals.result.emit(self.groups)
+            reclaimable = sum(group["reclaimable"] for group in self.groups)
+            summary = f"{len(self.groups)} grupos de duplicados, {reclaimable / (1024 * 1024):.1f} MB recuperables."
+            if self.cancelled:
+                self.signals.finished.emit(f"Búsqueda de duplicados cancelada. {summary}")
+            else:
+                self.signals.finished.emit(f"Búsqueda de duplicados completada. {summary}")
+        except Exception as e:
+            self.signals.error.emit(f"Error al buscar duplicados: {e}")
+
+    def _scan_sizes(self):
+        """ Devuelve [(tamaño, [rutas])] de los tamaños repetidos, de más a menos recuperable. """
+        by_size = defaultdict(list)
+        mtimes = {}
+        seen_inodes = set()
+        stack = [self.root]
+        while stack and not self.cancelled:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False): stack.append(entry.path); continue
+                            if not entry.is_file(follow_symlinks=False): continue
+                            info = entry.stat(follow_symlinks=False)
+                            self.files_seen += 1
+                            if info.st_size < self.min_size: continue
+                            # Un archivo que ya es un enlace duro de otro no libera nada.
+                            inode = (info.st_dev, entry.inode())
+                            if inode in seen_inodes: continue
+                            seen_inodes.add(inode)
+                            by_size[info.st_size].append(entry.path); mtimes[entry.path] = info.st_mtime_ns
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+            self._emit_progress()
+        buckets = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+        buckets.sort(key=lambda bucket: bucket[0] * (len(bucket[1]) - 1), reverse=True)
+        self.candidates = sum(len(paths) for _, paths in buckets)
+        self._mtimes = {path: mtimes[path] for _, paths in buckets for path in paths}
+        return buckets
+
+    def _hash_buckets(self, buckets):
+        # 'spawn' en todas las plataformas: hacer fork de un proceso con hilos de Qt no es seguro.
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        pending = {}
+        try:
+            self.stage = "edges"
+            for batch in self._batches(buckets):
+                pending[pool.submit(hash_edges, [path for _, paths in batch for path in paths])] = ("edges", batch)
+            while pending:
+                done, _ = wait(pending, timeout=self.progress_interval_s, return_when=FIRST_COMPLETED)
+                if self.cancelled: return
+                confirmed = []
+                for future in done:
+                    kind, batch = pending.pop(future)
+                    digests = iter(future.result())
+                    for size, paths in batch:
+                        self.hashed_bytes += len(paths) * min(size, 2 * EDGE_SIZE)
+                        for group in self._regroup(paths, digests):
+                            # Si el archivo cabe entero en los bordes, el hash de bordes ya es el completo.
+                            if kind == "contents" or size <= 2 * EDGE_SIZE: self._add_group(size, group)
+                            else: confirmed.append((size, group))
+                        if kind == "contents": self.hashed_bytes += len(paths) * max(size - 2 * EDGE_SIZE, 0)
+                if confirmed:
+                    self.stage = "contents"
+                    for batch in self._batches(confirmed):
+                        pending[pool.submit(hash_contents, [path for _, paths in batch for path in paths])] = ("contents", batch)
+                self._emit_progress()
+        finally:
+            pool.shutdown(wait=not self.cancelled, cancel_futures=True)
+
+    def _batches(self, buckets):
+        """ Agrupa tamaños pequeños en una misma tarea para no pagar un viaje entre procesos por archivo. """
+        batch, files, size_sum = [], 0, 0
+        for size, paths in buckets:
+            batch.append((size, paths)); files += len(paths); size_sum += size * len(paths)
+            if files >= self.BATCH_FILES or size_sum >= self.BATCH_BYTES:
+                yield batch
+                batch, files, size_sum = [], 0, 0
+        if batch: yield batch
+
+    @staticmethod
+    def _regroup(paths, digests):
+        by_digest = defaultdict(list)
+        for path in paths:
+            digest = next(digests)
+            if digest is not None: by_digest[digest].append(path)
+        return [group for group in by_digest.values() if len(group) > 1]
+
+    def _add_group(self, size, paths):
+        paths = sorted(paths)
+        group = {"size": size, "paths": paths, "mtimes": [self._mtimes[path] for path in paths], "reclaimable": size * (len(paths) - 1)}
+        self.groups.append(group); self._new_groups.append(group)
+
+    def _emit_progress(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.progress_interval_s: return
+        self._last_progress = now
+        new_groups, self._new_groups = self._new_groups, []
+        self.signals.progress.emit({
+            "stage": self.stage, "files": self.files_seen, "candidates": self.candidates, "hashed_bytes": self.hashed_bytes,
+            "elapsed_s": now - self._start, "groups": new_groups,
+        })
+
+class DuplicateResolver(QRunnable):
+    """
+    Resuelve grupos de duplicados conservando la primera ruta de cada grupo. 'mode' es
+    "hardlink" (las copias pasan a ser enlaces duros del original) o "delete". Justo antes de
+    tocar una copia se comprueba que ni ella ni el original cambiaron de tamaño o de fecha de
+    modificación desde la búsqueda; las copias que ya son enlaces duros del original se saltan.
+    """
+    MODES = ("hardlink", "delete")
+
+    def __init__(self, groups, mode):
+        super().__init__()
+        if mode not in self.MODES: raise ValueError(f"Modo no válido: {mode}")
+        self.signals = WorkerSignals()
+        self.groups = groups
+        self.mode = mode
+
+    def run(self):
+        try:
+            resolved = failed = linked = reclaimed = 0
+            for group in self.groups:
+                keep, *copies = group["paths"]
+                for index, path in enumerate(copies, 1):
+                    try:
+                        keep_info = os.stat(keep, follow_symlinks=False); info = os.stat(path, follow_symlinks=False)
+                        if (info.st_dev, info.st_ino) == (keep_info.st_dev, keep_info.st_ino): linked += 1; continue
+                        # Si alguno de los dos cambió desde la búsqueda ya no es un duplicado seguro.
+                        if not (self._unchanged(keep_info, group, 0) and self._unchanged(info, group, index)): failed += 1; continue
+                        if self.mode == "delete":
+                            os.unlink(path)
+                        else:
+                            self._link_over(keep, path)
+                        resolved += 1; reclaimed += group["size"]
+                    except OSError:
+                        failed += 1
+            action = "enlazados" if self.mode == "hardlink" else "eliminados"
+            message = f"{resolved} duplicados {action}, {reclaimed / (1024 * 1024):.1f} MB recuperados."
+            if linked: message += f" {linked} ya eran enlaces del original."
+            if failed: message += f" {failed} no se pudieron procesar."
+            self.signals.finished.emit(message)
+        except Exception as e:
+            self.signals.error.emit(f"Error al resolver duplicados: {e}")
+
+    @staticmethod
+    def _link_over(keep, path):
+        """
+        Sustituye 'path' por un enlace duro de 'keep' a través de un temporal junto a él. Un
+        temporal que ya existe (de una ejecución interrumpida) no se toca: se prueba otro nombre.
+        Si algo falla, el temporal se borra y 'path' queda como estaba.
+        """
+        for attempt in range(100):
+            temp_path = f"{path}.ag-link" if attempt == 0 else f"{path}.ag-link{attempt}"
+            try:
+                os.link(keep, temp_path); break
+            except FileExistsError:
+                continue
+        else:
+            raise FileExistsError(f"No hay un nombre temporal libre para {path}")
+        try:
+            os.replace(temp_path, path)
+        except OSError:
+            try: os.unlink(temp_path)
+            except OSError: pass
+            raise
+
+    @staticmethod
+    def _unchanged(info, group, index):
+        return info.st_size == group["size"] and info.st_mtime_ns == group["mtimes"][index]
+
 class DNSFlush(QRunnable):
     def __init__(self):
         super().__init__()
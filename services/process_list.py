@@ -0,0 +1,133 @@
+# AG_Optimizer/services/process_list.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Lista de procesos del dashboard preparada fuera del hilo de la GUI.
+
+ProcessListDiffer se ejecuta en el hilo del MetricsCollector: con cada muestra construye las
+filas, aplica el filtro y el orden de la vista y calcula qué cambió respecto a la muestra
+anterior (ProcessListChanges). El modelo de Qt solo tiene que emitir las señales con esos
+datos, así que su coste por tick no crece con el número de procesos.
+
+No depende de Qt: el orden se describe con (columna, descendente, texto del filtro).
+"""
+
+import threading
+from operator import itemgetter
+from typing import NamedTuple
+
+# Posiciones dentro de cada fila (tupla inmutable, se comparte con el hilo de la GUI):
+# (clave, pid, nombre, rss, rss mostrado, nombre en minúsculas).
+ROW_KEY, ROW_PID, ROW_NAME, ROW_RSS, ROW_SHOWN, ROW_FOLDED = range(6)
+# La memoria se muestra con una décima de MB: cambios menores no se notifican.
+MEMORY_STEP = 1024 * 1024 // 10
+PID_COLUMN, NAME_COLUMN, MEMORY_COLUMN = range(3)
+# Claves de orden por columna; los empates conservan el orden anterior porque sort() es estable.
+SORT_KEYS = (itemgetter(ROW_PID), itemgetter(ROW_FOLDED), itemgetter(ROW_RSS))
+DEFAULT_VIEW = (MEMORY_COLUMN, True, "")
+
+
+class Transition(NamedTuple):
+    """
+    Paso de unas filas visibles a otras con un número fijo de señales, sea cual sea el número
+    de procesos que aparecen o terminan: añadir 'added' al final, reordenar a 'layout' (las
+    filas que quedan, ya en su orden, y detrás las que sobran) si 'reordered', y borrar las
+    'removed' últimas. 'layout_positions' traslada los índices persistentes en el reordenado.
+    """
+    added: list
+    reordered: bool
+    layout: list
+    layout_positions: dict
+    removed: int
+    order: list
+    positions: dict
+
+
+def plan_transition(current, visible):
+    """ Transition de la lista 'current' a 'visible' (listas de filas). """
+    positions = {row[ROW_KEY]: position for position, row in enumerate(visible)}
+    known = {row[ROW_KEY] for row in current}
+    added = [row for row in visible if row[ROW_KEY] not in known]
+    gone = [row for row in current if row[ROW_KEY] not in positions]
+    layout = visible + gone
+    # Tras añadir, el modelo tiene las filas anteriores en su orden y las nuevas al final.
+    reordered = any(old[ROW_KEY] != new[ROW_KEY] for old, new in zip(current + added, layout))
+    layout_positions = {row[ROW_KEY]: position for position, row in enumerate(layout)} if reordered else None
+    return Transition(added, reordered, layout, layout_positions, len(gone), visible, positions)
+
+
+class ProcessListChanges(NamedTuple):
+    """ Cambio de la lista de la versión 'base' a 'version', calculado con el orden y filtro 'view'. """
+    version: int
+    base: int
+    view: tuple
+    rows: dict
+    transition: Transition
+    # Claves cuyo valor de memoria mostrado cambió y, ya en posiciones finales, el tramo (primera, última) a repintar.
+    changed: list
+    changed_range: tuple
+
+
+def accepts(row, text):
+    """ El nombre contiene 'text' o el PID empieza por él. """
+    return text in row[ROW_FOLDED] or str(row[ROW_PID]).startswith(text)
+
+
+def arrange(kept, added, view):
+    """ Filas visibles según 'view': las que ya estaban (en su orden) y las nuevas, filtradas y ordenadas. """
+    column, descending, text = view
+    if text:
+        kept = [row for row in kept if accepts(row, text)]; added = [row for row in added if accepts(row, text)]
+    # Se parte del orden anterior: así la lista llega casi ordenada y sort() apenas trabaja.
+    visible = kept + added
+    visible.sort(key=SORT_KEYS[column], reverse=descending)
+    return visible
+
+
+class ProcessListDiffer:
+    """
+    update() se llama en el hilo del colector; set_view() desde la GUI cuando el usuario
+    cambia el orden o el filtro, y se tiene en cuenta a partir de la siguiente muestra.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._view = DEFAULT_VIEW
+        self.version = 0
+        self._rows = {}
+        self._order = []
+        # La generación anterior se suelta en la siguiente muestra, cuando el modelo ya la ha
+        # cambiado por otra: así las filas viejas se liberan en este hilo y no en el de la GUI.
+        self._retired = None
+
+    def set_view(self, view):
+        with self._lock: self._view = tuple(view)
+
+    def update(self, processes):
+        """ Filas de 'processes' (ProcessRow) y paso desde la muestra anterior. """
+        with self._lock: view = self._view
+        previous, rows, changed = self._rows, {}, []
+        for process in processes:
+            key = (process.pid, process.create_time)
+            row = previous.get(key)
+            if row is None:
+                row = (key, process.pid, process.name, process.rss, process.rss // MEMORY_STEP, process.name.lower())
+            elif row[ROW_RSS] != process.rss:
+                shown = process.rss // MEMORY_STEP
+                # Solo se repinta si cambia el valor que se ve (0,1 MB).
+                if shown != row[ROW_SHOWN]: changed.append(key)
+                row = (key, row[ROW_PID], row[ROW_NAME], process.rss, shown, row[ROW_FOLDED])
+            rows[key] = row
+
+        # Los procesos que no aparecen han terminado: se quedan fuera del diccionario nuevo.
+        shown_keys = {row[ROW_KEY] for row in self._order}
+        kept = [rows[row[ROW_KEY]] for row in self._order if row[ROW_KEY] in rows]
+        transition = plan_transition(self._order, arrange(kept, [row for key, row in rows.items() if key not in shown_keys], view))
+        changed_rows = [transition.positions[key] for key in changed if key in transition.positions]
+
+        base = self.version; self.version += 1
+        self._retired = (self._rows, self._order)
+        self._rows, self._order = rows, transition.order
+        return ProcessListChanges(self.version, base, view, rows, transition, changed,
+                                  (min(changed_rows), max(changed_rows)) if changed_rows else None)
@@ -0,0 +1,317 @@
+# AG_Optimizer/services/scheduler_service.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Programador de optimizaciones en segundo plano (bloque 'scheduler' de config.json).
+
+Cada tarea tiene una regla de intervalo ("every_minutes") o tipo cron ("cron", cinco
+campos: minuto hora día mes día-de-la-semana) y, por defecto, solo se lanza cuando el
+equipo lleva 'idle_checks' comprobaciones seguidas con la CPU y el disco por debajo de
+los umbrales. La carga sale de las muestras del colector de métricas (canal "io"). Las
+tareas se ejecutan de una en una, con prioridad baja de CPU y de E/S, y cada ejecución
+queda registrada con su duración en el historial.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QThread, Signal
+
+from helpers.config_helper import get_section, write_file_atomically
+from services.optimization_service import TempCleaner, DNSFlush
+from services.disk_usage_service import DiskUsageScanner
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "check_interval_s": 60,
+    "idle_cpu_percent": 15,
+    "idle_disk_mb_per_s": 5,
+    "idle_checks": 3,
+    "history_path": "scheduler_history.json",
+    "history_limit": 200,
+    "tasks": [],
+}
+
+# Tareas que se pueden programar; reciben la entrada de la tarea en la configuración.
+TASK_FACTORIES = {
+    "temp_cleaner": lambda options: TempCleaner.from_config(),
+    "dns_flush": lambda options: DNSFlush(),
+    "disk_usage": lambda options: DiskUsageScanner(options["root"]),
+}
+
+
+class CronRule:
+    """ Expresión cron de cinco campos con '*', listas, rangos y pasos ('*/15', '1-5', '5/15'). """
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5: raise ValueError(f"Expresión cron no válida: {expression!r}")
+        self.expression = expression
+        values = {}
+        for text, (name, low, high) in zip(parts, self.FIELDS):
+            values[name] = self._parse_field(text, low, high)
+        self.minutes, self.hours = sorted(values["minute"]), sorted(values["hour"])
+        self.days, self.months = values["day"], values["month"]
+        # En cron el domingo es 0 o 7.
+        self.weekdays = {day % 7 for day in values["weekday"]}
+        # Como en cron clásico, si se restringen día del mes y de la semana basta con que coincida uno.
+        self._day_or_weekday = parts[2] != "*" and parts[4] != "*"
+
+    @staticmethod
+    def _parse_field(text, low, high):
+        values = set()
+        for part in text.split(","):
+            span, _, step = part.partition("/")
+            if span == "*": start, end = low, high
+            elif "-" in span: start, end = (int(value) for value in span.split("-", 1))
+            # Con paso y sin rango, el valor es el inicio: '5/15' son los minutos 5, 20, 35 y 50.
+            elif step: start, end = int(span), high
+            else: start = end = int(span)
+            if start < low or end > high or start > end: raise ValueError(f"Campo cron fuera de rango: {part!r}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, day):
+        if day.month not in self.months: return False
+        in_month, in_week = day.day in self.days, (day.weekday() + 1) % 7 in self.weekdays
+        return (in_month or in_week) if self._day_or_weekday else (in_month and in_week)
+
+    def next_after(self, moment):
+        """ Primer instante (al minuto) estrictamente posterior a 'moment' que cumple la regla. """
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Se recorre por días, no por minutos: como mucho unos pocos años para casos como el 29 de febrero.
+        for offset in range(366 * 8):
+            day = start.date() + timedelta(days=offset)
+            if not self._day_matches(day): continue
+            for hour in self.hours:
+                if offset == 0 and hour < start.hour: continue
+                for minute in self.minutes:
+                    if offset == 0 and hour == start.hour and minute < start.minute: continue
+                    return datetime(day.year, day.month, day.day, hour, minute)
+        return None
+
+
+class ScheduledTask:
+    def __init__(self, options, on_demand=False):
+        """ Con on_demand=True la tarea no tiene regla propia: solo se lanza con run_task() (p. ej. desde una alerta). """
+        self.options = options
+        self.name = options.get("name") or options["task"]
+        if options["task"] not in TASK_FACTORIES: raise ValueError(f"Tarea desconocida: {options['task']!r}")
+        self.cron = CronRule(options["cron"]) if options.get("cron") else None
+        self.every_s = float(options.get("every_minutes", 0)) * 60
+        if self.cron is None and self.every_s <= 0 and not on_demand: raise ValueError(f"La tarea {self.name!r} necesita 'cron' o 'every_minutes'")
+        self.require_idle = options.get("require_idle", True)
+        self.last_run = None
+
+    def is_due(self, now, baseline):
+        """
+        'baseline' es el arranque del programador: una tarea sin ejecuciones previas no se lanza
+        nada más abrir la aplicación, sino a su próxima hora (cron) o tras un intervalo completo.
+        """
+        if self.cron is not None:
+            due = self.cron.next_after(datetime.fromtimestamp(self.last_run or baseline))
+            return due is not None and due.timestamp() <= now
+        return now - (self.last_run or baseline) >= self.every_s
+
+    def create_runnable(self):
+        return TASK_FACTORIES[self.options["task"]](self.options)
+
+
+def _lower_thread_priority():
+    """
+    Baja la prioridad de CPU y de E/S del hilo actual. En Linux la prioridad nice y la
+    clase de E/S son por hilo; en Windows se usa el modo de fondo del hilo.
+    Devuelve una función que intenta restaurarla.
+    """
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        THREAD_MODE_BACKGROUND_BEGIN, THREAD_MODE_BACKGROUND_END = 0x00010000, 0x00020000
+        kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        return lambda: kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_END)
+    if sys.platform.startswith("linux"):
+        import psutil
+        tid = threading.get_native_id()
+        restore = []
+        try:
+            previous_nice = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, 19)
+            restore.append(lambda: os.setpriority(os.PRIO_PROCESS, tid, previous_nice))
+        except OSError:
+            pass
+        try:
+            thread = psutil.Process(tid)
+            previous_ionice = thread.ionice()
+            thread.ionice(psutil.IOPRIO_CLASS_IDLE)
+            restore.append(lambda: thread.ionice(previous_ionice.ioclass, previous_ionice.value))
+        except (psutil.Error, OSError, AttributeError):
+            pass
+
+        def restore_all():
+            for action in restore:
+                # Sin privilegios no siempre se puede volver a subir la prioridad.
+                try: action()
+                except (psutil.Error, OSError): pass
+        return restore_all
+    QThread.currentThread().setPriority(QThread.LowestPriority)
+    return lambda: QThread.currentThread().setPriority(QThread.NormalPriority)
+
+
+class LowPriorityRunnable(QRunnable):
+    """ Ejecuta otra tarea (QRunnable) con prioridad baja en el hilo del grupo. """
+
+    def __init__(self, task):
+        super().__init__()
+        self.task = task
+
+    def run(self):
+        restore = _lower_thread_priority()
+        try:
+            self.task.run()
+        finally:
+            restore()
+
+
+class LoadAverage:
+    """
+    Media de CPU y tráfico de disco de las muestras del colector entre dos comprobaciones.
+    add() se llama en el hilo del colector y take() en el de la GUI.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cpu = self._disk = 0.0; self._samples = 0
+
+    def add(self, snapshot):
+        # Sin discos no hay tasa (muestras sin el canal "io" o la primera tras pedirlo).
+        if not snapshot.disks: return
+        disk = sum(disk.read_bytes_per_s + disk.write_bytes_per_s for disk in snapshot.disks)
+        with self._lock:
+            self._cpu += snapshot.cpu_percent; self._disk += disk; self._samples += 1
+
+    def take(self):
+        """ Devuelve (cpu_percent, disk_bytes_per_s) medios desde la llamada anterior, o None si no hubo muestras. """
+        with self._lock:
+            if not self._samples: return None
+            load = (self._cpu / self._samples, self._disk / self._samples)
+            self._cpu = self._disk = 0.0; self._samples = 0
+        return load
+
+
+class SchedulerService(QObject):
+    """
+    Comprueba cada 'check_interval_s' segundos (en el hilo de la GUI, con un QTimer) si el
+    equipo está inactivo y si alguna tarea toca. La carga la mide el MetricsCollector al que
+    se conecta con attach(); sin él no se considera inactivo y solo corren las tareas con
+    "require_idle": false. Nunca hay dos tareas programadas a la vez, así que una ejecución
+    que se solapa con la anterior simplemente espera a que termine.
+    """
+    task_started = Signal(str)
+    task_finished = Signal(dict)
+
+    def __init__(self, config=None):
+        super().__init__()
+        self.settings = get_section("scheduler", DEFAULT_SETTINGS, config)
+        self.load = LoadAverage()
+        # Grupo propio de un hilo: sin privilegios la prioridad bajada no se puede recuperar,
+        # y así ningún hilo "lento" acaba atendiendo las tareas que lanza el usuario.
+        self.thread_pool = QThreadPool(self); self.thread_pool.setMaxThreadCount(1)
+        self.history = self._load_history()
+        self.tasks = []
+        for options in self.settings["tasks"]:
+            try:
+                self.tasks.append(ScheduledTask(options))
+            except (KeyError, ValueError) as e:
+                print(f"Tarea programada no válida en la configuración: {e}")
+        for entry in self.history:
+            for task in self.tasks:
+                if task.name == entry["task"]: task.last_run = max(task.last_run or 0, entry["started_at"])
+        self.idle_streak = 0
+        self.running = None
+        self._started_at = time.time()
+        self.timer = QTimer(self); self.timer.timeout.connect(self.check)
+
+    def attach(self, collector):
+        """ Toma la carga de las muestras de 'collector', que sigue leyendo los discos aunque no haya páginas visibles. """
+        if not self.settings["enabled"] or not self.tasks: return
+        collector.add_observer(self.load.add)
+        collector.set_demand("scheduler", ("core", "io"), background=True)
+
+    def start(self):
+        if not self.settings["enabled"] or not self.tasks: return
+        self.load.take()
+        self.timer.start(int(self.settings["check_interval_s"] * 1000))
+
+    def stop(self):
+        self.timer.stop()
+        if self.running is not None and hasattr(self.running[1], "cancel"): self.running[1].cancel()
+        self.thread_pool.waitForDone()
+
+    def is_idle(self):
+        return self.idle_streak >= self.settings["idle_checks"]
+
+    def check(self):
+        load = self.load.take()
+        if self.running is not None: return
+        if load is not None:
+            cpu_percent, disk_bytes_per_s = load
+            quiet = cpu_percent < self.settings["idle_cpu_percent"] and disk_bytes_per_s < self.settings["idle_disk_mb_per_s"] * 1024 * 1024
+            self.idle_streak = self.idle_streak + 1 if quiet else 0
+        now = time.time()
+        for task in self.tasks:
+            if task.is_due(now, self._started_at) and (self.is_idle() or not task.require_idle):
+                self.run_task(task)
+                return
+
+    def run_task(self, task):
+        if self.running is not None: return False
+        try:
+            runnable = task.create_runnable()
+        except Exception as e:
+            print(f"No se pudo crear la tarea programada {task.name!r}: {e}")
+            return False
+        started_at = time.time()
+        task.last_run = started_at
+        self.running = (task, runnable, started_at, time.monotonic())
+        # Métodos de este QObject (no lambdas) para que las señales lleguen encoladas al hilo de la GUI.
+        runnable.signals.finished.connect(self._task_succeeded)
+        runnable.signals.error.connect(self._task_failed)
+        self.thread_pool.start(LowPriorityRunnable(runnable))
+        self.task_started.emit(task.name)
+        return True
+
+    def _task_succeeded(self, message): self._task_done("ok", message)
+
+    def _task_failed(self, message): self._task_done("error", message)
+
+    def _task_done(self, status, message):
+        if self.running is None: return
+        task, _, started_at, start = self.running
+        self.running = None
+        # La propia tarea hace E/S: la inactividad se vuelve a medir desde cero.
+        self.idle_streak = 0
+        entry = {"task": task.name, "started_at": started_at, "duration_s": round(time.monotonic() - start, 3),
+                 "status": status, "message": message}
+        self.history.append(entry)
+        del self.history[:-self.settings["history_limit"]]
+        self._save_history()
+        self.task_finished.emit(entry)
+
+    def _load_history(self):
+        try:
+            with open(self.settings["history_path"], 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            return history if isinstance(history, list) else []
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def _save_history(self):
+        try:
+            write_file_atomically(self.settings["history_path"], json.dumps(self.history, indent=4, ensure_ascii=False))
+        except OSError as e:
+            print(f"No se pudo guardar el historial del programador: {e}")
@@ -7,24 +7,383 @@ Servicio encargado de obtener toda la información del sistema.
 Utiliza psutil para datos de rendimiento y WMI para detalles de hardware en Windows.
 """
 
-import psutil
+import os
+import re
+import json
+import time
+import heapq
 import platform
+import subprocess
 from collections import defaultdict
+from dataclasses import dataclass, asdict
+from operator import itemgetter
+from typing import NamedTuple
+
+from helpers.config_helper import write_file_atomically
+from helpers.import_helper import lazy_module
+from helpers.trace_helper import traced
+from services.process_list import ProcessListDiffer
+
+# psutil se importa en el primer muestreo, que ocurre en el hilo del colector y no durante el arranque.
+psutil = lazy_module("psutil")
+
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """ Muestra inmutable del estado del sistema tomada por el MetricsCollector. """
+    timestamp: float
+    wall_time: float
+    cpu_percent: float
+    ram_percent: float
+    swap_percent: float = 0.0
+    cpu_per_core: tuple = ()
+    top_processes: tuple = ()
+    disks: tuple = ()
+    nics: tuple = ()
+    # Lista completa de procesos (ProcessRow), solo si se pidió el canal "process_list".
+    processes: tuple = ()
+    # Con "process_list", el ProcessListChanges de la lista del dashboard ya preparado en el colector.
+    process_changes: object = None
+
+    def to_dict(self):
+        data = asdict(self); del data["process_changes"]
+        return data
+
+
+class ProcessRow(NamedTuple):
+    """ Proceso de la lista completa; (pid, create_time) lo identifica aunque el PID se reutilice. """
+    pid: int
+    create_time: float
+    name: str
+    rss: int
+
+
+@dataclass(frozen=True)
+class DiskRate:
+    """ Rendimiento de un disco entre dos muestras consecutivas. """
+    name: str
+    read_bytes_per_s: float
+    write_bytes_per_s: float
+    read_iops: float
+    write_iops: float
+
+
+@dataclass(frozen=True)
+class NicRate:
+    """ Tráfico de una interfaz de red entre dos muestras consecutivas. """
+    name: str
+    rx_bytes_per_s: float
+    tx_bytes_per_s: float
+    rx_packets_per_s: float
+    tx_packets_per_s: float
+
+
+class IORateTracker:
+    """
+    Convierte los contadores acumulados de disco y red en tasas por segundo.
+    Usa la marca de tiempo monotónica real de cada muestra, así que un tick retrasado
+    no infla las tasas.
+    """
 
-class SystemService:
     def __init__(self):
-        self.wmi_conn = None
-        # Si es Windows, intenta inicializar la conexión WMI
-        if platform.system() == "Windows":
+        self._last_time = None
+        self._last_disks = {}
+        self._last_nics = {}
+
+    def update(self, timestamp, disk_counters, nic_counters):
+        disks, nics = (), ()
+        elapsed = None if self._last_time is None else timestamp - self._last_time
+        if elapsed and elapsed > 0:
+            disks = tuple(
+                DiskRate(name,
+                         _rate(counters.read_bytes, previous.read_bytes, elapsed),
+                         _rate(counters.write_bytes, previous.write_bytes, elapsed),
+                         _rate(counters.read_count, previous.read_count, elapsed),
+                         _rate(counters.write_count, previous.write_count, elapsed))
+                for name, counters in disk_counters.items()
+                if (previous := self._last_disks.get(name)) is not None
+            )
+            nics = tuple(
+                NicRate(name,
+                        _rate(counters.bytes_recv, previous.bytes_recv, elapsed),
+                        _rate(counters.bytes_sent, previous.bytes_sent, elapsed),
+                        _rate(counters.packets_recv, previous.packets_recv, elapsed),
+                        _rate(counters.packets_sent, previous.packets_sent, elapsed))
+                for name, counters in nic_counters.items()
+                if (previous := self._last_nics.get(name)) is not None
+            )
+        self._last_time = timestamp
+        self._last_disks = disk_counters
+        self._last_nics = nic_counters
+        return disks, nics
+
+
+def _rate(current, previous, elapsed):
+    # Un contador que retrocede (dispositivo reconectado) no debe producir tasas negativas.
+    delta = current - previous
+    return delta / elapsed if delta > 0 else 0.0
+
+
+class ProcessEntry:
+    """ Fila de la ProcessTable. Los atributos estáticos se leen una única vez. """
+    __slots__ = ("pid", "create_time", "name", "exe", "rss", "proc")
+
+    def __init__(self, proc, create_time, name, exe, rss):
+        self.pid = proc.pid
+        self.proc = proc
+        self.create_time = create_time
+        self.name = name
+        self.exe = exe
+        self.rss = rss
+
+    @property
+    def key(self):
+        return (self.pid, self.create_time)
+
+
+class ProcessTable:
+    """
+    Tabla de procesos persistente entre ticks, indexada por (pid, create_time).
+
+    En cada refresco solo se consultan nombre y ejecutable de los PIDs nuevos,
+    se descartan los que han muerto y del resto únicamente se actualiza el RSS.
+    """
+
+    def __init__(self, source=psutil):
+        # 'source' expone la misma API que psutil (pids, Process); permite usar fuentes sintéticas.
+        self.source = source
+        self.entries = {}
+        # PID -> clave (pid, create_time) de su fila, para cruzar con source.pids().
+        self._keys = {}
+
+    def refresh(self):
+        current_pids = set(self.source.pids())
+        entries, keys = self.entries, self._keys
+
+        for pid in keys.keys() - current_pids:
+            del entries[keys.pop(pid)]
+
+        new_pids = current_pids - keys.keys()
+        for pid, key in list(keys.items()):
+            entry = entries[key]
+            try:
+                # Un PID reutilizado sigue en la lista: si ya es otro proceso, su fila se vuelve a cargar.
+                if not entry.proc.is_running():
+                    del entries[key], keys[pid]; new_pids.add(pid)
+                    continue
+                entry.rss = entry.proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                del entries[key], keys[pid]
+            except psutil.AccessDenied:
+                continue
+
+        for pid in new_pids:
+            entry = self._load_entry(pid)
+            if entry is not None:
+                entries[entry.key] = entry; keys[pid] = entry.key
+        return entries
+
+    def _load_entry(self, pid):
+        try:
+            proc = self.source.Process(pid)
+            with proc.oneshot():
+                create_time = proc.create_time()
+                name = proc.name()
+                try:
+                    rss = proc.memory_info().rss
+                except psutil.AccessDenied:
+                    rss = 0
+                try:
+                    exe = proc.exe()
+                except (psutil.AccessDenied, OSError):
+                    exe = None
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+            return None
+        return ProcessEntry(proc, create_time, name, exe, rss)
+
+    def top_by_name(self, count):
+        """ Agrupa por nombre de proceso y devuelve los 'count' con más RSS sin ordenar la tabla completa. """
+        totals = defaultdict(int)
+        for entry in self.entries.values():
+            totals[entry.name] += entry.rss
+        return [(name, {"rss": rss}) for name, rss in heapq.nlargest(count, totals.items(), key=itemgetter(1))]
+
+    def rows(self):
+        return tuple(ProcessRow(entry.pid, entry.create_time, entry.name, entry.rss) for entry in self.entries.values())
+
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+_CONTAINER_SCOPE = re.compile(r"^(docker|libpod|cri-containerd|crio)-([0-9a-f]{12})[0-9a-f]*\.scope$")
+
+
+class CgroupMemoryTable:
+    """
+    Consumo de memoria por unidad de systemd, slice o contenedor leyendo cgroup v2.
+
+    Cada refresco lee un único archivo (memory.current) por grupo. El árbol de grupos
+    solo se vuelve a recorrer cada RESCAN_EVERY refrescos o cuando un grupo desaparece.
+    """
+    RESCAN_EVERY = 15
+
+    def __init__(self, root=CGROUP_ROOT):
+        self.root = root
+        self.groups = {}
+        self._refreshes = 0
+        self._needs_rescan = True
+
+    @staticmethod
+    def is_available(root=CGROUP_ROOT):
+        return platform.system() == "Linux" and os.path.exists(os.path.join(root, "cgroup.controllers"))
+
+    def _scan(self):
+        groups = {}
+        pending = [self.root]
+        while pending:
+            path = pending.pop()
             try:
-                import wmi
-                self.wmi_conn = wmi.WMI()
-            except ImportError:
-                print("Advertencia: La librería WMI no está instalada. No se mostrará información detallada de CPU/GPU.")
-                self.wmi_conn = None
-            except Exception as e:
-                print(f"Error al inicializar WMI: {e}")
-                self.wmi_conn = None
+                children = [entry for entry in os.scandir(path) if entry.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+            for entry in children:
+                # Las unidades (.service, .scope) engloban a sus hijos: no hace falta descender,
+                # salvo en el gestor de usuario (user@UID.service), que agrupa las apps de escritorio.
+                is_unit = entry.name.endswith((".service", ".scope")) and not entry.name.startswith("user@")
+                if is_unit or not _has_subgroups(entry.path):
+                    groups[os.path.join(entry.path, "memory.current")] = _cgroup_label(entry.name)
+                else:
+                    pending.append(entry.path)
+        self.groups = groups
+        self._needs_rescan = False
+
+    def refresh(self):
+        if self._needs_rescan or self._refreshes % self.RESCAN_EVERY == 0:
+            self._scan()
+        self._refreshes += 1
+        usage = defaultdict(int)
+        for path, label in self.groups.items():
+            try:
+                with open(path, "rb") as f:
+                    usage[label] += int(f.read())
+            except (OSError, ValueError):
+                self._needs_rescan = True
+        return usage
+
+    def top(self, count):
+        usage = self.refresh()
+        return [(label, {"rss": rss}) for label, rss in heapq.nlargest(count, usage.items(), key=itemgetter(1)) if rss]
+
+
+def _has_subgroups(path):
+    try:
+        return any(entry.is_dir(follow_symlinks=False) for entry in os.scandir(path))
+    except OSError:
+        return False
+
+
+def _cgroup_label(name):
+    match = _CONTAINER_SCOPE.match(name)
+    if match: return f"{match.group(1)}:{match.group(2)}"
+    return name
+
+
+HARDWARE_CACHE_FILE = "hardware_cache.json"
+_PCI_VENDORS = {"0x10de": "NVIDIA", "0x1002": "AMD", "0x8086": "Intel", "0x1af4": "Virtio", "0x15ad": "VMware"}
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _machine_id():
+    if platform.system() == "Windows":
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography") as key:
+                return winreg.QueryValueEx(key, "MachineGuid")[0]
+        except OSError:
+            pass
+    return _read_text("/etc/machine-id") or _read_text("/var/lib/dbus/machine-id") or platform.node()
+
+
+def _boot_id():
+    return _read_text("/proc/sys/kernel/random/boot_id") or str(int(psutil.boot_time()))
+
+
+def _probe_windows_hardware():
+    info = {}
+    try:
+        import wmi
+    except ImportError:
+        print("Advertencia: La librería WMI no está instalada. No se mostrará información detallada de CPU/GPU.")
+        return info
+    # Cada hilo que use WMI necesita su propia inicialización de COM.
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError:
+        pythoncom = None
+    try:
+        wmi_conn = wmi.WMI()
+        info["cpu"] = wmi_conn.Win32_Processor()[0].Name.strip()
+        info["gpu"] = wmi_conn.Win32_VideoController()[0].Name.strip()
+    except Exception as e:
+        print(f"No se pudo obtener la información de hardware vía WMI: {e}")
+    finally:
+        if pythoncom: pythoncom.CoUninitialize()
+    return info
+
+
+def _probe_linux_hardware():
+    info = {}
+    cpuinfo = _read_text("/proc/cpuinfo") or ""
+    for line in cpuinfo.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() in ("model name", "Hardware", "Model") and value.strip():
+            info["cpu"] = value.strip()
+            break
+
+    gpus = []
+    try:
+        cards = sorted(entry.path for entry in os.scandir("/sys/class/drm") if re.fullmatch(r"card\d+", entry.name))
+    except OSError:
+        cards = []
+    for card in cards:
+        vendor = _read_text(os.path.join(card, "device", "vendor"))
+        device = _read_text(os.path.join(card, "device", "device"))
+        if vendor and device:
+            name = _lspci_name(vendor, device) or f"{_PCI_VENDORS.get(vendor, vendor)} {device}"
+            if name not in gpus: gpus.append(name)
+    if gpus: info["gpu"] = ", ".join(gpus)
+    return info
+
+
+def _lspci_name(vendor, device):
+    try:
+        result = subprocess.run(["lspci", "-vmm", "-d", f"{vendor[2:]}:{device[2:]}"],
+                                capture_output=True, text=True, timeout=2)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    fields = dict(line.split(":\t", 1) for line in result.stdout.splitlines() if ":\t" in line)
+    if "Device" not in fields: return None
+    return f"{fields.get('Vendor', '')} {fields['Device']}".strip()
+
+
+class SystemService:
+    # Modos de agrupación de get_top_processes_by_ram: "name" (por nombre de proceso),
+    # "cgroup" (por unidad de systemd o contenedor) o "auto" (cgroup si está disponible).
+    GROUPING_MODES = ("auto", "name", "cgroup")
+
+    def __init__(self, process_source=psutil, grouping="name"):
+        self.process_table = ProcessTable(process_source)
+        self.process_list = ProcessListDiffer()
+        self.cgroup_table = None
+        self.set_grouping(grouping)
+        self.io_tracker = IORateTracker()
+        self.hardware_cache_path = HARDWARE_CACHE_FILE
 
     def get_cpu_percent(self):
         """Obtiene el porcentaje de uso actual de la CPU."""
@@ -34,41 +393,117 @@ class SystemService:
         """Obtiene el porcentaje de uso de la RAM."""
         return psutil.virtual_memory().percent
 
+    def get_cpu_percent_per_core(self):
+        """Obtiene el porcentaje de uso de cada núcleo lógico."""
+        return psutil.cpu_percent(percpu=True)
+
+    def get_swap_percent(self):
+        """Obtiene el porcentaje de uso del archivo de intercambio."""
+        return psutil.swap_memory().percent
+
+    def get_io_counters(self):
+        """Obtiene los contadores acumulados de cada disco y de cada interfaz de red."""
+        disks = psutil.disk_io_counters(perdisk=True) or {}
+        # Los dispositivos loop y ram de Linux no son discos reales.
+        disks = {name: counters for name, counters in disks.items() if not name.startswith(("loop", "ram"))}
+        return disks, psutil.net_io_counters(pernic=True) or {}
+
     def get_hardware_info(self):
-        """Obtiene información estática del hardware (CPU, GPU, RAM)."""
+        """Obtiene información estática del hardware (CPU, GPU, RAM), desde la caché si es posible."""
+        cached = self.load_cached_hardware_info()
+        if cached is not None: return cached["info"]
+        return self.probe_hardware_info()
+
+    def load_cached_hardware_info(self):
+        """
+        Devuelve la caché de hardware de esta máquina ({"info", "stale"}) o None.
+        'stale' indica que es de un arranque anterior y conviene volver a sondear en segundo plano.
+        """
+        try:
+            with open(self.hardware_cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        machine_id, boot_id = _machine_id(), _boot_id()
+        if cache.get("machine_id") != machine_id or not isinstance(cache.get("info"), dict): return None
+        return {"info": cache["info"], "stale": cache.get("boot_id") != boot_id}
+
+    @traced()
+    def probe_hardware_info(self):
+        """Sondea el hardware (lento: WMI, /proc, lspci) y actualiza la caché en disco."""
         info = {
             "cpu": "No disponible",
             "gpu": "No disponible",
             "ram": f"{psutil.virtual_memory().total / (1024**3):.2f} GB"
         }
-        
-        # Usar WMI para info detallada en Windows
-        if self.wmi_conn:
-            try:
-                info["cpu"] = self.wmi_conn.Win32_Processor()[0].Name.strip()
-                info["gpu"] = self.wmi_conn.Win32_VideoController()[0].Name.strip()
-            except Exception as e:
-                print(f"No se pudo obtener la información de hardware vía WMI: {e}")
-                # Fallback por si WMI falla
-                info["cpu"] = platform.processor()
-        else:
-            # Fallback para otros SO o si WMI no está disponible
-            info["cpu"] = platform.processor()
-            
+        system = platform.system()
+        if system == "Windows":
+            info.update(_probe_windows_hardware())
+        elif system == "Linux":
+            info.update(_probe_linux_hardware())
+        if info["cpu"] == "No disponible":
+            # Fallback para otros SO o si el sondeo no encontró nada
+            info["cpu"] = platform.processor() or "No disponible"
+
+        try:
+            cache = {"machine_id": _machine_id(), "boot_id": _boot_id(), "info": info}
+            write_file_atomically(self.hardware_cache_path, json.dumps(cache, indent=4))
+        except OSError as e:
+            print(f"No se pudo guardar la caché de hardware: {e}")
         return info
 
-    def get_top_processes_by_ram(self, count=4):
-        """Obtiene una lista de los 'count' procesos que más RAM consumen."""
-        process_map = defaultdict(lambda: {"rss": 0})
-        
-        for p in psutil.process_iter(['name', 'memory_info']):
-            try:
-                # Agrupamos por nombre de proceso para consolidar (ej: chrome.exe)
-                process_map[p.info['name']]['rss'] += p.info['memory_info'].rss
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-        
-        # Ordenamos por memoria (rss) de forma descendente y tomamos el top 'count'
-        sorted_processes = sorted(process_map.items(), key=lambda item: item[1]['rss'], reverse=True)
-        
-        return sorted_processes[:count]
\ No newline at end of file
+    def set_grouping(self, grouping):
+        """Elige cómo agrupa get_top_processes_by_ram; sin cgroup v2 se usa siempre el nombre."""
+        if grouping not in self.GROUPING_MODES: grouping = "name"
+        if grouping != "name" and CgroupMemoryTable.is_available():
+            self.cgroup_table = self.cgroup_table or CgroupMemoryTable()
+            self.grouping = "cgroup"
+        else:
+            self.cgroup_table = None
+            self.grouping = "name"
+
+    def get_top_processes_by_ram(self, count=4, refresh=True):
+        """
+        Obtiene una lista de los 'count' procesos (o grupos de cgroup) que más RAM consumen.
+        Con refresh=False se usa la tabla de procesos tal como quedó en el último refresco.
+        """
+        if self.cgroup_table is not None:
+            return self.cgroup_table.top(count)
+        # Agrupamos por nombre de proceso para consolidar (ej: chrome.exe)
+        if refresh: self.process_table.refresh()
+        return self.process_table.top_by_name(count)
+
+    def get_process_list(self):
+        """Obtiene todos los procesos (ProcessRow) con su RSS actual."""
+        self.process_table.refresh()
+        return self.process_table.rows()
+
+    def sample(self, top_count=5, include_io=True, include_processes=False):
+        """
+        Toma una muestra del sistema y la devuelve como SystemSnapshot.
+        Con top_count=0 no se calcula el top de procesos, con include_io=False no se leen
+        contadores de E/S y con include_processes=True se incluye la lista completa de procesos.
+        """
+        # Todos los contadores acumulados se leen juntos, pegados a la marca de tiempo.
+        timestamp = time.monotonic()
+        disks, nics = (), ()
+        if include_io:
+            disk_counters, nic_counters = self.get_io_counters()
+            disks, nics = self.io_tracker.update(timestamp, disk_counters, nic_counters)
+        # Con la lista completa, el top se calcula sobre la misma tabla sin refrescarla otra vez.
+        processes = self.get_process_list() if include_processes else ()
+        # Filas, orden y diferencias de la tabla del dashboard: el hilo de la GUI solo emite las señales.
+        process_changes = self.process_list.update(processes) if include_processes else None
+        return SystemSnapshot(
+            timestamp=timestamp,
+            wall_time=time.time(),
+            cpu_percent=self.get_cpu_percent(),
+            ram_percent=self.get_ram_percent(),
+            swap_percent=self.get_swap_percent(),
+            cpu_per_core=tuple(self.get_cpu_percent_per_core()),
+            top_processes=tuple(self.get_top_processes_by_ram(top_count, refresh=not include_processes)) if top_count else (),
+            disks=disks,
+            nics=nics,
+            processes=processes,
+            process_changes=process_changes,
+        )
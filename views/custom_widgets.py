@@ -3,9 +3,10 @@
 # © 2025 Agustín Bahamondes. Todos los derechos reservados.
 
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel, QSlider, QPushButton
-from PySide6.QtCore import Qt, Signal, QSize, QRectF, QPointF, QPropertyAnimation, QEasingCurve, QPoint
-from PySide6.QtGui import QFont, QIcon, QPainter, QPen, QColor, QConicalGradient
+from PySide6.QtCore import Qt, Signal, Property, QEvent, QSize, QRectF, QPointF, QPropertyAnimation, QEasingCurve, QPoint
+from PySide6.QtGui import QFont, QIcon, QPainter, QPainterPath, QPen, QColor, QConicalGradient, QPixmap
 from PySide6.QtSvgWidgets import QSvgWidget
+from helpers.diagnostics_helper import timed
 
 class NavButton(QWidget):
     # (El código de esta clase no cambia)
@@ -57,19 +58,118 @@ class MediaPlayerWidget(QWidget):
     def set_volume(self, value): self.volume_slider.setValue(value)
 
 class CircularProgressBar(QWidget):
-    def __init__(self, title, color1, color2):
-        super().__init__(); self.value = 0; self.title = title; self.color1 = QColor(color1); self.color2 = QColor(color2); self.setMinimumSize(180, 180)
-    def setValue(self, value): self.value = value; self.update()
+    """
+    Anillo de porcentaje. El anillo de fondo y el título se pintan una vez en un QPixmap
+    (a la resolución real de la pantalla) que solo se rehace al cambiar el tamaño, el
+    estilo o la escala; cada repintado dibuja ese mapa, el arco y el número.
+    setValue() anima el valor y solo se repinta cuando cambia el porcentaje entero.
+    """
+    TRACK_COLOR = QColor("#2A2A2A"); VALUE_COLOR = QColor("#E0E0E0"); TITLE_COLOR = QColor("#8E8E8E"); RING_WIDTH = 14; ANIMATION_MS = 400
+    def __init__(self, title, color1, color2, animated=True):
+        super().__init__(); self._value = 0.0; self._shown_value = 0; self.title = title; self.color1 = QColor(color1); self.color2 = QColor(color2); self.setMinimumSize(180, 180)
+        self.value_font = QFont("Inter", 26, QFont.Bold); self.title_font = QFont("Inter", 11, QFont.Medium)
+        self._static_cache = None; self._arc_pen = None; self.animated = animated
+        self.animation = QPropertyAnimation(self, b"animatedValue", self); self.animation.setDuration(self.ANIMATION_MS); self.animation.setEasingCurve(QEasingCurve.OutCubic)
+    @property
+    def value(self): return self._value
+    def setValue(self, value):
+        if not self.animated or not self.isVisible(): self.animation.stop(); self._set_animated_value(value); return
+        self.animation.stop(); self.animation.setStartValue(self._value); self.animation.setEndValue(float(value)); self.animation.start()
+    def _get_animated_value(self): return self._value
+    def _set_animated_value(self, value):
+        self._value = value
+        if int(value) != self._shown_value: self._shown_value = int(value); self.update()
+    animatedValue = Property(float, _get_animated_value, _set_animated_value)
+    def invalidate_cache(self): self._static_cache = None; self._arc_pen = None; self.update()
+    def resizeEvent(self, event): self.invalidate_cache(); super().resizeEvent(event)
+    def changeEvent(self, event):
+        # Un cambio de hoja de estilo o de paleta (cambio de tema) rehace la capa estática.
+        if event.type() in (QEvent.StyleChange, QEvent.PaletteChange, QEvent.FontChange): self.invalidate_cache()
+        super().changeEvent(event)
+    def _ring_rect(self, side): return QRectF(12, 12, side - 24, side - 24)
+    def _build_static_layer(self, dpr):
+        side = min(self.width(), self.height()); pixmap = QPixmap(int(self.width() * dpr), int(self.height() * dpr)); pixmap.setDevicePixelRatio(dpr); pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap); painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(self.TRACK_COLOR, self.RING_WIDTH, Qt.SolidLine, Qt.FlatCap)); painter.drawArc(self._ring_rect(side), 0, 360 * 16)
+        painter.setPen(self.TITLE_COLOR); painter.setFont(self.title_font); painter.drawText(QRectF(0, 35, side, side), Qt.AlignCenter, self.title); painter.end()
+        gradient = QConicalGradient(QPointF(side / 2, side / 2), -90); gradient.setColorAt(0, self.color1); gradient.setColorAt(1, self.color2)
+        self._arc_pen = QPen(gradient, self.RING_WIDTH, Qt.SolidLine, Qt.RoundCap); self._static_cache = pixmap
+    @timed("progress_bar.paint")
     def paintEvent(self, event):
-        w, h = self.width(), self.height(); side = min(w, h); painter = QPainter(self); painter.setRenderHint(QPainter.Antialiasing)
-        gradient = QConicalGradient(QPointF(side/2, side/2), -90); gradient.setColorAt(0, self.color1); gradient.setColorAt(1, self.color2)
-        
-        # CORRECCIÓN: Se crea el QPen con el estilo correcto para evitar el TypeError
-        bg_pen = QPen(QColor("#2A2A2A"), 14, Qt.SolidLine, Qt.FlatCap)
-        painter.setPen(bg_pen); painter.drawArc(QRectF(12, 12, side - 24, side - 24), 0, 360 * 16)
-        
-        fg_pen = QPen(gradient, 14, Qt.SolidLine, Qt.RoundCap); painter.setPen(fg_pen)
-        angle = self.value * 3.6; painter.drawArc(QRectF(12, 12, side - 24, side - 24), 90 * 16, -angle * 16)
-        
-        painter.setPen(QColor("#E0E0E0")); painter.setFont(QFont("Inter", 26, QFont.Bold)); painter.drawText(QRectF(0,0,side,side), Qt.AlignCenter, f"{int(self.value)}%")
-        painter.setPen(QColor("#8E8E8E")); painter.setFont(QFont("Inter", 11, QFont.Medium)); painter.drawText(QRectF(0, 35, side, side), Qt.AlignCenter, self.title)
\ No newline at end of file
+        dpr = self.devicePixelRatioF()
+        if self._static_cache is None or self._static_cache.devicePixelRatio() != dpr: self._build_static_layer(dpr)
+        side = min(self.width(), self.height()); painter = QPainter(self); painter.drawPixmap(0, 0, self._static_cache); painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(self._arc_pen); painter.drawArc(self._ring_rect(side), 90 * 16, int(-self._shown_value * 3.6 * 16))
+        painter.setPen(self.VALUE_COLOR); painter.setFont(self.value_font); painter.drawText(QRectF(0, 0, side, side), Qt.AlignCenter, f"{self._shown_value}%")
+
+def squarify(sizes, x, y, w, h):
+    """ Distribución 'squarified' de rectángulos: 'sizes' debe venir ordenado de mayor a menor. """
+    rects = []; sizes = [s for s in sizes if s > 0]; scale = (w * h) / sum(sizes) if sizes else 0; areas = [s * scale for s in sizes]; i = 0
+    def worst(row, side):
+        total = sum(row); return max(max(side * side * a / (total * total), (total * total) / (side * side * a)) for a in row)
+    while i < len(areas):
+        side = min(w, h); row = [areas[i]]; i += 1
+        while i < len(areas) and worst(row + [areas[i]], side) <= worst(row, side): row.append(areas[i]); i += 1
+        thickness = sum(row) / side if side else 0; offset = 0
+        for a in row:
+            length = a / thickness if thickness else 0
+            # La fila ocupa el lado corto: una columna a la izquierda si el área es apaisada, una franja arriba si no.
+            rects.append(QRectF(x, y + offset, thickness, length) if w >= h else QRectF(x + offset, y, length, thickness)); offset += length
+        if w >= h: x += thickness; w -= thickness
+        else: y += thickness; h -= thickness
+    return rects
+
+class TrendLine(QWidget):
+    """
+    Evolución reciente de un porcentaje durante los últimos 'window_s' segundos. Pinta
+    directamente las memoryviews de MetricsHistory.last(), sin copiarlas; los huecos de más
+    de 'gap_s' segundos (la aplicación estuvo cerrada) cortan la línea.
+    """
+    def __init__(self, color, window_s=600, gap_s=30, parent=None):
+        super().__init__(parent); self.color = QColor(color); self.window_s = window_s; self.gap_s = gap_s
+        self.times = self.values = (); self._last_time = None; self.setFixedHeight(36)
+    def set_points(self, times, values):
+        self.times, self.values = times, values
+        # Solo hay un punto nuevo cuando se cierra un intervalo; el resto de muestras no repintan.
+        last_time = times[-1] if len(times) else None
+        if last_time != self._last_time: self._last_time = last_time; self.update()
+    def paintEvent(self, event):
+        if len(self.times) < 2: return
+        start = self.times[-1] - self.window_s; width, height = self.width(), self.height() - 2
+        path = QPainterPath(); previous = None
+        for timestamp, value in zip(self.times, self.values):
+            if timestamp < start: continue
+            point = QPointF((timestamp - start) / self.window_s * width, 1 + height * (1 - min(max(value, 0.0), 100.0) / 100))
+            if previous is None or timestamp - previous > self.gap_s: path.moveTo(point)
+            else: path.lineTo(point)
+            previous = timestamp
+        painter = QPainter(self); painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(self.color, 1.5)); painter.drawPath(path); painter.end()
+
+class TreemapWidget(QWidget):
+    """ Treemap de (etiqueta, bytes, clave); al pulsar un rectángulo emite su clave. """
+    item_clicked = Signal(object)
+    MAX_ITEMS = 60
+    COLORS = ("#7F5AF0", "#2CB67D", "#E16259", "#F2B705", "#3DA9FC", "#EF4565", "#94A1B2", "#FF8906")
+    def __init__(self, parent=None):
+        super().__init__(parent); self.setMinimumHeight(220); self.setMouseTracking(True); self._items = []; self._rects = []
+    def set_items(self, items):
+        self._items = sorted((item for item in items if item[1] > 0), key=lambda item: item[1], reverse=True)[:self.MAX_ITEMS]; self._rects = []; self.update()
+    def resizeEvent(self, event): self._rects = []; super().resizeEvent(event)
+    def _layout(self):
+        if not self._rects and self._items: self._rects = squarify([item[1] for item in self._items], 0, 0, self.width(), self.height())
+        return self._rects
+    def _item_at(self, pos):
+        for item, rect in zip(self._items, self._layout()):
+            if rect.contains(QPointF(pos)): return item
+        return None
+    def mouseMoveEvent(self, event):
+        item = self._item_at(event.position().toPoint()); self.setToolTip(f"{item[0]}\n{item[1] / (1024 ** 3):.2f} GB" if item else "")
+    def mousePressEvent(self, event):
+        item = self._item_at(event.position().toPoint())
+        if item is not None and item[2] is not None: self.item_clicked.emit(item[2])
+    def paintEvent(self, event):
+        painter = QPainter(self); painter.setFont(QFont("Inter", 9, QFont.Medium))
+        for i, (item, rect) in enumerate(zip(self._items, self._layout())):
+            painter.fillRect(rect.adjusted(1, 1, -1, -1), QColor(self.COLORS[i % len(self.COLORS)]))
+            if rect.width() > 60 and rect.height() > 20: painter.setPen(QColor("white")); painter.drawText(rect.adjusted(6, 4, -6, -4), Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, item[0])
@@ -3,36 +3,87 @@
 # © 2025 Agustín Bahamondes. Todos los derechos reservados.
 
 import os, sys
-from PySide6.QtCore import QSize, Qt
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QStackedWidget, QPushButton
-from PySide6.QtGui import QIcon, QFont, QPixmap
+from PySide6.QtCore import QSize, Qt, QEvent, QTimer, Signal
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QStackedWidget, QPushButton, QSystemTrayIcon
+from PySide6.QtGui import QIcon, QFont, QPixmap, QShortcut, QKeySequence
 from helpers.style_helper import get_app_stylesheet
-from helpers.config_helper import load_config, save_config
-from views.page_widgets import DashboardPage, OptimizationPage, SettingsPage, NotesPage, CalendarPage
+from helpers.config_helper import load_config, save_config_deferred, flush_config, get_section
+from helpers.import_helper import is_installed
+from helpers.trace_helper import span, traced, mark
+from helpers.diagnostics_helper import is_enabled as diagnostics_enabled
+from views.page_widgets import DashboardPage, OptimizationPage, SettingsPage, NotesPage, CalendarPage, DiagnosticsPage
 from views.custom_widgets import NavButton, MediaPlayerWidget
 from services.media_service import MediaService
+from services.notes_store import close_notes_store, migrate_legacy_notes
+from services.scheduler_service import SchedulerService
+from services.metrics_collector import EventLoopLagProbe
+from services.alert_service import AlertService
 
-try:
-    from comtypes import CoInitialize, CoUninitialize
-    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-    AUDIO_ENABLED = True
-except (ImportError, OSError):
-    AUDIO_ENABLED = False
+# pycaw y comtypes se importan al inicializar el audio, después del primer pintado.
+AUDIO_ENABLED = is_installed("pycaw") and is_installed("comtypes")
+# Las páginas que no se abren al arrancar se construyen en la primera visita o, si se
+# activa, de una en una cuando la ventana ya se ha pintado.
+PAGES_DEFAULTS = {"prewarm": True, "prewarm_delay_ms": 1500}
 
 class AGOptimizerApp(QMainWindow):
+    # Se emite tras el primer pintado de la ventana, cuando ya se puede cerrar el splash.
+    first_painted = Signal()
+    # Como mucho un cambio de volumen real cada VOLUME_INTERVAL_MS mientras se arrastra el control.
+    VOLUME_INTERVAL_MS = 50
+
     def __init__(self):
-        super().__init__(); self.config = load_config(); self.audio_interface = None
+        super().__init__(); self.config = load_config(); self.audio_interface = None; self._painted = False
+        # Las notas antiguas salen de este mismo dict: es el que la ventana vuelve a guardar.
+        migrate_legacy_notes(self.config)
+        self.page_settings = get_section("pages", PAGES_DEFAULTS, self.config); self.page_widgets = {}
+        self.page_factories = {
+            "dashboard": lambda: DashboardPage(config=self.config),
+            "optimization": OptimizationPage,
+            "notes": NotesPage,
+            "calendar": lambda: CalendarPage(theme=self.config.get('theme', 'dark')),
+            "settings": self._create_settings_page,
+            "diagnostics": lambda: DiagnosticsPage(media_service=self.media_service, collector=self.dashboard_page.collector),
+        }
+        self._pending_volume = None; self.volume_timer = QTimer(self); self.volume_timer.setSingleShot(True); self.volume_timer.setInterval(self.VOLUME_INTERVAL_MS); self.volume_timer.timeout.connect(self._apply_pending_volume)
         self.setWindowTitle("AG, Optimizer"); self.setMinimumSize(QSize(1280, 800))
         if os.path.exists(os.path.join("resources", "logo.png")): self.setWindowIcon(QIcon(os.path.join("resources", "logo.png")))
         
         self.init_ui()
         self.apply_theme()
         
-        self.init_audio_interface()
-        self.media_service = MediaService()
+        with span("MediaService()"): self.media_service = MediaService()
         self.media_service.media_changed.connect(self.update_media_info)
-        self.media_service.start()
+        self.media_player.play_pause_clicked.connect(self.media_service.send_play_pause); self.media_player.next_clicked.connect(self.media_service.send_next)
+        self.media_player.prev_clicked.connect(self.media_service.send_prev)
+        with span("SchedulerService()"): self.scheduler = SchedulerService(self.config)
+        self.scheduler.attach(self.dashboard_page.collector)
+        self.tray_icon = None; self.alert_service = AlertService(self.config, self.scheduler); self.alert_service.alert_triggered.connect(self.show_alert)
+        self.alert_service.attach(self.dashboard_page.collector)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._painted: return
+        # Se espera a la siguiente vuelta del bucle para que el fotograma ya esté en pantalla.
+        self._painted = True; mark("primer pintado"); QTimer.singleShot(0, self._after_first_paint)
+
+    @traced("trabajo tras el primer pintado")
+    def _after_first_paint(self):
+        """ El trabajo que no hace falta para el primer fotograma empieza con la ventana ya visible. """
+        self.first_painted.emit()
+        self.init_audio_interface()
+        with span("MediaService.start"): self.media_service.start()
+        with span("SchedulerService.start"): self.scheduler.start()
+        if diagnostics_enabled(): self.lag_probe = EventLoopLagProbe(self); self.lag_probe.start()
+        if self.page_settings["prewarm"]: QTimer.singleShot(int(self.page_settings["prewarm_delay_ms"]), self._prewarm_next_page)
+
+    def _prewarm_next_page(self):
+        """ Construye una página pendiente por vuelta del bucle, para no bloquear la interfaz. """
+        pending = [name for name, button in self.nav_buttons.items() if name not in self.page_widgets and not button.isHidden()]
+        if not pending: return
+        self.page(pending[0])
+        if len(pending) > 1: QTimer.singleShot(0, self._prewarm_next_page)
 
+    @traced()
     def init_ui(self):
         main_widget = QWidget(); self.setCentralWidget(main_widget)
         app_layout = QHBoxLayout(main_widget); app_layout.setContentsMargins(0,0,0,0); app_layout.setSpacing(0)
@@ -59,6 +110,8 @@ class AGOptimizerApp(QMainWindow):
         
         self.pages = QStackedWidget(); content_container.addWidget(self.pages, 1)
         self.media_player = MediaPlayerWidget(); content_container.addWidget(self.media_player)
+        # Hasta que se inicialice el audio (tras el primer pintado) el volumen no se puede mover.
+        self.media_player.volume_slider.setEnabled(False)
 
         self.nav_buttons = {
             "dashboard": NavButton("resources/icons/layout-dashboard.svg", "Dashboard"),
@@ -66,53 +119,97 @@ class AGOptimizerApp(QMainWindow):
             "notes": NavButton("resources/icons/notebook-pen.svg", "Notas Rápidas"),
             "calendar": NavButton("resources/icons/calendar-days.svg", "Calendario"),
             "settings": NavButton("resources/icons/sliders-horizontal.svg", "Ajustes"),
+            "diagnostics": NavButton("resources/icons/zap.svg", "Diagnóstico"),
         }
         for name, button in self.nav_buttons.items():
             button.clicked.connect(lambda name=name: self.switch_page(name))
             sidebar_layout.addWidget(button)
+        # La página de diagnóstico está oculta salvo con --diagnostics; Ctrl+Shift+D la muestra igualmente.
+        self.nav_buttons["diagnostics"].setVisible(diagnostics_enabled())
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.show_diagnostics)
 
         sidebar_layout.addStretch()
         help_button = NavButton("resources/icons/message-circle-question.svg", "Ayuda", is_checkable=False)
         sidebar_layout.addWidget(help_button)
         
-        # Conexión de páginas funcionales
-        self.pages.addWidget(DashboardPage())
-        self.pages.addWidget(OptimizationPage())
-        self.pages.addWidget(NotesPage())
-        self.pages.addWidget(CalendarPage())
-        settings_page = SettingsPage(); settings_page.theme_changed.connect(self.toggle_theme); self.pages.addWidget(settings_page)
-        
-        self.switch_page("dashboard")
-        self.media_player.play_pause_clicked.connect(MediaService.send_play_pause); self.media_player.next_clicked.connect(MediaService.send_next)
-        self.media_player.prev_clicked.connect(MediaService.send_prev); self.media_player.volume_changed.connect(self.set_volume)
+        # Un hueco vacío por página; page() lo sustituye por la página real la primera vez.
+        for name in self.nav_buttons: self.pages.addWidget(QWidget())
+        self.switch_page("dashboard"); self.dashboard_page = self.page_widgets["dashboard"]
+        self.media_player.volume_changed.connect(self.set_volume)
+
+    def page(self, name):
+        """ Devuelve la página 'name', construyéndola la primera vez que se pide. """
+        widget = self.page_widgets.get(name)
+        if widget is None:
+            with span(f"página {name}"): widget = self.page_widgets[name] = self.page_factories[name]()
+            position = list(self.nav_buttons).index(name); placeholder = self.pages.widget(position)
+            self.pages.insertWidget(position, widget); self.pages.removeWidget(placeholder); placeholder.deleteLater()
+        return widget
+
+    def show_diagnostics(self):
+        self.nav_buttons["diagnostics"].show(); self.switch_page("diagnostics")
+
+    def _create_settings_page(self):
+        settings_page = SettingsPage(config=self.config); settings_page.theme_changed.connect(self.toggle_theme)
+        return settings_page
 
+    @traced()
     def init_audio_interface(self):
-        if not AUDIO_ENABLED: self.media_player.volume_slider.setEnabled(False); return
+        if not AUDIO_ENABLED: return
         try:
+            from comtypes import CoInitialize, cast, POINTER
+            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
             CoInitialize()
-            from comtypes import cast, POINTER
             speakers = AudioUtilities.GetSpeakers(); interface = speakers.Activate(IAudioEndpointVolume._iid_, 7, None)
             self.audio_interface = cast(interface, POINTER(IAudioEndpointVolume))
             volume = int(self.audio_interface.GetMasterVolumeLevelScalar() * 100)
-            self.media_player.set_volume(volume)
-        except Exception as e: print(f"No se pudo inicializar la interfaz de audio: {e}"); self.media_player.volume_slider.setEnabled(False)
+            self.media_player.set_volume(volume); self.media_player.volume_slider.setEnabled(True)
+        except Exception as e: print(f"No se pudo inicializar la interfaz de audio: {e}")
 
     def set_volume(self, value):
-        if self.audio_interface: self.audio_interface.SetMasterVolumeLevelScalar(value / 100.0, None)
+        """ El primer cambio se aplica al momento; los siguientes se agrupan y se aplica solo el último. """
+        if not self.audio_interface: return
+        if self.volume_timer.isActive(): self._pending_volume = value; return
+        self.audio_interface.SetMasterVolumeLevelScalar(value / 100.0, None); self.volume_timer.start()
+
+    def _apply_pending_volume(self):
+        if self._pending_volume is None or not self.audio_interface: return
+        value, self._pending_volume = self._pending_volume, None
+        self.audio_interface.SetMasterVolumeLevelScalar(value / 100.0, None); self.volume_timer.start()
 
     def update_media_info(self, media_info): self.media_player.update_track_info(media_info)
 
+    def show_alert(self, alert):
+        """ Notificación de escritorio de una regla de alerta; sin bandeja del sistema se escribe en consola. """
+        if not alert["notify"]: return
+        if not QSystemTrayIcon.isSystemTrayAvailable(): print(f"Alerta: {alert['rule']}: {alert['message']}"); return
+        if self.tray_icon is None:
+            icon = self.windowIcon() if not self.windowIcon().isNull() else QIcon("resources/icons/bell.svg")
+            self.tray_icon = QSystemTrayIcon(icon, self); self.tray_icon.activated.connect(lambda _: self.showNormal()); self.tray_icon.show()
+        self.tray_icon.showMessage(alert["rule"], alert["message"], QSystemTrayIcon.Warning, 10000)
+
     def toggle_theme(self, theme):
-        self.config['theme'] = theme; save_config(self.config); self.apply_theme()
+        # Cambiar de tema varias veces seguidas acaba en una sola escritura, fuera del hilo de la GUI.
+        self.config['theme'] = theme; save_config_deferred(self.config); self.apply_theme()
+        if "calendar" in self.page_widgets: self.page_widgets["calendar"].set_theme(theme)
 
+    @traced()
     def apply_theme(self): self.setStyleSheet(get_app_stylesheet(self.config.get('theme', 'dark')))
 
     def switch_page(self, name):
         self.page_title.setText(name.replace("_", " ").title())
         for btn_name, button in self.nav_buttons.items(): button.setChecked(btn_name == name)
-        self.pages.setCurrentIndex(list(self.nav_buttons.keys()).index(name))
+        self.pages.setCurrentWidget(self.page(name))
+
+    def changeEvent(self, event):
+        # Al minimizar, el dashboard deja de pedir muestreo rápido.
+        if event.type() == QEvent.WindowStateChange and hasattr(self, "dashboard_page"): self.dashboard_page.update_demand()
+        super().changeEvent(event)
 
     def closeEvent(self, event):
-        self.media_service.stop(); self.media_service.wait()
-        if AUDIO_ENABLED and self.audio_interface: CoUninitialize()
+        self.media_service.stop(); self.media_service.wait(); self.scheduler.stop()
+        self.dashboard_page.stop_monitoring(); flush_config(); close_notes_store()
+        if self.audio_interface:
+            from comtypes import CoUninitialize
+            CoUninitialize()
         super().closeEvent(event)
\ No newline at end of file
@@ -2,20 +2,38 @@
 # -*- coding: utf-8 -*-
 # © 2025 Agustín Bahamondes. Todos los derechos reservados.
 
+import os
+from bisect import bisect_right
+
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, 
-                               QPushButton, QGridLayout, QTextEdit, QCalendarWidget, QSplitter)
+                               QPushButton, QGridLayout, QTextEdit, QCalendarWidget, QSplitter, QFileDialog,
+                               QTreeWidget, QTreeWidgetItem, QMessageBox, QTableView, QLineEdit, QHeaderView)
 from PySide6.QtCore import Qt, QTimer, QThreadPool, Signal, QDate
 from PySide6.QtGui import QFont, QTextCharFormat, QColor
 
 from services.system_service import SystemService
-from services.optimization_service import TempCleaner, DNSFlush
-from .custom_widgets import CircularProgressBar, IOSSwitch
-from helpers.config_helper import save_config, load_config
+from services.metrics_collector import MetricsCollector, HardwareProbe, DEFAULT_POLLING
+from services.metrics_history import MetricsHistory
+from services.metrics_store import open_history_recorder, load_recent_history
+from services.optimization_service import TempCleaner, DuplicateFinder, DuplicateResolver, DNSFlush
+from services.disk_usage_service import DiskUsageScanner
+from services.notes_store import get_notes_store
+from .custom_widgets import CircularProgressBar, TrendLine, IOSSwitch, TreemapWidget
+from .process_model import ProcessTableModel
+from helpers.config_helper import load_config, get_section
+from helpers.trace_helper import span, traced
+from helpers.diagnostics_helper import timed, histograms, reset_all, is_enabled as diagnostics_enabled
+from helpers.import_helper import lazy_module
+
+# psutil solo hace falta en la página de diagnóstico, que se construye bajo demanda.
+psutil = lazy_module("psutil")
 
 class DashboardPage(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.system_service = SystemService()
+    def __init__(self, parent=None, config=None):
+        super().__init__(parent); config = config if config is not None else load_config()
+        with span("SystemService()"): self.system_service = SystemService(grouping=config.get("process_grouping", "auto"))
+        # Las tarjetas ocultas en config.json no se construyen a medias: tampoco se muestrean.
+        layout_flags = config.get("layout", {}); self.show_components = layout_flags.get("show_components", True); self.show_processes = layout_flags.get("show_processes", True)
         
         main_layout = QVBoxLayout(self); main_layout.setContentsMargins(30, 20, 30, 30); main_layout.setSpacing(25)
         
@@ -23,8 +41,10 @@ class DashboardPage(QWidget):
         
         self.cpu_progress = CircularProgressBar("Uso de CPU", "#7F5AF0", "#9D82F2")
         self.ram_progress = CircularProgressBar("Uso de RAM", "#2CB67D", "#4AE3A5")
-        cpu_card = QFrame(objectName="card"); cpu_layout = QVBoxLayout(cpu_card); cpu_layout.addWidget(self.cpu_progress)
-        ram_card = QFrame(objectName="card"); ram_layout = QVBoxLayout(ram_card); ram_layout.addWidget(self.ram_progress)
+        # Últimos 10 minutos de la media de cada intervalo de 10 s del historial.
+        self.cpu_trend = TrendLine("#7F5AF0", self.TREND_POINTS * self.TREND_RESOLUTION); self.ram_trend = TrendLine("#2CB67D", self.TREND_POINTS * self.TREND_RESOLUTION)
+        cpu_card = QFrame(objectName="card"); cpu_layout = QVBoxLayout(cpu_card); cpu_layout.addWidget(self.cpu_progress); cpu_layout.addWidget(self.cpu_trend)
+        ram_card = QFrame(objectName="card"); ram_layout = QVBoxLayout(ram_card); ram_layout.addWidget(self.ram_progress); ram_layout.addWidget(self.ram_trend)
         
         info_card = QFrame(objectName="card"); info_layout = QVBoxLayout(info_card); info_layout.addWidget(QLabel("Componentes", className="cardTitle"))
         info_grid = QGridLayout(); info_grid.setContentsMargins(15, 10, 15, 15); self.cpu_label, self.gpu_label, self.ram_label = QLabel("..."), QLabel("..."), QLabel("...")
@@ -34,66 +54,292 @@ class DashboardPage(QWidget):
         info_layout.addLayout(info_grid); info_layout.addStretch()
 
         processes_card = QFrame(objectName="card"); proc_layout = QVBoxLayout(processes_card)
-        proc_layout.addWidget(QLabel("Procesos con más RAM", className="cardTitle"))
-        self.proc_grid = QGridLayout(); self.proc_grid.setContentsMargins(15, 5, 15, 10)
-        proc_layout.addLayout(self.proc_grid); proc_layout.addStretch()
+        proc_layout.addWidget(QLabel("Procesos", className="cardTitle"))
+        # El modelo conserva las filas entre muestras; la vista solo repinta lo que cambia.
+        self.process_model = ProcessTableModel(self, self.system_service.process_list)
+        self.process_filter = QLineEdit(placeholderText="Filtrar por nombre o PID..."); self.process_filter.setClearButtonEnabled(True)
+        self.process_filter.textChanged.connect(self.process_model.set_filter_text)
+        # Filas de altura fija: la vista calcula qué filas se ven sin preguntar al modelo por cada una.
+        self.process_view = QTableView(); self.process_view.setModel(self.process_model); self.process_view.setSelectionBehavior(QTableView.SelectRows)
+        self.process_view.verticalHeader().hide(); self.process_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed); self.process_view.setShowGrid(False)
+        self.process_view.setSortingEnabled(True); self.process_view.sortByColumn(ProcessTableModel.MEMORY_COLUMN, Qt.DescendingOrder)
+        self.process_view.horizontalHeader().setSectionResizeMode(ProcessTableModel.NAME_COLUMN, QHeaderView.Stretch)
+        proc_layout.addWidget(self.process_filter); proc_layout.addWidget(self.process_view, 1)
+        # Resumen agrupado por nombre o, según process_grouping, por servicio de systemd o contenedor.
+        group_title = "Servicios con más RAM" if self.system_service.grouping == "cgroup" else "Procesos con más RAM"
+        proc_layout.addWidget(QLabel(group_title, className="cardTitle"))
+        group_grid = QGridLayout(); group_grid.setContentsMargins(15, 5, 15, 10); self.group_rows = self._create_group_rows(group_grid)
+        proc_layout.addLayout(group_grid)
+
+        disk_card = QFrame(objectName="card"); disk_layout = QVBoxLayout(disk_card)
+        disk_layout.addWidget(QLabel("Discos (lectura / escritura)", className="cardTitle"))
+        disk_grid = QGridLayout(); disk_grid.setContentsMargins(15, 5, 15, 10); self.disk_rows = self._create_io_rows(disk_grid)
+        disk_layout.addLayout(disk_grid); disk_layout.addStretch()
+
+        net_card = QFrame(objectName="card"); net_layout = QVBoxLayout(net_card)
+        net_layout.addWidget(QLabel("Red (recibido / enviado)", className="cardTitle"))
+        net_grid = QGridLayout(); net_grid.setContentsMargins(15, 5, 15, 10); self.net_rows = self._create_io_rows(net_grid)
+        net_layout.addLayout(net_grid); net_layout.addStretch()
 
         grid.addWidget(cpu_card, 0, 0); grid.addWidget(ram_card, 0, 1)
         grid.addWidget(info_card, 1, 0); grid.addWidget(processes_card, 1, 1)
+        grid.addWidget(disk_card, 2, 0); grid.addWidget(net_card, 2, 1)
+        info_card.setVisible(self.show_components); processes_card.setVisible(self.show_processes)
         main_layout.addLayout(grid, 1)
 
-        self.monitor_timer = QTimer(self); self.monitor_timer.timeout.connect(self.update_dynamic_data); self.monitor_timer.start(2000)
-        self.load_static_data(); self.update_dynamic_data()
+        # El muestreo ocurre en un hilo aparte; aquí solo pintamos las muestras recibidas.
+        polling = get_section("polling", DEFAULT_POLLING, config)
+        self.collector = MetricsCollector(self.system_service, interval_ms=polling["active_interval_ms"], top_count=self.GROUP_ROWS, idle_interval_ms=polling["idle_interval_ms"])
+        self.demand_channels = ("core", "io", "processes", "process_list") if self.show_processes else ("core", "io")
+        # El historial en disco se lee antes de abrirlo para escribir, con el colector aún parado.
+        self.history = MetricsHistory(); load_recent_history(self.history, self.TREND_POINTS, config); self.collector.add_observer(self.history.append_snapshot)
+        self.history_recorder = open_history_recorder(config)
+        if self.history_recorder: self.collector.add_observer(self.history_recorder)
+        self.collector.snapshot_ready.connect(self.update_dynamic_data)
+        self._hardware_probe_pending = False
+        if self.show_components: self.load_static_data()
+        self.collector.start()
+
+    def stop_monitoring(self):
+        self.collector.stop(); self.collector.wait()
+        if self.history_recorder: self.history_recorder.ring_file.close()
         
+    IO_ROWS = 4
+    GROUP_ROWS = 5
+    TREND_POINTS = 60
+    TREND_RESOLUTION = 10
+
+    @classmethod
+    def _create_group_rows(cls, grid):
+        rows = []
+        for i in range(cls.GROUP_ROWS):
+            row = (QLabel(), QLabel())
+            grid.addWidget(row[0], i, 0); grid.addWidget(row[1], i, 1, Qt.AlignRight)
+            rows.append(row)
+        return rows
+
+    def _fill_group_rows(self, groups):
+        # Las etiquetas se reutilizan en cada muestra; solo cambia su texto.
+        for (name_label, memory_label), group in zip(self.group_rows, list(groups) + [None] * (len(self.group_rows) - len(groups))):
+            if group is None: name_label.clear(); memory_label.clear(); continue
+            name, data = group
+            name_label.setText(name[:20]); memory_label.setText(f"{data['rss'] / (1024 * 1024):.1f} MB")
+
+    @classmethod
+    def _create_io_rows(cls, grid):
+        rows = []
+        for i in range(cls.IO_ROWS):
+            row = (QLabel(), QLabel(), QLabel())
+            grid.addWidget(row[0], i, 0); grid.addWidget(row[1], i, 1, Qt.AlignRight); grid.addWidget(row[2], i, 2, Qt.AlignRight)
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _fill_io_rows(rows, items):
+        for row, item in zip(rows, items + [None] * (len(rows) - len(items))):
+            if item is None:
+                for label in row: label.clear()
+                continue
+            name, first, second, detail = item
+            row[0].setText(name[:16]); row[1].setText(f"{format_rate(first)} / {format_rate(second)}"); row[2].setText(detail)
+
+    @traced()
     def load_static_data(self):
-        info = self.system_service.get_hardware_info()
+        # La caché se sirve al instante; el sondeo lento se hace tras mostrar la ventana.
+        cached = self.system_service.load_cached_hardware_info()
+        if cached: self.show_hardware_info(cached['info'])
+        self._hardware_probe_pending = cached is None or cached['stale']
+
+    def showEvent(self, event):
+        super().showEvent(event); self.update_demand()
+        if self._hardware_probe_pending:
+            self._hardware_probe_pending = False; QTimer.singleShot(0, self.refresh_hardware_info)
+
+    def hideEvent(self, event):
+        super().hideEvent(event); self.update_demand()
+
+    def update_demand(self):
+        """ Solo se pide muestreo rápido mientras la página está a la vista (visible y sin minimizar). """
+        visible = self.isVisible() and not self.window().isMinimized()
+        self.collector.set_demand("dashboard", self.demand_channels if visible else ())
+
+    def refresh_hardware_info(self):
+        probe = HardwareProbe(self.system_service); probe.signals.finished.connect(self.show_hardware_info)
+        QThreadPool.globalInstance().start(probe)
+
+    def show_hardware_info(self, info):
         self.cpu_label.setText(info['cpu']); self.gpu_label.setText(info['gpu']); self.ram_label.setText(info['ram'])
 
-    def update_dynamic_data(self):
-        self.cpu_progress.setValue(self.system_service.get_cpu_percent())
-        self.ram_progress.setValue(self.system_service.get_ram_percent())
-        
-        while (item := self.proc_grid.takeAt(0)) is not None:
-            if item.widget(): item.widget().deleteLater()
-        
-        top_processes = self.system_service.get_top_processes_by_ram(5)
-        for i, (name, data) in enumerate(top_processes):
-            mem_mb = data['rss'] / (1024 * 1024)
-            self.proc_grid.addWidget(QLabel(name[:20]), i, 0)
-            self.proc_grid.addWidget(QLabel(f"{mem_mb:.1f} MB"), i, 1, Qt.AlignRight)
+    @timed("dashboard.tick")
+    def update_dynamic_data(self, snapshot):
+        self.cpu_progress.setValue(snapshot.cpu_percent)
+        self.ram_progress.setValue(snapshot.ram_percent)
+        for trend, name in ((self.cpu_trend, "cpu"), (self.ram_trend, "ram")):
+            view = self.history.last(name, self.TREND_POINTS, self.TREND_RESOLUTION); trend.set_points(view.times, view.avgs)
+        # Las muestras sin el canal "process_list" (página oculta) no vacían la tabla.
+        if snapshot.process_changes is not None: self.process_model.apply_changes(snapshot.process_changes)
+        if snapshot.top_processes: self._fill_group_rows(snapshot.top_processes)
+
+        # Mostramos los dispositivos con más actividad.
+        disks = sorted(snapshot.disks, key=lambda d: d.read_bytes_per_s + d.write_bytes_per_s, reverse=True)[:self.IO_ROWS]
+        self._fill_io_rows(self.disk_rows, [(d.name, d.read_bytes_per_s, d.write_bytes_per_s, f"{d.read_iops + d.write_iops:.0f} IOPS") for d in disks])
+        nics = sorted(snapshot.nics, key=lambda n: n.rx_bytes_per_s + n.tx_bytes_per_s, reverse=True)[:self.IO_ROWS]
+        self._fill_io_rows(self.net_rows, [(n.name, n.rx_bytes_per_s, n.tx_bytes_per_s, f"{n.rx_packets_per_s + n.tx_packets_per_s:.0f} paq/s") for n in nics])
+
+def format_rate(bytes_per_s):
+    """ Formatea una tasa en bytes por segundo con la unidad adecuada. """
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if bytes_per_s < 1024: return f"{bytes_per_s:.1f} {unit}"
+        bytes_per_s /= 1024
+    return f"{bytes_per_s:.1f} GB/s"
+
+def format_size(size):
+    """ Formatea un tamaño en bytes con la unidad adecuada. """
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024: return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
 
 class OptimizationPage(QWidget):
+    DUPLICATE_FINDER_DEFAULTS = {"min_size_kb": 1, "workers": 0}
+
     def __init__(self, parent=None):
-        super().__init__(parent); self.thread_pool = QThreadPool()
+        super().__init__(parent); self.thread_pool = QThreadPool(); self.temp_cleaner = None; self.disk_scanner = None; self.disk_index = None; self.treemap_node = 0
+        self.duplicate_finder = None; self.duplicate_groups = []; self.duplicate_keys = []
         main_layout = QVBoxLayout(self); main_layout.setContentsMargins(30, 20, 30, 30); main_layout.setSpacing(20)
         self.status_label = QLabel("Selecciona una tarea para comenzar.")
-        clean_temp_btn = QPushButton("🧹 Limpiar Archivos Temporales"); clean_temp_btn.setObjectName("primary"); clean_temp_btn.clicked.connect(self.clean_temp)
+        self.progress_label = QLabel(); self.progress_label.setVisible(False)
+        clean_temp_row = QHBoxLayout()
+        self.clean_temp_btn = QPushButton("🧹 Limpiar Archivos Temporales"); self.clean_temp_btn.setObjectName("primary"); self.clean_temp_btn.clicked.connect(self.clean_temp)
+        self.cancel_temp_btn = QPushButton("Cancelar"); self.cancel_temp_btn.setVisible(False); self.cancel_temp_btn.clicked.connect(self.cancel_clean_temp)
+        clean_temp_row.addWidget(self.clean_temp_btn, 1); clean_temp_row.addWidget(self.cancel_temp_btn)
         flush_dns_btn = QPushButton("🌐 Limpiar Caché de DNS"); flush_dns_btn.setObjectName("primary"); flush_dns_btn.clicked.connect(self.flush_dns)
-        main_layout.addWidget(self.status_label); main_layout.addSpacing(10); main_layout.addWidget(clean_temp_btn); main_layout.addWidget(flush_dns_btn); main_layout.addStretch()
+        disk_usage_row = QHBoxLayout()
+        self.disk_usage_btn = QPushButton("📊 Analizar Uso de Disco"); self.disk_usage_btn.setObjectName("primary"); self.disk_usage_btn.clicked.connect(self.analyze_disk_usage)
+        self.cancel_disk_btn = QPushButton("Cancelar"); self.cancel_disk_btn.setVisible(False); self.cancel_disk_btn.clicked.connect(self.cancel_disk_usage)
+        disk_usage_row.addWidget(self.disk_usage_btn, 1); disk_usage_row.addWidget(self.cancel_disk_btn)
+        self.disk_card = QFrame(objectName="card"); disk_layout = QVBoxLayout(self.disk_card); self.disk_card.setVisible(False)
+        disk_header = QHBoxLayout(); self.treemap_title = QLabel("", className="cardTitle"); self.treemap_up_btn = QPushButton("⬆ Subir"); self.treemap_up_btn.clicked.connect(self.treemap_up)
+        disk_header.addWidget(self.treemap_title, 1); disk_header.addWidget(self.treemap_up_btn); disk_layout.addLayout(disk_header)
+        self.treemap = TreemapWidget(); self.treemap.item_clicked.connect(self.show_treemap_node); disk_layout.addWidget(self.treemap, 1)
+        lists_layout = QHBoxLayout(); self.largest_dirs_label = QLabel(); self.largest_files_label = QLabel()
+        for label in (self.largest_dirs_label, self.largest_files_label): label.setAlignment(Qt.AlignTop | Qt.AlignLeft); label.setWordWrap(True); lists_layout.addWidget(label, 1)
+        disk_layout.addLayout(lists_layout)
+        duplicates_row = QHBoxLayout()
+        self.duplicates_btn = QPushButton("🗂️ Buscar Archivos Duplicados"); self.duplicates_btn.setObjectName("primary"); self.duplicates_btn.clicked.connect(self.find_duplicates)
+        self.cancel_duplicates_btn = QPushButton("Cancelar"); self.cancel_duplicates_btn.setVisible(False); self.cancel_duplicates_btn.clicked.connect(self.cancel_find_duplicates)
+        duplicates_row.addWidget(self.duplicates_btn, 1); duplicates_row.addWidget(self.cancel_duplicates_btn)
+        self.duplicates_card = QFrame(objectName="card"); duplicates_layout = QVBoxLayout(self.duplicates_card); self.duplicates_card.setVisible(False)
+        self.duplicates_tree = QTreeWidget(); self.duplicates_tree.setHeaderLabels(["Archivo", "Recuperable"]); self.duplicates_tree.setSelectionMode(QTreeWidget.ExtendedSelection); self.duplicates_tree.setUniformRowHeights(True)
+        duplicate_actions = QHBoxLayout(); self.link_duplicates_btn = QPushButton("🔗 Enlazar copias seleccionadas"); self.delete_duplicates_btn = QPushButton("🗑️ Eliminar copias seleccionadas")
+        self.link_duplicates_btn.clicked.connect(lambda: self.resolve_duplicates("hardlink")); self.delete_duplicates_btn.clicked.connect(lambda: self.resolve_duplicates("delete"))
+        duplicate_actions.addWidget(self.link_duplicates_btn); duplicate_actions.addWidget(self.delete_duplicates_btn)
+        duplicates_layout.addWidget(QLabel("Duplicados (se conserva el primer archivo de cada grupo)", className="cardTitle")); duplicates_layout.addWidget(self.duplicates_tree, 1); duplicates_layout.addLayout(duplicate_actions)
+        main_layout.addWidget(self.status_label); main_layout.addWidget(self.progress_label); main_layout.addSpacing(10); main_layout.addLayout(clean_temp_row); main_layout.addWidget(flush_dns_btn); main_layout.addLayout(disk_usage_row); main_layout.addLayout(duplicates_row)
+        main_layout.addWidget(self.disk_card, 1); main_layout.addWidget(self.duplicates_card, 1); main_layout.addStretch()
     def task_finished(self, m): self.status_label.setText(f"✅ {m}")
     def task_error(self, m): self.status_label.setText(f"❌ {m}")
     def clean_temp(self):
-        self.status_label.setText("Limpiando en segundo plano..."); worker = TempCleaner(); worker.signals.finished.connect(self.task_finished); worker.signals.error.connect(self.task_error)
+        self.status_label.setText("Limpiando en segundo plano..."); self.progress_label.setText(""); self.progress_label.setVisible(True)
+        worker = TempCleaner.from_config()
+        worker.signals.finished.connect(self.task_finished); worker.signals.error.connect(self.task_error)
+        worker.signals.progress.connect(self.show_clean_progress); worker.signals.finished.connect(self.clean_temp_done); worker.signals.error.connect(self.clean_temp_done)
+        self.temp_cleaner = worker; self.clean_temp_btn.setEnabled(False); self.cancel_temp_btn.setVisible(True)
         self.thread_pool.start(worker)
+    def show_clean_progress(self, p):
+        self.progress_label.setText(f"{p['files']} archivos · {p['bytes'] / (1024 * 1024):.1f} MB liberados · {p['bytes_per_s'] / (1024 * 1024):.1f} MB/s")
+    def cancel_clean_temp(self):
+        if self.temp_cleaner: self.temp_cleaner.cancel(); self.status_label.setText("Cancelando limpieza...")
+    def clean_temp_done(self, _):
+        self.temp_cleaner = None; self.clean_temp_btn.setEnabled(True); self.cancel_temp_btn.setVisible(False)
     def flush_dns(self):
         self.status_label.setText("Limpiando caché de DNS..."); worker = DNSFlush(); worker.signals.finished.connect(self.task_finished); worker.signals.error.connect(self.task_error)
         self.thread_pool.start(worker)
+    def analyze_disk_usage(self):
+        root = QFileDialog.getExistingDirectory(self, "Carpeta a analizar")
+        if not root: return
+        self.status_label.setText(f"Analizando {root}..."); self.progress_label.setText(""); self.progress_label.setVisible(True)
+        self.disk_index = None; self.treemap.set_items([]); self.treemap_title.setText(root); self.treemap_up_btn.setEnabled(False); self.disk_card.setVisible(True)
+        worker = DiskUsageScanner(root)
+        worker.signals.finished.connect(self.task_finished); worker.signals.error.connect(self.task_error); worker.signals.progress.connect(self.show_disk_progress)
+        worker.signals.result.connect(self.show_disk_result); worker.signals.finished.connect(self.disk_usage_done); worker.signals.error.connect(self.disk_usage_done)
+        self.disk_scanner = worker; self.disk_usage_btn.setEnabled(False); self.cancel_disk_btn.setVisible(True)
+        self.thread_pool.start(worker)
+    def show_disk_progress(self, p):
+        self.progress_label.setText(f"{p['dirs']} carpetas ({p['reused_dirs']} sin cambios) · {p['files']} archivos · {format_size(p['bytes'])}")
+        self.largest_dirs_label.setText("<b>Carpetas más grandes</b><br>" + "<br>".join(f"{format_size(size)} · {path}" for path, size, _ in p["largest_dirs"]))
+        self.largest_files_label.setText("<b>Archivos más grandes</b><br>" + "<br>".join(f"{format_size(size)} · {path}" for path, size in p["largest_files"]))
+    def cancel_disk_usage(self):
+        if self.disk_scanner: self.disk_scanner.cancel(); self.status_label.setText("Cancelando análisis...")
+    def disk_usage_done(self, _):
+        self.disk_scanner = None; self.disk_usage_btn.setEnabled(True); self.cancel_disk_btn.setVisible(False)
+    def show_disk_result(self, index): self.disk_index = index; self.show_treemap_node(0)
+    def show_treemap_node(self, node):
+        index = self.disk_index
+        if index is None or (node != 0 and not index.children[node]): return
+        self.treemap_node = node; self.treemap_title.setText(f"{index.path(node)} · {format_size(index.total_sizes[node])}"); self.treemap_up_btn.setEnabled(node != 0)
+        items = [(index.names[child], index.total_sizes[child], child) for child in index.children[node]]
+        if index.own_sizes[node]: items.append((f"({index.own_counts[node]} archivos)", index.own_sizes[node], None))
+        self.treemap.set_items(items)
+    def treemap_up(self):
+        if self.disk_index is not None and self.treemap_node > 0: self.show_treemap_node(self.disk_index.parents[self.treemap_node])
+    def find_duplicates(self):
+        root = QFileDialog.getExistingDirectory(self, "Carpeta donde buscar duplicados")
+        if not root: return
+        settings = get_section("duplicate_finder", self.DUPLICATE_FINDER_DEFAULTS)
+        self.status_label.setText(f"Buscando duplicados en {root}..."); self.progress_label.setText(""); self.progress_label.setVisible(True)
+        self.duplicate_groups = []; self.duplicate_keys = []; self.duplicates_tree.clear(); self.duplicates_card.setVisible(True)
+        worker = DuplicateFinder(root, min_size=settings["min_size_kb"] * 1024, max_workers=settings["workers"] or None)
+        worker.signals.finished.connect(self.task_finished); worker.signals.error.connect(self.task_error); worker.signals.progress.connect(self.show_duplicate_progress)
+        worker.signals.finished.connect(self.find_duplicates_done); worker.signals.error.connect(self.find_duplicates_done)
+        self.duplicate_finder = worker; self.duplicates_btn.setEnabled(False); self.cancel_duplicates_btn.setVisible(True)
+        self.thread_pool.start(worker)
+    def show_duplicate_progress(self, p):
+        stages = {"scan": "Agrupando por tamaño", "edges": "Comparando inicio y final", "contents": "Comparando contenido"}
+        self.progress_label.setText(f"{stages[p['stage']]} · {p['files']} archivos · {p['candidates']} candidatos · {format_size(p['hashed_bytes'])} leídos")
+        for group in p["groups"]: self.add_duplicate_group(group)
+    def add_duplicate_group(self, group):
+        """ Inserta el grupo manteniendo la lista ordenada por bytes recuperables. """
+        position = bisect_right(self.duplicate_keys, -group["reclaimable"])
+        self.duplicate_keys.insert(position, -group["reclaimable"]); self.duplicate_groups.insert(position, group)
+        item = QTreeWidgetItem([f"{os.path.basename(group['paths'][0])} ({len(group['paths'])} copias de {format_size(group['size'])})", format_size(group["reclaimable"])])
+        item.setData(0, Qt.UserRole, group); item.addChildren([QTreeWidgetItem([path, ""]) for path in group["paths"]])
+        self.duplicates_tree.insertTopLevelItem(position, item)
+    def cancel_find_duplicates(self):
+        if self.duplicate_finder: self.duplicate_finder.cancel(); self.status_label.setText("Cancelando búsqueda...")
+    def find_duplicates_done(self, _):
+        self.duplicate_finder = None; self.duplicates_btn.setEnabled(True); self.cancel_duplicates_btn.setVisible(False)
+    def resolve_duplicates(self, mode):
+        items = {item if item.parent() is None else item.parent() for item in self.duplicates_tree.selectedItems()}
+        if not items: return
+        groups = [item.data(0, Qt.UserRole) for item in items]
+        copies = sum(len(group["paths"]) - 1 for group in groups)
+        question = f"¿Eliminar {copies} copias?" if mode == "delete" else f"¿Reemplazar {copies} copias por enlaces duros al original?"
+        if QMessageBox.question(self, "Duplicados", question) != QMessageBox.Yes: return
+        for item in items:
+            position = self.duplicates_tree.indexOfTopLevelItem(item); self.duplicates_tree.takeTopLevelItem(position); del self.duplicate_groups[position], self.duplicate_keys[position]
+        self.status_label.setText("Procesando duplicados..."); worker = DuplicateResolver(groups, mode); worker.signals.finished.connect(self.task_finished); worker.signals.error.connect(self.task_error)
+        self.thread_pool.start(worker)
 
 class NotesPage(QWidget):
     def __init__(self, parent=None):
-        super().__init__(parent); self.config = load_config()
+        super().__init__(parent); self.store = get_notes_store()
         layout = QVBoxLayout(self); layout.setContentsMargins(30, 20, 30, 30)
         self.text_edit = QTextEdit()
         self.text_edit.setPlaceholderText("Escribe tus notas aquí... Se guardarán automáticamente.")
-        self.text_edit.setText(self.config.get("user_notes", "")); self.text_edit.textChanged.connect(self.save_notes)
+        self.text_edit.setText(self.store.get_quick_notes()); self.text_edit.textChanged.connect(self.save_notes)
         layout.addWidget(self.text_edit)
     def save_notes(self):
-        self.config["user_notes"] = self.text_edit.toPlainText(); save_config(self.config)
+        self.store.set_quick_notes(self.text_edit.toPlainText())
 
 class CalendarPage(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent); self.config = load_config()
-        if "calendar_events" not in self.config: self.config["calendar_events"] = {}
+    # Color de resaltado por tema (el acento de cada paleta de style_helper).
+    HIGHLIGHT_COLORS = {"dark": "#7F5AF0", "light": "#6E44FF"}
+    _format_cache = {}
+
+    def __init__(self, parent=None, theme="dark"):
+        super().__init__(parent); self.store = get_notes_store(); self.theme = theme
+        self._highlighted = set(); self._styled_pages = set()
         
         main_layout = QHBoxLayout(self); main_layout.setContentsMargins(30, 20, 30, 30)
         splitter = QSplitter(Qt.Horizontal)
@@ -106,32 +352,53 @@ class CalendarPage(QWidget):
         main_layout.addWidget(splitter)
         
         self.calendar.selectionChanged.connect(self.date_changed)
+        self.calendar.currentPageChanged.connect(self.highlight_visible_month)
         self.notes_area.textChanged.connect(self.save_note)
-        self.date_changed(); self.highlight_dates_with_notes()
+        self.date_changed(); self.highlight_visible_month(self.calendar.yearShown(), self.calendar.monthShown())
+
+    @classmethod
+    def _formats(cls, theme):
+        """ Formatos compartidos (sin resaltar, resaltado) creados una sola vez por tema. """
+        if theme not in cls._format_cache:
+            highlight_format = QTextCharFormat(); highlight_format.setBackground(QColor(cls.HIGHLIGHT_COLORS.get(theme, "#7F5AF0"))); highlight_format.setForeground(QColor("white"))
+            cls._format_cache[theme] = (QTextCharFormat(), highlight_format)
+        return cls._format_cache[theme]
         
     def date_changed(self):
         selected_date = self.calendar.selectedDate().toString(Qt.ISODate)
-        self.notes_area.setText(self.config["calendar_events"].get(selected_date, ""))
+        # Cargar la nota no es una edición: no debe volver a guardarse.
+        self.notes_area.blockSignals(True); self.notes_area.setText(self.store.get_note(selected_date)); self.notes_area.blockSignals(False)
 
     def save_note(self):
-        selected_date = self.calendar.selectedDate().toString(Qt.ISODate)
+        selected = self.calendar.selectedDate(); selected_date = selected.toString(Qt.ISODate)
         note_text = self.notes_area.toPlainText().strip()
-        
-        if note_text: self.config["calendar_events"][selected_date] = note_text
-        elif selected_date in self.config["calendar_events"]: del self.config["calendar_events"][selected_date]
-            
-        save_config(self.config); self.highlight_dates_with_notes()
+        self.store.set_note(selected_date, note_text)
+        # Solo se reestiliza la fecha editada, y solo si cambia entre tener nota y no tenerla.
+        if bool(note_text) != (selected_date in self._highlighted):
+            default_format, highlight_format = self._formats(self.theme)
+            if note_text: self._highlighted.add(selected_date); self.calendar.setDateTextFormat(selected, highlight_format)
+            else: self._highlighted.discard(selected_date); self.calendar.setDateTextFormat(selected, default_format)
+
+    def highlight_visible_month(self, year, month):
+        """ Aplica los formatos del mes mostrado (y los días vecinos de la cuadrícula) la primera vez que se ve. """
+        if (year, month) in self._styled_pages: return
+        self._styled_pages.add((year, month))
+        first_day = QDate(year, month, 1)
+        start, end = first_day.addDays(-7).toString(Qt.ISODate), first_day.addMonths(1).addDays(14).toString(Qt.ISODate)
+        highlight_format = self._formats(self.theme)[1]
+        for date_str in self.store.dates_in_range(start, end):
+            if date_str in self._highlighted: continue
+            self._highlighted.add(date_str); self.calendar.setDateTextFormat(QDate.fromString(date_str, Qt.ISODate), highlight_format)
 
-    def highlight_dates_with_notes(self):
-        default_format = QTextCharFormat(); self.calendar.setDateTextFormat(QDate(), default_format)
-        highlight_format = QTextCharFormat(); highlight_format.setBackground(QColor("#7F5AF0")); highlight_format.setForeground(QColor("white"))
-        for date_str, note in self.config["calendar_events"].items():
-            if note: self.calendar.setDateTextFormat(QDate.fromString(date_str, Qt.ISODate), highlight_format)
+    def set_theme(self, theme):
+        if theme == self.theme: return
+        self.theme = theme; highlight_format = self._formats(theme)[1]
+        for date_str in self._highlighted: self.calendar.setDateTextFormat(QDate.fromString(date_str, Qt.ISODate), highlight_format)
 
 class SettingsPage(QWidget):
     theme_changed = Signal(str)
-    def __init__(self, parent=None):
-        super().__init__(parent); self.config = load_config()
+    def __init__(self, parent=None, config=None):
+        super().__init__(parent); self.config = config if config is not None else load_config()
         layout = QVBoxLayout(self); layout.setContentsMargins(30, 20, 30, 30); layout.setSpacing(15)
         
         theme_card = QFrame(objectName="card"); card_layout = QVBoxLayout(theme_card); theme_layout = QHBoxLayout()
@@ -142,4 +409,66 @@ class SettingsPage(QWidget):
         theme_layout.addWidget(self.theme_switch)
         card_layout.addLayout(theme_layout)
         
-        layout.addWidget(theme_card); layout.addStretch()
\ No newline at end of file
+        layout.addWidget(theme_card); layout.addStretch()
+
+class DiagnosticsPage(QWidget):
+    """
+    Página oculta con el coste de la propia aplicación: percentiles de las medidas de
+    diagnostics_helper, memoria y CPU del proceso y latencia de los comandos multimedia.
+    Solo se refresca, cada REFRESH_MS, mientras está a la vista.
+    """
+    REFRESH_MS = 1000
+    LABELS = {"dashboard.tick": "Tick del dashboard", "collector.pass": "Pasada del colector", "event_loop.lag": "Retraso del bucle de eventos",
+              "progress_bar.paint": "Pintado de CircularProgressBar", "config.save": "Guardado de config.json"}
+    def __init__(self, parent=None, media_service=None, collector=None):
+        super().__init__(parent); self.media_service = media_service; self.collector = collector; self._process = None; self.items = {}
+        layout = QVBoxLayout(self); layout.setContentsMargins(30, 20, 30, 30); layout.setSpacing(15)
+        if not diagnostics_enabled():
+            layout.addWidget(QLabel('Las medidas están desactivadas: arranca con --diagnostics o pon "diagnostics": {"enabled": true} en config.json.', wordWrap=True))
+
+        process_card = QFrame(objectName="card"); process_layout = QVBoxLayout(process_card)
+        process_layout.addWidget(QLabel("Proceso", className="cardTitle"))
+        self.process_label = QLabel("..."); self.services_label = QLabel(""); process_layout.addWidget(self.process_label); process_layout.addWidget(self.services_label)
+
+        measures_card = QFrame(objectName="card"); measures_layout = QVBoxLayout(measures_card)
+        measures_header = QHBoxLayout(); measures_header.addWidget(QLabel("Tiempos (ms)", className="cardTitle")); measures_header.addStretch()
+        reset_button = QPushButton("Reiniciar medidas"); reset_button.clicked.connect(self.reset_measures); measures_header.addWidget(reset_button)
+        self.measures_tree = QTreeWidget(); self.measures_tree.setHeaderLabels(["Medida", "Muestras", "p50", "p95", "p99", "Máx."]); self.measures_tree.setRootIsDecorated(False)
+        self.measures_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        measures_layout.addLayout(measures_header); measures_layout.addWidget(self.measures_tree, 1)
+
+        layout.addWidget(process_card); layout.addWidget(measures_card, 1)
+        self.timer = QTimer(self); self.timer.setInterval(self.REFRESH_MS); self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event); self.refresh(); self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event); self.timer.stop()
+
+    def reset_measures(self): reset_all(); self.refresh()
+
+    def refresh(self):
+        if self._process is None: self._process = psutil.Process()
+        try:
+            with self._process.oneshot():
+                rss = self._process.memory_info().rss; cpu = self._process.cpu_percent(None); threads = self._process.num_threads()
+            # cpu_percent() del proceso cuenta por núcleo: 100 % es un núcleo entero.
+            self.process_label.setText(f"Memoria (RSS): {format_size(rss)}   ·   CPU: {cpu:.1f} % de un núcleo   ·   {threads} hilos")
+        except psutil.Error as e: self.process_label.setText(f"No se pudo leer el proceso: {e}")
+
+        services = []
+        if self.collector is not None: services.append(f"Muestras descartadas por la interfaz: {self.collector.dropped_snapshots}")
+        if self.media_service is not None:
+            media = self.media_service.latency_stats()
+            if media["count"]: services.append(f"Comandos multimedia: {media['count']} (p50 {media['p50_ms']:.1f} ms, p95 {media['p95_ms']:.1f} ms, máx. {media['max_ms']:.1f} ms, {media['coalesced']} agrupados)")
+        self.services_label.setText("\n".join(services))
+
+        for name, found in histograms().items():
+            item = self.items.get(name)
+            if item is None:
+                item = self.items[name] = QTreeWidgetItem([self.LABELS.get(name, name)]); self.measures_tree.addTopLevelItem(item)
+                for column in range(1, 6): item.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+            stats = found.stats()
+            values = [str(stats["count"])] + ([f"{stats[key]:.2f}" for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")] if stats["count"] else ["-"] * 4)
+            for column, value in enumerate(values, 1): item.setText(column, value)
@@ -0,0 +1,141 @@
+# AG_Optimizer/views/process_model.py
+# -*- coding: utf-8 -*-
+# © 2025 Agustín Bahamondes. Todos los derechos reservados.
+
+"""
+Modelo de la lista de procesos del dashboard.
+
+ProcessTableModel conserva sus filas entre muestras y solo comunica las diferencias:
+filas nuevas (insert), procesos terminados (remove), cambios de orden (layoutChanged) y
+celdas de memoria que cambiaron (dataChanged). La vista no vuelve a crear nada por tick y
+solo repinta las filas visibles.
+
+Las filas, el orden y las diferencias los calcula ProcessListDiffer en el hilo del colector
+(services/process_list.py); aquí apply_changes() solo emite las señales, así que el coste en
+el hilo de la GUI no crece con el número de procesos. Si el modelo no está en la versión de
+la que parte el cambio (se descartó una muestra o el usuario acaba de reordenar o filtrar),
+la transición se calcula aquí una vez y el siguiente cambio ya vuelve a encajar.
+
+El orden y el filtro viven en el modelo y no en un QSortFilterProxyModel: con un modelo
+escrito en Python, cada comparación del proxy cruza a Python varias veces y ordenar unos
+miles de filas cuesta cientos de milisegundos, mientras que list.sort() con una clave tarda
+unos pocos. La vista sigue ordenando con la cabecera, porque llama a sort().
+"""
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from services.process_list import ROW_KEY, DEFAULT_VIEW, arrange, plan_transition
+
+# data() se llama para cada celda pintada; en PySide6 leer Qt.<Rol> en cada llamada cuesta más que el resto del método.
+DISPLAY_ROLE, ALIGNMENT_ROLE = Qt.DisplayRole, Qt.TextAlignmentRole
+RIGHT_ALIGNMENT = int(Qt.AlignRight | Qt.AlignVCenter)
+HORIZONTAL = Qt.Horizontal
+
+
+class ProcessTableModel(QAbstractTableModel):
+    COLUMNS = ("PID", "Proceso", "Memoria")
+    PID_COLUMN, NAME_COLUMN, MEMORY_COLUMN = range(3)
+
+    def __init__(self, parent=None, differ=None):
+        """ 'differ' es el ProcessListDiffer que prepara los cambios; recibe el orden y el filtro de la vista. """
+        super().__init__(parent)
+        # Todas las filas por clave (pid, create_time); _order son las visibles, en orden, y _positions su índice.
+        self._rows = {}
+        self._order = []
+        self._positions = {}
+        self._view = DEFAULT_VIEW
+        # Versión del differ en la que está el modelo; None tras un cambio de orden o filtro hecho aquí.
+        self._version = 0
+        self._differ = differ
+        if differ is not None: differ.set_view(self._view)
+
+    def index(self, row, column, parent=QModelIndex()):
+        # La versión base comprueba con rowCount() y columnCount(): dos llamadas más a Python por índice.
+        if parent.isValid() or not (0 <= row < len(self._order) and 0 <= column < 3): return QModelIndex()
+        return self.createIndex(row, column)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=DISPLAY_ROLE):
+        if orientation == HORIZONTAL and role == DISPLAY_ROLE: return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if not index.isValid(): return None
+        _, pid, name, rss, _, _ = self._order[index.row()]
+        column = index.column()
+        if role == DISPLAY_ROLE:
+            if column == 0: return str(pid)
+            if column == 1: return name
+            return f"{rss / (1024 * 1024):.1f} MB"
+        if role == ALIGNMENT_ROLE and column != 1:
+            return RIGHT_ALIGNMENT
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._set_view((column, order == Qt.DescendingOrder, self._view[2]))
+
+    def set_filter_text(self, text):
+        """ Muestra solo los procesos cuyo nombre contiene 'text' o cuyo PID empieza por él. """
+        self._set_view((self._view[0], self._view[1], text.strip().lower()))
+
+    def _set_view(self, view):
+        if view == self._view: return
+        self._view = view
+        if self._differ is not None: self._differ.set_view(view)
+        # El usuario espera el resultado ya: se reordena aquí, sin esperar a la siguiente muestra.
+        added = [row for key, row in self._rows.items() if key not in self._positions]
+        self._apply_transition(plan_transition(self._order, arrange(list(self._order), added, view)))
+        self._version = None
+
+    def apply_changes(self, changes):
+        """ Aplica un ProcessListChanges del differ emitiendo solo las señales necesarias. """
+        self._rows = changes.rows
+        if changes.base == self._version and changes.view == self._view:
+            transition, changed_range = changes.transition, changes.changed_range
+            self._version = changes.version
+        else:
+            # Se descartó una muestra o cambió el orden o el filtro: la transición se calcula aquí.
+            if changes.view == self._view: visible = changes.transition.order; self._version = changes.version
+            else:
+                # Calculado con el orden o filtro anterior: se ordena aquí y se espera al siguiente.
+                kept = [self._rows[row[ROW_KEY]] for row in self._order if row[ROW_KEY] in self._rows]
+                added = [row for key, row in self._rows.items() if key not in self._positions]
+                visible = arrange(kept, added, self._view); self._version = None
+            transition = plan_transition(self._order, visible)
+            changed_rows = [transition.positions[key] for key in changes.changed if key in transition.positions]
+            changed_range = (min(changed_rows), max(changed_rows)) if changed_rows else None
+        self._apply_transition(transition)
+        if changed_range:
+            first, last = changed_range
+            self.dataChanged.emit(self.index(first, self.MEMORY_COLUMN), self.index(last, self.MEMORY_COLUMN), [DISPLAY_ROLE])
+
+    def _apply_transition(self, transition):
+        """
+        Como mucho tres señales: insertar al final, reordenar y borrar el tramo final. Las listas
+        vienen del hilo del colector, así que no se modifican: cada paso crea una nueva.
+        """
+        if transition.added:
+            first = len(self._order)
+            self.beginInsertRows(QModelIndex(), first, first + len(transition.added) - 1)
+            self._order = self._order + transition.added
+            self.endInsertRows()
+        if transition.reordered:
+            self.layoutAboutToBeChanged.emit()
+            # Solo los índices persistentes (selección, fila actual) se trasladan; suelen ser unos pocos.
+            positions = transition.layout_positions; old_indexes = self.persistentIndexList()
+            new_indexes = [self.createIndex(positions[self._order[index.row()][ROW_KEY]], index.column()) for index in old_indexes]
+            self._order = transition.layout
+            self.changePersistentIndexList(old_indexes, new_indexes)
+            self.layoutChanged.emit()
+        if transition.removed:
+            first = len(transition.order)
+            self.beginRemoveRows(QModelIndex(), first, first + transition.removed - 1)
+            self._order = self._order[:first]
+            self.endRemoveRows()
+        # Las filas que siguen ocupan su sitio, pero con la memoria nueva.
+        self._order = transition.order; self._positions = transition.positions